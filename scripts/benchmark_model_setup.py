@@ -0,0 +1,77 @@
+"""
+Per-node chat model setup cost: building clients with `init_chat_model` on every call
+versus reusing them from the model registry. No requests are sent to the provider.
+
+    python -m scripts.benchmark_model_setup [--model openai:gpt-4o] [--iterations 200]
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict
+
+from langchain.chat_models import init_chat_model
+
+from src.agents.conversation_agent import TOOLS
+from src.agents.relevance_ranker import RankingChoice
+from src.memory.models import ComprehensionPreferences, PostFormatPreferencesUpdate
+from src.services.model_registry import clear_model_registry, get_chat_model
+
+API_KEY = "sk-benchmark"
+
+
+def node_setups(model: str) -> Dict[str, Dict[str, Callable[[], object]]]:
+    """Model setup done by each node per call, before and after the registry."""
+
+    def fresh(**binding):
+        llm = init_chat_model(model, api_key=API_KEY)
+        if "tools" in binding:
+            return llm.bind_tools(binding["tools"])
+        if "schema" in binding:
+            return llm.with_structured_output(binding["schema"], method="function_calling")
+        return llm
+
+    def pooled(**binding):
+        return get_chat_model(model, API_KEY, **binding)
+
+    setups = {}
+    for name, build in (("before", fresh), ("after", pooled)):
+        setups[name] = {
+            "rank_papers": lambda build=build: build(schema=RankingChoice),
+            "write_post": lambda build=build: (build(), build(tools=TOOLS)),
+            # Before: the node binds tools, then _invoke_with_tools builds a second client
+            "conversation_node": lambda build=build: (build(), build(tools=TOOLS), build(), build(tools=TOOLS)),
+            "update_memory": lambda build=build: (
+                build(schema=PostFormatPreferencesUpdate),
+                build(schema=ComprehensionPreferences),
+            ),
+        }
+    return setups
+
+
+async def run(model: str, iterations: int) -> None:
+    clear_model_registry()
+    setups = node_setups(model)
+    print(f"{'node':<20}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for node in setups["before"]:
+        timings = {}
+        for phase in ("before", "after"):
+            setup = setups[phase][node]
+            setup()  # warm imports and, after, the registry
+            start = time.perf_counter()
+            for _ in range(iterations):
+                setup()
+            timings[phase] = (time.perf_counter() - start) * 1000 / iterations
+        speedup = timings["before"] / timings["after"] if timings["after"] else float("inf")
+        print(f"{node:<20}{timings['before']:>14.3f}{timings['after']:>14.3f}{speedup:>9.0f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="openai:gpt-4o")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.model, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
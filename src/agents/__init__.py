@@ -1,5 +1,5 @@
 from .trend_scanner import scan_trending_topics
-from .arxiv_fetcher import fetch_arxiv_papers
+from .arxiv_fetcher import fetch_arxiv_papers, plan_arxiv_searches
 from .relevance_ranker import rank_papers
 from .conversation_agent import conversation_node
 from .post_writer import write_post
@@ -12,6 +12,7 @@ from .publisher import publisher_node
 __all__ = [
     "scan_trending_topics",
     "fetch_arxiv_papers",
+    "plan_arxiv_searches",
     "rank_papers",
     "conversation_node",
     "write_post",
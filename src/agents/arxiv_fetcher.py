@@ -1,31 +1,63 @@
 import asyncio
-from src.state import AppState
+from typing import Any, Dict, List
+from langgraph.types import Send
+from src.state import AppState, merge_paper_candidates
 from src.services.arxiv_client import ArxivService
+from src.services.local_arxiv_index import LocalArxivIndex, get_local_arxiv_index
 from src.services.logger import get_logger
+from src.services.query import keyword_query
 
 logger = get_logger(__name__)
 
 from langsmith import traceable
 
+# One arXiv search branch per keyword, capped to keep load on the API bounded.
+MAX_KEYWORD_SEARCHES = 3
+RESULTS_PER_KEYWORD = 5
+
+
+def _search_keywords(state: AppState) -> List[str]:
+    keywords = state.trending_keywords
+    if not keywords:
+        logger.warning("No trending keywords found. Using default.")
+        keywords = ["Machine Learning"]
+    return keywords[:MAX_KEYWORD_SEARCHES]
+
+
+def plan_arxiv_searches(state: AppState) -> List[Send]:
+    """
+    Fans out one `arxiv_fetcher` branch per trending keyword.
+    Branches run in parallel and their results are merged by the `paper_candidates` reducer.
+    """
+    keywords = _search_keywords(state)
+    logger.info(f"Fanning out ArXiv search over {len(keywords)} keyword(s): {keywords}")
+    return [Send("arxiv_fetcher", AppState(trending_keywords=[keyword])) for keyword in keywords]
+
+
+async def search_keyword(arxiv_service: ArxivService | LocalArxivIndex, keyword: str) -> List[Dict[str, Any]]:
+    # Quote keywords for Arxiv search (e.g. all:"Machine Learning")
+    query = keyword_query(keyword)
+    papers = await arxiv_service.search_papers(query, max_results=RESULTS_PER_KEYWORD)
+    # Tag (copies of) each result with its keyword so the reducer can balance across keywords
+    return [{**paper, "keyword": keyword} for paper in papers]
+
+
 @traceable
 async def fetch_arxiv_papers(state: AppState) -> dict:
     """
     Fetches papers from ArXiv based on trending keywords.
+    In the graph each branch receives a single keyword (see `plan_arxiv_searches`);
+    called directly, it searches every keyword concurrently.
     """
     logger.info("--- NODE: ArXiv Fetcher ---")
-    arxiv_service = ArxivService()
-    
-    keywords = state.trending_keywords
-    if not keywords:
-        logger.warning("No trending keywords found. Using default.")
-        keywords = ["Machine Learning"]
-        
-    # Quote keywords for Arxiv search (e.g. all:"Machine Learning")
-    # Arxiv API supports boolean operators AND, OR, ANDNOT
-    quoted_keywords = [f'all:"{k.strip().replace(chr(34), "")}"' for k in keywords[:3]]
-    query = " OR ".join(quoted_keywords)
-    query = " OR ".join(quoted_keywords)
+    # Prefer the offline index when one is configured
+    arxiv_service = get_local_arxiv_index() or ArxivService()
+
+    keywords = _search_keywords(state)
     # Service is now async, so we await directly
-    papers = await arxiv_service.search_papers(query)
-    
+    results = await asyncio.gather(*(search_keyword(arxiv_service, k) for k in keywords))
+
+    papers: List[Dict[str, Any]] = []
+    for batch in results:
+        papers = merge_paper_candidates(papers, batch)
     return {"paper_candidates": papers}
@@ -2,9 +2,6 @@ import asyncio
 import json
 from typing import Any, Dict, List, Optional
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import ToolMessage
-from langchain_core.prompts import ChatPromptTemplate
 from langgraph.types import interrupt
 from langsmith import traceable
 from unittest.mock import MagicMock
@@ -12,45 +9,90 @@ from unittest.mock import MagicMock
 from src.config.settings import settings
 from src.core.chat_utils import render_chat_history, summarize_revisions
 from src.core.constants import MEMORY_KIND_COMPREHENSION_FEEDBACK
-from src.core.paths import PROMPTS_DIR
+from src.services.llm_stream import emit, stream_chat_response, streamed_ainvoke
 from src.services.logger import get_logger
+from src.services.model_registry import get_chat_model
+from src.services.prompt_registry import compile_prompt, load_prompt_text
+from src.services.speculation import (
+    SPECULATIVE_CLARIFICATION,
+    current_thread_id,
+    speculate_after_accept,
+    speculation_enabled,
+    speculator,
+)
 from src.state import AppState
+from src.tools.executor import answer_only, run_tool_loop
 from src.tools.research import expand_paper_context, search_web
 
 logger = get_logger(__name__)
 
 TOOLS = [search_web, expand_paper_context]
 TOOL_MAP = {tool.name: tool for tool in TOOLS}
+STREAM_NODE = "conversation_agent"
 
 
-def _parse_conversation_output(text: str) -> tuple[list[str], str]:
+class ConversationOutputParser:
     """
-    Extract angle suggestions and the clarifying question from model output.
-    - Angles: lines starting with 'Angle' (bullet prefixes allowed).
-    - Clarifying question: line starting with 'Clarifying question:'; fallback to last non-empty line.
+    Reads model output line by line, so angles can be picked up while tokens stream in.
+    `feed` returns the angles completed by a chunk; `close` returns (angles, question).
     """
-    angles: list[str] = []
-    question: str = ""
 
-    for line in text.splitlines():
+    def __init__(self):
+        self.angles: list[str] = []
+        self.question: str = ""
+        self._last_line: str = ""
+        self._pending: str = ""
+
+    def feed(self, text: str) -> list[str]:
+        lines = (self._pending + text).splitlines(keepends=True)
+        # A trailing piece without a line break may still grow with the next chunk
+        self._pending = lines.pop() if lines and lines[-1] == lines[-1].rstrip("\r\n") else ""
+        completed = len(self.angles)
+        for line in lines:
+            self._read_line(line)
+        return self.angles[completed:]
+
+    def close(self) -> tuple[list[str], str]:
+        if self._pending:
+            self._read_line(self._pending)
+            self._pending = ""
+        # Fallback to the last non-empty line
+        return self.angles, self.question or self._last_line
+
+    def _read_line(self, line: str) -> None:
         stripped = line.strip()
         if not stripped:
-            continue
+            return
+        self._last_line = stripped
         bullet_stripped = stripped.lstrip("-•* ").strip()
         # Also strip simple numeric list prefixes like "1)" or "1."
         bullet_stripped = bullet_stripped.lstrip("0123456789").lstrip("). ").strip()
         if bullet_stripped.lower().startswith("angle"):
-            angles.append(bullet_stripped)
+            self.angles.append(bullet_stripped)
         if bullet_stripped.lower().startswith("clarifying question:"):
-            question = bullet_stripped.removeprefix("Clarifying question:").strip()
+            self.question = bullet_stripped.removeprefix("Clarifying question:").strip()
+
+
+def _parse_conversation_output(text: str) -> tuple[list[str], str]:
+    """
+    Extract angle suggestions and the clarifying question from model output.
+    - Angles: lines starting with 'Angle' (bullet prefixes allowed).
+    - Clarifying question: line starting with 'Clarifying question:'; fallback to last non-empty line.
+    """
+    parser = ConversationOutputParser()
+    parser.feed(text)
+    return parser.close()
 
-    if not question:
-        # Fallback to the last non-empty line
-        non_empty = [ln.strip() for ln in text.splitlines() if ln.strip()]
-        if non_empty:
-            question = non_empty[-1]
 
-    return angles, question
+def _angle_emitter() -> Any:
+    """A token callback that streams each angle as soon as its line is complete."""
+    parser = ConversationOutputParser()
+
+    def on_text(text: str) -> None:
+        for angle in parser.feed(text):
+            emit(STREAM_NODE, angle=angle)
+
+    return on_text
 
 
 def _normalize_user_answer(raw: Any) -> Optional[Dict[str, Any]]:
@@ -107,42 +149,25 @@ async def _invoke_with_tools(
     """
     if llm_with_tools is None:
         llm_model = settings.conversation_model or settings.llm_model
-        llm = init_chat_model(llm_model, api_key=settings.openai_api_key)
+        llm = get_chat_model(llm_model, settings.openai_api_key)
         if not hasattr(llm, "bind_tools"):
             raise RuntimeError("LLM does not support tool binding.")
-        llm_with_tools = llm.bind_tools(TOOLS)
+        # Same registry entry conversation_node bound, so no second client is built
+        llm_with_tools = get_chat_model(llm_model, settings.openai_api_key, tools=TOOLS)
 
-    prompt = ChatPromptTemplate.from_template(prompt_text)
+    prompt = compile_prompt(prompt_text)
     messages = prompt.format_messages(**inputs)
 
-    # First LLM call: may emit tool calls
-    initial = await llm_with_tools.ainvoke(messages)
-    tool_calls = getattr(initial, "tool_calls", None) or []
-
-    if not tool_calls:
-        angles, question = _parse_conversation_output(initial.content)
-        return initial.content, angles, question
-
-    tool_messages: List[ToolMessage] = []
-    for call in tool_calls:
-        tool = TOOL_MAP.get(call.get("name"))
-        if not tool:
-            logger.warning(f"Unknown tool requested: {call.get('name')}")
-            continue
-        try:
-            result = await tool.ainvoke(call.get("args", {}))
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.error(f"Tool {tool.name} failed: {exc}")
-            result = f"{tool.name} unavailable."
-        tool_messages.append(
-            ToolMessage(
-                content=str(result),
-                tool_call_id=call.get("id"),
-            )
-        )
-
-    follow_up_messages = messages + [initial] + tool_messages
-    final = await llm_with_tools.ainvoke(follow_up_messages)
+    # Tool calls from one model turn run concurrently; rounds are bounded by settings.tool_max_steps
+    final = await run_tool_loop(
+        llm_with_tools,
+        messages,
+        TOOL_MAP,
+        invoke=lambda msgs: stream_chat_response(llm_with_tools, msgs, STREAM_NODE, _angle_emitter()),
+        final_invoke=lambda msgs: stream_chat_response(
+            answer_only(llm_with_tools), msgs, STREAM_NODE, _angle_emitter()
+        ),
+    )
     angles, question = _parse_conversation_output(final.content)
     return final.content, angles, question
 
@@ -152,9 +177,9 @@ async def _invoke_legacy(prompt_text: str, inputs: Dict[str, Any]) -> tuple[str,
     Legacy single-call clarification (no tools). Returns (content, angles, question).
     """
     model_name = settings.conversation_model or settings.llm_model
-    llm = init_chat_model(model_name, api_key=settings.openai_api_key)
-    chain = ChatPromptTemplate.from_template(prompt_text) | llm
-    result = await chain.ainvoke(inputs)
+    llm = get_chat_model(model_name, settings.openai_api_key)
+    prompt = compile_prompt(prompt_text)
+    result = await streamed_ainvoke(STREAM_NODE, prompt, llm, inputs, _angle_emitter())
     angles, question = _parse_conversation_output(result.content)
     return result.content, angles, question
 
@@ -271,8 +296,7 @@ async def conversation_node(state: AppState) -> dict:
         }
 
     # Build prompt and LLM once
-    prompt_path = PROMPTS_DIR / "clarification_prompt.md"
-    prompt_text = await asyncio.to_thread(prompt_path.read_text)
+    prompt_text = load_prompt_text("clarification_prompt.md")
 
     if not settings.openai_api_key:
         logger.error("OPENAI_API_KEY not set; cannot call LLM.")
@@ -301,9 +325,13 @@ async def conversation_node(state: AppState) -> dict:
         }
 
     llm_model = settings.conversation_model or settings.llm_model
-    llm = init_chat_model(llm_model, api_key=settings.openai_api_key)
+    llm = get_chat_model(llm_model, settings.openai_api_key)
     tool_ready = _should_use_tools() and hasattr(llm, "bind_tools") and not isinstance(llm, MagicMock)
-    llm_with_tools = llm.bind_tools(TOOLS) if tool_ready else None
+    llm_with_tools = (
+        get_chat_model(llm_model, settings.openai_api_key, tools=TOOLS)
+        if tool_ready
+        else None
+    )
 
     logger.info("Generating clarification content (tools enabled=%s).", tool_ready)
 
@@ -332,9 +360,18 @@ async def conversation_node(state: AppState) -> dict:
         "preferences": state.memory.get("topic_preferences", {}),
     }
 
+    speculating = speculation_enabled()
+    thread_id = current_thread_id()
+    # On resume LangGraph re-runs this node; reuse the turn generated before the interrupt
+    turn_key = {**inputs, "prompt": prompt_text, "tools": tool_ready}
+    reused_content = await speculator.claim(SPECULATIVE_CLARIFICATION, thread_id, turn_key, wait=0) if speculating else None
+
     # Only catch errors from the LLM call; allow interrupts to bubble so the UI can pause/resume.
     try:
-        if tool_ready and llm_with_tools:
+        if reused_content is not None:
+            assistant_content = reused_content
+            angles, question = _parse_conversation_output(assistant_content)
+        elif tool_ready and llm_with_tools:
             assistant_content, angles, question = await _invoke_with_tools(prompt_text, inputs)
         else:
             assistant_content, angles, question = await _invoke_legacy(prompt_text, inputs)
@@ -400,6 +437,22 @@ async def conversation_node(state: AppState) -> dict:
         }
     }
 
+    if speculating and reused_content is None:
+        if isinstance(assistant_content, str):
+            await speculator.store(SPECULATIVE_CLARIFICATION, thread_id, turn_key, assistant_content)
+        speculate_after_accept(
+            state.model_copy(
+                update={
+                    "chat_history": new_chat_history,
+                    "clarification_history": new_clarification_history,
+                    "user_ready": True,
+                    "awaiting_user_response": False,
+                    "human_feedback": None,
+                }
+            ),
+            thread_id,
+        )
+
     # Let GraphInterrupt propagate to LangGraph; tests that mock interrupt to return still pass.
     raw = interrupt(payload)
     user_answer = raw[0] if isinstance(raw, (list, tuple)) and raw else raw
@@ -1,6 +1,6 @@
 import json
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from src.state import AppState
 from src.services.logger import get_logger
 from langgraph.types import interrupt
@@ -38,6 +38,23 @@ def _normalize_instruction_and_draft(raw_args, fallback_draft: str | None) -> tu
 
     return instruction, edited_draft or fallback_draft
 
+def _parse_publish_at(value: Any) -> Optional[datetime]:
+    """
+    Reads an ISO 8601 `publish_at` from Agent Inbox args; naive times are UTC.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        publish_at = value
+    elif isinstance(value, str):
+        publish_at = datetime.fromisoformat(value.strip())
+    else:
+        raise ValueError(f"expected an ISO 8601 string, got {type(value).__name__}")
+    if publish_at.tzinfo is None:
+        publish_at = publish_at.replace(tzinfo=timezone.utc)
+    return publish_at
+
 @traceable
 async def human_approval(state: AppState) -> dict:
     """
@@ -56,7 +73,7 @@ async def human_approval(state: AppState) -> dict:
     description_lines.append(f"Current draft:\n\n{state.post_draft}")
     description_lines.append(
         "Approve this post? You can:\n"
-        "- Accept (ready to publish)\n"
+        "- Accept (ready to publish; include `publish_at` (ISO 8601) in the args to schedule it)\n"
         "- Edit (change the draft and/or give instructions)\n"
         "- Respond (ask for changes without editing directly)\n"
         "Selecting 'Ignore' will cancel and end this run."
@@ -94,8 +111,25 @@ async def human_approval(state: AppState) -> dict:
     if response["type"] == "accept":
         raw_args = response.get("args")
         edited_draft = None
+        publish_at = None
         if isinstance(raw_args, dict):
             edited_draft = raw_args.get("draft")
+            try:
+                publish_at = _parse_publish_at(raw_args.get("publish_at"))
+            except ValueError as exc:
+                # Ask again rather than publishing right away or at a guessed time
+                logger.warning(f"Rejected publish_at {raw_args.get('publish_at')!r}: {exc}")
+                error_message = (
+                    f"Could not read publish_at {raw_args.get('publish_at')!r}. "
+                    "Use ISO 8601, e.g. 2030-01-07T09:00:00Z, or leave it out to publish now."
+                )
+                return {
+                    "approved": False,
+                    "revision_requested": False,
+                    "post_draft": edited_draft or state.post_draft,
+                    "chat_history": state.chat_history
+                    + [{"role": "assistant", "source": "human_approval", "message": error_message}],
+                }
         feedback_text = raw_args if isinstance(raw_args, str) else (json.dumps(raw_args) if raw_args else None)
         new_chat_history = append_user_chat(feedback_text or "Approved as-is.", "human_approval")
         post_draft = edited_draft or state.post_draft
@@ -112,6 +146,7 @@ async def human_approval(state: AppState) -> dict:
         return {
             "approved": True,
             "revision_requested": False,
+            "publish_at": publish_at,
             "human_feedback": feedback_text,
             "chat_history": new_chat_history,
             "post_draft": post_draft,
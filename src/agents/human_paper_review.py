@@ -1,3 +1,5 @@
+from src.agents.post_writer import speculate_draft
+from src.services.speculation import current_thread_id, speculation_enabled
 from src.state import AppState
 from src.services.logger import get_logger
 from langgraph.types import interrupt
@@ -6,12 +8,25 @@ import re
 from src.core.constants import (
     MEMORY_KIND_PAPER_FEEDBACK,
     MEMORY_KIND_PAPER_SELECTION,
+    PAPER_APPROVAL_NOTE,
 )
 
 logger = get_logger(__name__)
 
 from langsmith import traceable
 
+
+def approved_paper_state(state: AppState) -> AppState:
+    """The state after the user accepts the selected paper without comment."""
+    return state.model_copy(
+        update={
+            "paper_approved": True,
+            "chat_history": state.chat_history
+            + [{"role": "user", "source": "paper_review", "message": PAPER_APPROVAL_NOTE}],
+            "clarification_history": state.clarification_history + [f"User: {PAPER_APPROVAL_NOTE}"],
+        }
+    )
+
 @traceable
 async def human_paper_review(state: AppState) -> dict:
     """
@@ -82,6 +97,10 @@ Index: {selected_paper['index']}
         }
     }
     
+    if speculation_enabled():
+        # Draft in the background while the user reviews; used if they approve as is
+        speculate_draft(approved_paper_state(state), current_thread_id())
+
     raw = interrupt(payload)
     response = raw[0] if isinstance(raw, (list, tuple)) and raw else raw
     if not response or not isinstance(response, dict):
@@ -115,7 +134,7 @@ Index: {selected_paper['index']}
         logger.info("User approved the paper.")
         raw_args = response.get("args")
         feedback = raw_args if isinstance(raw_args, str) else (json.dumps(raw_args) if raw_args else None)
-        approval_note = feedback or "Approved selected paper."
+        approval_note = feedback or PAPER_APPROVAL_NOTE
         new_chat_history, new_clarification_history = append_user_feedback(approval_note)
         approval_event = {
             "kind": MEMORY_KIND_PAPER_SELECTION,
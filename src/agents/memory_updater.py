@@ -5,7 +5,7 @@ from src.state import AppState
 from src.memory import MemoryStore
 from src.services.logger import get_logger
 from src.config.settings import settings
-from langchain.chat_models import init_chat_model
+from src.services.model_registry import get_chat_model
 from src.memory.models import (
     PostFormatPreferencesUpdate,
     ComprehensionPreferences,
@@ -45,12 +45,12 @@ async def update_memory(state: AppState) -> dict:
     if not settings.openai_api_key:
         logger.warning("OPENAI_API_KEY not set; skipping LLM-based memory updates.")
     else:
-        base_llm = init_chat_model(
-            settings.llm_model,
-            api_key=settings.openai_api_key,
+        style_llm = get_chat_model(
+            settings.llm_model, settings.openai_api_key, schema=PostFormatPreferencesUpdate
+        )
+        comp_llm = get_chat_model(
+            settings.llm_model, settings.openai_api_key, schema=ComprehensionPreferences
         )
-        style_llm = base_llm.with_structured_output(PostFormatPreferencesUpdate, method="function_calling")
-        comp_llm = base_llm.with_structured_output(ComprehensionPreferences, method="function_calling")
 
     await apply_memory_events(
         store=store,
@@ -1,61 +1,34 @@
-import asyncio
-from typing import Dict, Any
+import concurrent.futures
+from typing import Any, Dict, Optional
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import ToolMessage
-from langchain_core.prompts import ChatPromptTemplate
 from langsmith import traceable
 from unittest.mock import MagicMock
 
 from src.config.settings import settings
 from src.core.chat_utils import render_chat_snippet, summarize_revisions
-from src.core.paths import PROMPTS_DIR
+from src.services.llm_stream import emit, stream_chat_response, streamed_ainvoke
 from src.services.logger import get_logger
+from src.services.model_registry import get_chat_model
+from src.services.prompt_registry import compile_prompt, load_prompt_text
+from src.services.speculation import SPECULATIVE_DRAFT, current_thread_id, speculation_enabled, speculator
 from src.state import AppState
+from src.tools.executor import answer_only, run_tool_loop
 from src.tools.research import expand_paper_context, search_web
 
 logger = get_logger(__name__)
 
 TOOLS = [search_web, expand_paper_context]
 TOOL_MAP = {tool.name: tool for tool in TOOLS}
+STREAM_NODE = "post_writer"
 
 
 def _should_use_tools() -> bool:
     tavily = getattr(settings, "tavily_api_key", None)
     return bool(settings.openai_api_key and isinstance(tavily, str) and tavily.strip())
 
-@traceable
-async def write_post(state: AppState) -> dict:
-    """
-    Generates a LinkedIn post draft.
-    """
-    logger.info("--- NODE: Post Writer ---")
-    
-    paper = state.selected_paper
-    if not paper:
-        return {"post_draft": "Error: No paper selected."}
-        
-    # Load prompt
-    prompt_path = PROMPTS_DIR / "post_format_prompt.md"
-    try:
-        prompt_text = await asyncio.to_thread(prompt_path.read_text)
-    except FileNotFoundError:
-        logger.error(f"Prompt file not found at: {prompt_path}")
-        return {"post_draft": "Error: Prompt missing."}
-    
-    if not settings.openai_api_key:
-        logger.error("OPENAI_API_KEY not set; cannot call LLM.")
-        return {"post_draft": "Error: API Key missing."}
 
-    llm = init_chat_model(
-        settings.llm_model,
-        api_key=settings.openai_api_key,
-    )
-    prompt = ChatPromptTemplate.from_template(prompt_text)
-    tool_ready = _should_use_tools() and hasattr(llm, "bind_tools") and not isinstance(llm, MagicMock)
-    llm_with_tools = llm.bind_tools(TOOLS) if tool_ready else None
-    
-    # Prepare inputs
+def build_post_inputs(state: AppState, paper: Dict[str, Any]) -> Dict[str, Any]:
+    """The writer prompt's variables for drafting `paper` in `state`."""
     # Extract formatting preferences and convert them into prompt-ready instructions
     format_prefs = state.memory.get("post_format_preferences", {})
 
@@ -118,7 +91,7 @@ async def write_post(state: AppState) -> dict:
         edit_request_lines.append(f"{prefix}{instruction}")
     all_edit_requests = "\n".join(edit_request_lines) if edit_request_lines else "None."
 
-    inputs = {
+    return {
         "title": paper['title'],
         "summary": paper['summary'],
         "style": style_instructions,
@@ -129,39 +102,70 @@ async def write_post(state: AppState) -> dict:
         "chat_history": chat_snippet,
         "all_edit_requests": all_edit_requests,
     }
+
+
+async def generate_post(prompt_text: str, inputs: Dict[str, Any]) -> str:
+    """Runs the writer prompt (with research tools when configured) and returns the draft; raises on failure."""
+    llm = get_chat_model(settings.llm_model, settings.openai_api_key)
+    prompt = compile_prompt(prompt_text)
+    tool_ready = _should_use_tools() and hasattr(llm, "bind_tools") and not isinstance(llm, MagicMock)
+    if tool_ready:
+        llm_with_tools = get_chat_model(settings.llm_model, settings.openai_api_key, tools=TOOLS)
+        final = await run_tool_loop(
+            llm_with_tools,
+            prompt.format_messages(**inputs),
+            TOOL_MAP,
+            invoke=lambda msgs: stream_chat_response(llm_with_tools, msgs, STREAM_NODE),
+            final_invoke=lambda msgs: stream_chat_response(answer_only(llm_with_tools), msgs, STREAM_NODE),
+        )
+        return final.content
+    result = await streamed_ainvoke(STREAM_NODE, prompt, llm, inputs)
+    return result.content
+
+
+def speculate_draft(state: AppState, thread_id: Optional[str]) -> Optional[concurrent.futures.Future]:
+    """Drafts `state`'s selected paper in the background, for `write_post` in `thread_id` to pick up on the same inputs."""
+    if not state.selected_paper or not settings.openai_api_key:
+        return None
+    inputs = build_post_inputs(state, state.selected_paper)
+
+    async def produce() -> str:
+        return await generate_post(load_prompt_text("post_format_prompt.md"), inputs)
+
+    return speculator.submit(SPECULATIVE_DRAFT, thread_id, inputs, produce)
+
+@traceable
+async def write_post(state: AppState) -> dict:
+    """
+    Generates a LinkedIn post draft.
+    """
+    logger.info("--- NODE: Post Writer ---")
+    
+    paper = state.selected_paper
+    if not paper:
+        return {"post_draft": "Error: No paper selected."}
+        
+    # Load prompt
+    try:
+        prompt_text = load_prompt_text("post_format_prompt.md")
+    except FileNotFoundError as exc:
+        logger.error(f"Prompt file not found: {exc.filename}")
+        return {"post_draft": "Error: Prompt missing."}
     
+    if not settings.openai_api_key:
+        logger.error("OPENAI_API_KEY not set; cannot call LLM.")
+        return {"post_draft": "Error: API Key missing."}
+
+    inputs = build_post_inputs(state, paper)
+
     try:
-        if tool_ready and llm_with_tools:
-            messages = prompt.format_messages(**inputs)
-            initial = await llm_with_tools.ainvoke(messages)
-            tool_calls = getattr(initial, "tool_calls", None) or []
-
-            if tool_calls:
-                tool_messages = []
-                for call in tool_calls:
-                    tool = TOOL_MAP.get(call.get("name"))
-                    if not tool:
-                        logger.warning(f"Unknown tool requested: {call.get('name')}")
-                        continue
-                    try:
-                        tool_result = await tool.ainvoke(call.get("args", {}))
-                    except Exception as exc:  # pragma: no cover - defensive
-                        logger.error(f"Tool {tool.name} failed: {exc}")
-                        tool_result = f"{tool.name} unavailable."
-                    tool_messages.append(
-                        ToolMessage(content=str(tool_result), tool_call_id=call.get("id"))
-                    )
-
-                final = await llm_with_tools.ainvoke(messages + [initial] + tool_messages)
-                result_content = final.content
-            else:
-                result_content = initial.content
+        speculative = await speculator.claim(SPECULATIVE_DRAFT, current_thread_id(), inputs) if speculation_enabled() else None
+        if speculative is not None:
+            # Still reaches clients following the custom stream, in one piece
+            emit(STREAM_NODE, token=speculative)
+            new_draft = speculative
         else:
-            chain = prompt | llm
-            result = await chain.ainvoke(inputs)
-            result_content = result.content
-
-        new_draft = result_content
+            new_draft = await generate_post(prompt_text, inputs)
         new_post_history = state.post_history + [
             {
                 "origin": "llm",
@@ -1,8 +1,12 @@
-from datetime import datetime
 from src.state import AppState
 from src.services.logger import get_logger
-from src.services.linkedin_api import LinkedInService
-from src.config.settings import settings
+from datetime import timezone
+from src.services.publish_outbox import (
+    default_linkedin_service,
+    get_publish_outbox,
+    notify_publish_worker,
+    start_publish_worker,
+)
 from langsmith import traceable
 
 logger = get_logger(__name__)
@@ -10,7 +14,8 @@ logger = get_logger(__name__)
 @traceable
 async def publisher_node(state: AppState) -> dict:
     """
-    Publishes the approved post to LinkedIn.
+    Queues the approved post for publication to LinkedIn, now or at `state.publish_at`.
+    Delivery (with retries) happens in the background outbox worker, so the run never waits on LinkedIn.
     """
     logger.info("--- NODE: Publisher ---")
 
@@ -22,21 +27,21 @@ async def publisher_node(state: AppState) -> dict:
         logger.warning("No post draft to publish.")
         return {}
 
-    # Initialize service with settings
-    service = LinkedInService(
-        client_id=settings.linkedin_client_id or "",
-        client_secret=settings.linkedin_client_secret or "",
-        access_token=settings.linkedin_access_token or "",
-        author_urn=settings.linkedin_author_urn or ""
-    )
+    not_before = None
+    if state.publish_at is not None:
+        publish_at = state.publish_at
+        if publish_at.tzinfo is None:
+            publish_at = publish_at.replace(tzinfo=timezone.utc)  # naive times are UTC
+        not_before = publish_at.timestamp()
 
-    success = await service.post_update(state.post_draft)
-    
-    if success:
-        logger.info("Content published successfully.")
-        # We could add a memory event here or update a 'published' flag in state if it existed.
-        # For now, we just proceed.
+    # Quotas count per member; an unresolved member is keyed by its token until the worker resolves it
+    account = await default_linkedin_service("").account()
+    entry = await get_publish_outbox().enqueue(account, state.post_draft, not_before=not_before)
+    start_publish_worker()
+    notify_publish_worker(entry)
+    if not_before is not None:
+        logger.info(f"Post scheduled for {publish_at.isoformat()} (outbox id {entry.id}).")
     else:
-        logger.error("Failed to publish content.")
+        logger.info(f"Post queued for publication (outbox id {entry.id}).")
 
-    return {}
+    return {"publish_job_id": entry.id}
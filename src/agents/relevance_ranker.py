@@ -1,13 +1,16 @@
-import asyncio
 from src.state import AppState
 from src.services.logger import get_logger
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.chat_models import init_chat_model
 from src.config.settings import settings
-from src.core.paths import PROMPTS_DIR
+from src.services.model_registry import get_chat_model
+from src.services.prompt_registry import get_prompt
+from src.services.llm_cache import cached_structured_ainvoke
+from src.services.speculation import SPECULATIVE_RANKING, current_thread_id, speculation_enabled, speculator
 from src.core.chat_utils import render_chat_snippet
 
+import concurrent.futures
 import json
+from typing import Any, Dict, Optional
+
 from pydantic import BaseModel
 
 logger = get_logger(__name__)
@@ -19,6 +22,43 @@ class RankingChoice(BaseModel):
     index: int
     rationale: str | None = None
 
+
+def build_ranking_inputs(state: AppState) -> Dict[str, Any]:
+    """The ranking prompt's variables for `state`."""
+    # Format papers for the prompt
+    papers_str = json.dumps([{ "title": p["title"], "summary": p["summary"][:200] } for p in state.paper_candidates], indent=2)
+    
+    # Use memory for interests
+    interests = (state.memory or {}).get("topic_preferences", {})
+    conversation_context = render_chat_snippet(state.chat_history, max_items=6)
+    
+    return {
+        "topic": state.trending_keywords[0] if state.trending_keywords else "General AI",
+        "interests": interests,
+        "conversation": conversation_context,
+        "papers": papers_str
+    }
+
+
+async def choose_paper_index(inputs: Dict[str, Any]) -> int:
+    """Asks the model which candidate fits best; raises if the call fails."""
+    structured_llm = get_chat_model(
+        settings.llm_model,
+        settings.openai_api_key,
+        schema=RankingChoice,
+    )
+    prompt = get_prompt("ranking_prompt.md")
+    result = await cached_structured_ainvoke("rank_papers", prompt, structured_llm, inputs, RankingChoice)
+    return result.index
+
+
+def speculate_ranking(state: AppState, thread_id: Optional[str]) -> Optional[concurrent.futures.Future]:
+    """Ranks `state`'s candidates in the background, for `rank_papers` in `thread_id` to pick up on the same inputs."""
+    if not state.paper_candidates or not settings.openai_api_key:
+        return None
+    inputs = build_ranking_inputs(state)
+    return speculator.submit(SPECULATIVE_RANKING, thread_id, inputs, lambda: choose_paper_index(inputs))
+
 @traceable
 async def rank_papers(state: AppState) -> dict:
     """
@@ -31,39 +71,16 @@ async def rank_papers(state: AppState) -> dict:
         logger.warning("No papers to rank.")
         return {"selected_paper": None}
         
-    # Load prompt
-    prompt_path = PROMPTS_DIR / "ranking_prompt.md"
-    prompt_text = await asyncio.to_thread(prompt_path.read_text)
-    
     if not settings.openai_api_key:
         logger.error("OPENAI_API_KEY not set; cannot call LLM.")
         return {"selected_paper": None}
 
-    llm = init_chat_model(
-        settings.llm_model,
-        api_key=settings.openai_api_key,
-    )
-    structured_llm = llm.with_structured_output(RankingChoice, method="function_calling")
-    chain = ChatPromptTemplate.from_template(prompt_text) | structured_llm
-    
-    # Prepare inputs
-    # Format papers for the prompt
-    papers_str = json.dumps([{ "title": p["title"], "summary": p["summary"][:200] } for p in candidates], indent=2)
-    
-    # Use memory for interests
-    interests = (state.memory or {}).get("topic_preferences", {})
-    conversation_context = render_chat_snippet(state.chat_history, max_items=6)
-    
-    inputs = {
-        "topic": state.trending_keywords[0] if state.trending_keywords else "General AI",
-        "interests": interests,
-        "conversation": conversation_context,
-        "papers": papers_str
-    }
+    inputs = build_ranking_inputs(state)
     
     try:
-        result = await chain.ainvoke(inputs)
-        index = result.index
+        index = await speculator.claim(SPECULATIVE_RANKING, current_thread_id(), inputs) if speculation_enabled() else None
+        if index is None:
+            index = await choose_paper_index(inputs)
 
         if 0 <= index < len(candidates):
             selected_paper = candidates[index]
@@ -1,12 +1,35 @@
 import asyncio
+from typing import Any, Dict, List
 from src.state import AppState
-from src.services.google_trends import GoogleTrendsService
+from src.services.google_trends import DEFAULT_SEEDS, GoogleTrendsService
 from src.services.logger import get_logger
 
 logger = get_logger(__name__)
 
 from langsmith import traceable
 
+
+def trend_seeds(topic_preferences: Dict[str, Any]) -> List[str]:
+    """Seed keywords from memory, or the defaults."""
+    seeds = topic_preferences.get("seeds", [])
+    if not seeds:
+        logger.info("No seeds found in memory. Using defaults.")
+        seeds = list(DEFAULT_SEEDS)
+    return seeds
+
+
+def filter_trends(trends: List[str], avoid_list: List[str]) -> List[str]:
+    """Lowercases and de-duplicates trends (keeping the service's ranking) and drops avoided topics."""
+    trends = list(dict.fromkeys(t.lower() for t in trends))
+    
+    if avoid_list:
+        filtered_trends = [t for t in trends if not any(avoid.lower() in t.lower() for avoid in avoid_list)]
+        if len(filtered_trends) < len(trends):
+            logger.info(f"Filtered out {len(trends) - len(filtered_trends)} avoided topics.")
+        trends = filtered_trends
+    return trends
+
+
 @traceable
 async def scan_trending_topics(state: AppState) -> dict:
     """
@@ -16,16 +39,10 @@ async def scan_trending_topics(state: AppState) -> dict:
     trends_service = GoogleTrendsService()
     
     # Get seed keywords from memory or use defaults
-    seeds = state.memory.get("topic_preferences", {}).get("seeds", [])
-    if not seeds:
-        logger.info("No seeds found in memory. Using defaults.")
-        seeds = ["AI", "LLM", "Machine Learning"]
+    seeds = trend_seeds(state.memory.get("topic_preferences", {}))
     
-    # Use top 3 seeds to get broader trends
-    # PyTrends supports up to 5 keywords
-    search_seeds = seeds[:3]
-    
-    logger.info(f"Scanning trends for seeds: {search_seeds}")
+    # The service batches seeds into PyTrends payloads of up to 5 keywords, so every seed is used
+    search_seeds = seeds
     
     logger.info(f"Scanning trends for seeds: {search_seeds}")
     
@@ -34,14 +51,6 @@ async def scan_trending_topics(state: AppState) -> dict:
     
     # Filter out avoided topics
     avoid_list = state.memory.get("topic_preferences", {}).get("avoid", [])
-    
-    # Lowercase for deduplication and sort for determinism
-    trends = sorted(list(set([t.lower() for t in trends])))
-    
-    if avoid_list:
-        filtered_trends = [t for t in trends if not any(avoid.lower() in t.lower() for avoid in avoid_list)]
-        if len(filtered_trends) < len(trends):
-            logger.info(f"Filtered out {len(trends) - len(filtered_trends)} avoided topics.")
-        trends = filtered_trends
+    trends = filter_trends(trends, avoid_list)
     
     return {"trending_keywords": trends}
@@ -9,12 +9,26 @@ class Settings(BaseSettings):
     linkedin_client_secret: Optional[str] = None
     linkedin_access_token: Optional[str] = None
     linkedin_author_urn: Optional[str] = None
+    linkedin_api_base: str = "https://api.linkedin.com"  # point at a local stub in tests
+    linkedin_daily_post_quota: int = 100  # posts per account per rolling 24h before the outbox holds back
     llm_model: str = "openai:gpt-4o"
     conversation_model: Optional[str] = Field(
         default=None,
         alias="CONVO_AGENT_MODEL",  # allow env override to match docs
     )
     tavily_api_key: Optional[str] = None
+    arxiv_index_path: Optional[str] = None  # local BM25 index; replaces live arXiv queries when set
+    prefetch_enabled: bool = False  # warm trends/arXiv caches on a background thread in the server
+    prefetch_interval_seconds: float = 30 * 60
+    llm_cache_nodes: str = ""  # comma-separated nodes whose structured LLM calls are cached, e.g. "rank_papers,update_memory"
+    llm_cache_ttl_seconds: float = 7 * 24 * 60 * 60
+    llm_cache_max_entries: int = 2000
+    llm_cache_max_bytes: int = 64 * 1024 * 1024  # total stored response size; oldest evicted first
+    tool_max_steps: int = 3  # tool-call rounds per model turn in the conversation/writer loops
+    tool_timeout_seconds: float = 30.0
+    speculation_enabled: bool = False  # rank/pre-draft in the background while an interrupt waits for the user
+    speculation_ttl_seconds: float = 60 * 60
+    speculation_wait_seconds: float = 60.0  # how long a node waits for matching speculative work still running
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,4 +1,4 @@
-"""Shared constants for memory event kinds."""
+"""Shared constants for memory event kinds and chat notes."""
 
 # Memory event kinds
 MEMORY_KIND_COMPREHENSION_FEEDBACK = "comprehension_feedback"
@@ -6,3 +6,6 @@ MEMORY_KIND_PAPER_FEEDBACK = "paper_feedback"
 MEMORY_KIND_PAPER_SELECTION = "paper_selection"
 MEMORY_KIND_POST_STYLE_FEEDBACK = "post_style_feedback"
 
+# Chat note recorded when the user accepts the selected paper without comment
+PAPER_APPROVAL_NOTE = "Approved selected paper."
+
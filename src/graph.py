@@ -1,6 +1,9 @@
 from langgraph.graph import StateGraph, END, START
 from langgraph.checkpoint.memory import MemorySaver
+import asyncio
+import concurrent.futures
 import sys
+from typing import Optional
 from src.state import AppState
 from src.agents import (
     scan_trending_topics,
@@ -13,11 +16,48 @@ from src.agents import (
     load_memory,
     human_paper_review,
     publisher_node,
+    plan_arxiv_searches,
 )
+from src.agents.human_paper_review import approved_paper_state
+from src.agents.post_writer import speculate_draft
+from src.agents.relevance_ranker import speculate_ranking
+from src.config.settings import settings
 from src.services.logger import get_logger
+from src.services.prefetch import start_background_prefetch
+from src.services.prompt_registry import validate_prompts
+from src.services.speculation import register_after_accept, speculator
 
 logger = get_logger(__name__)
 
+
+# Speculation after an accept in conversation_agent
+def speculate_rank_and_draft(state: AppState, thread_id: Optional[str]) -> Optional[concurrent.futures.Future]:
+    """
+    Starts what an accept of `state` leads to in `thread_id`: ranking (if no paper is
+    selected yet), then a first draft for the chosen paper. None unless the state is
+    about to rank candidates or draft.
+    """
+    if state.post_draft or (state.selected_paper is None and not state.paper_candidates):
+        return None
+
+    async def run() -> None:
+        ready = state
+        if ready.selected_paper is None:
+            ranking = speculate_ranking(ready, thread_id)
+            index = await asyncio.wrap_future(ranking) if ranking else None
+            if index is None:
+                return
+            candidates = ready.paper_candidates
+            ready = ready.model_copy(
+                update={"selected_paper": candidates[index] if 0 <= index < len(candidates) else candidates[0]}
+            )
+        speculate_draft(approved_paper_state(ready), thread_id)
+
+    return speculator.spawn(run())
+
+
+register_after_accept(speculate_rank_and_draft)
+
 # Planning Router
 def _has_pending_user_message(state: AppState) -> bool:
     if not state.chat_history:
@@ -111,6 +151,12 @@ async def execution_router(state: AppState) -> dict:
 def get_next_step(state: AppState):
     return state.next_step
 
+def route_planning(state: AppState):
+    """Like get_next_step, but fans the ArXiv fetch out into one parallel branch per keyword."""
+    if state.next_step == "arxiv_fetcher":
+        return plan_arxiv_searches(state)
+    return state.next_step
+
 # Define the graph
 workflow = StateGraph(AppState)
 
@@ -138,7 +184,7 @@ workflow.add_edge("load_memory", "planning_router")
 # Planning Phase Logic
 workflow.add_conditional_edges(
     "planning_router",
-    get_next_step,
+    route_planning,
     {
         "trend_scanner": "trend_scanner",
         "arxiv_fetcher": "arxiv_fetcher",
@@ -179,18 +225,30 @@ workflow.add_edge("publisher", "memory_updater")
 # Memory Updater -> End
 workflow.add_edge("memory_updater", END)
 
+# Fail fast on a broken prompt as part of building the graph, not on the first LLM turn.
+validate_prompts()
+
 # Compile with in-memory checkpointing unless LangGraph API is managing persistence.
 use_checkpointer = "langgraph_api" not in sys.modules
 checkpointer = MemorySaver() if use_checkpointer else None
 graph = workflow.compile(checkpointer=checkpointer) if checkpointer else workflow.compile()
 
+# Opt-in: keep trends/arXiv caches warm for bootstrap while this process serves the graph.
+if settings.prefetch_enabled:
+    start_background_prefetch()
+
 if __name__ == "__main__":
     import asyncio
+    from src.services.linkedin_api import aclose_http_client
+
     async def main():
         print("Starting Graph...")
         config = {"configurable": {"thread_id": "1"}}
-        async for output in graph.astream(AppState(), config=config):
-            for key, value in output.items():
-                print(f"Finished node: {key}")
+        try:
+            async for output in graph.astream(AppState(), config=config):
+                for key, value in output.items():
+                    print(f"Finished node: {key}")
+        finally:
+            await aclose_http_client()
     
     asyncio.run(main())
@@ -1,8 +1,6 @@
-import asyncio
 from typing import List, Dict, Any, Optional
 from langchain_core.runnables import Runnable
 
-from langchain_core.prompts import ChatPromptTemplate
 
 from src.memory import MemoryStore
 from src.memory.models import MemoryEvent, PostFormatPreferencesUpdate, ComprehensionPreferences
@@ -12,8 +10,9 @@ from src.core.constants import (
     MEMORY_KIND_PAPER_SELECTION,
     MEMORY_KIND_POST_STYLE_FEEDBACK,
 )
-from src.core.paths import PROMPTS_DIR
 from src.services.logger import get_logger
+from src.services.prompt_registry import get_prompt
+from src.services.llm_cache import cached_structured_ainvoke
 
 logger = get_logger(__name__)
 
@@ -107,17 +106,18 @@ async def apply_memory_events(
 
     if style_feedback_text and style_llm is not None:
         try:
-            prompt_path = PROMPTS_DIR / "memory_style_prompt.md"
-            prompt_text = await asyncio.to_thread(prompt_path.read_text)
-
-            chain = ChatPromptTemplate.from_template(prompt_text) | style_llm
+            prompt = get_prompt("memory_style_prompt.md")
             current_style = store.format or {}
 
-            result = await chain.ainvoke(
+            result = await cached_structured_ainvoke(
+                "update_memory",
+                prompt,
+                style_llm,
                 {
                     "feedback": style_feedback_text,
                     "current_style": current_style,
-                }
+                },
+                PostFormatPreferencesUpdate,
             )
             store.format = result.model_dump()
             logger.info("Updated post format preferences from feedback.")
@@ -132,17 +132,18 @@ async def apply_memory_events(
     ]
     if comp_feedback_chunks and comp_llm is not None:
         try:
-            prompt_path = PROMPTS_DIR / "comprehension_memory_prompt.md"
-            prompt_text = await asyncio.to_thread(prompt_path.read_text)
-
-            chain = ChatPromptTemplate.from_template(prompt_text) | comp_llm
+            prompt = get_prompt("comprehension_memory_prompt.md")
             current_comp = store.comp or {}
 
-            result = await chain.ainvoke(
+            result = await cached_structured_ainvoke(
+                "update_memory",
+                prompt,
+                comp_llm,
                 {
                     "feedback": "\n".join(comp_feedback_chunks),
                     "current_preferences": current_comp,
-                }
+                },
+                ComprehensionPreferences,
             )
             store.comp = result.model_dump()
             logger.info("Updated comprehension preferences from feedback.")
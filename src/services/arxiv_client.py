@@ -1,76 +1,336 @@
 import asyncio
+import contextvars
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import arxiv
 from langsmith import traceable
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from src.services.circuit_breaker import CircuitOpenError, get_breaker
 from src.services.logger import get_logger
-from src.services.utils import load_cache, save_cache
+from src.services.rate_limit import PRIORITY_BULK, PriorityRateLimiter, request_priority
+from src.services.query import canonicalization_stats, query_cache_key
+from src.services.singleflight import SingleFlight
+from src.services.utils import BackgroundRefresher, SQLiteCache
 
 logger = get_logger(__name__)
 
+# New submissions land daily, so cached result lists are refreshed once a day.
+ARXIV_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Failing queries are not retried upstream for this long.
+ARXIV_FAILURE_TTL_SECONDS = 60
+
+# arXiv API terms of use: at most one request every three seconds, per process.
+ARXIV_REQUEST_INTERVAL_SECONDS = 3.0
+
+# Searches paging through arXiv at once; they block on their own executor, not the default one.
+ARXIV_MAX_CONCURRENT_SEARCHES = 4
+
+# Upper bound on papers kept per query as deltas are merged into the cached list.
+ARXIV_MAX_RETAINED_RESULTS = 100
+
+_VERSION_SUFFIX_RE = re.compile(r"v\d+$")
+
+_ITEM, _ERROR, _DONE = "item", "error", "done"
+
+refresher = BackgroundRefresher("arxiv")
+search_flight = SingleFlight("arxiv")
+arxiv_breaker = get_breaker("arxiv", failure_threshold=5, reset_timeout=60)
+
+# Strong references to in-flight page producers so they are not garbage collected mid-fetch.
+_producers: set = set()
+_executor = ThreadPoolExecutor(max_workers=ARXIV_MAX_CONCURRENT_SEARCHES, thread_name_prefix="arxiv")
+
+# Set while a search's first request already holds a token granted on the event loop.
+_prepaid_request: contextvars.ContextVar[bool] = contextvars.ContextVar("arxiv_prepaid_request", default=False)
+
+
+class ScheduledArxivClient(arxiv.Client):
+    """
+    arxiv.Client whose page requests (including retries) are paced by a shared
+    PriorityRateLimiter instead of the per-instance `delay_seconds` sleep. A request whose
+    token was already taken with `acquire_async` (see `ArxivService._stream_search`) skips it.
+    """
+
+    def __init__(self, limiter: PriorityRateLimiter, **kwargs):
+        super().__init__(delay_seconds=0, **kwargs)
+        self.limiter = limiter
+
+    def _parse_feed(self, url: str, first_page: bool = True, _try_index: int = 0):
+        if _prepaid_request.get():
+            _prepaid_request.set(False)
+            waited = 0.0
+        else:
+            waited = self.limiter.acquire()
+        if waited >= 0.5:
+            logger.debug(f"ArXiv request waited {waited:.1f}s for the rate limiter")
+        return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+
+
+arxiv_rate_limiter = PriorityRateLimiter(rate=1 / ARXIV_REQUEST_INTERVAL_SECONDS)
+_shared_client: ScheduledArxivClient | None = None
+_shared_client_guard = threading.Lock()
+
+
+def get_arxiv_client() -> ScheduledArxivClient:
+    """Returns the process-wide arXiv client; all arXiv traffic should go through it."""
+    global _shared_client
+    with _shared_client_guard:
+        if _shared_client is None:
+            _shared_client = ScheduledArxivClient(arxiv_rate_limiter)
+        return _shared_client
+
+
+def _normalize_result(result: arxiv.Result) -> Dict[str, Any]:
+    # Normalize summary
+    summary = result.summary.replace("\n", " ").strip()
+    # Remove latex (simple heuristic)
+    summary = summary.replace("$", "")
+    return {
+        "title": result.title,
+        "summary": summary,
+        "url": result.entry_id,
+        "published": result.published.isoformat()
+    }
+
+
+def _paper_id(paper: Dict[str, Any]) -> str:
+    # Entry URLs carry a version suffix (.../2401.00001v2); newer versions are the same paper.
+    return _VERSION_SUFFIX_RE.sub("", paper.get("url") or paper.get("title", ""))
+
+
+def _merge_results(fresh: List[Dict[str, Any]], cached: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Newest-first union of a delta and the stored list, capped at the retention bound."""
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for paper in [*fresh, *cached]:
+        paper_id = _paper_id(paper)
+        if paper_id not in seen:
+            seen.add(paper_id)
+            merged.append(paper)
+    return merged[:ARXIV_MAX_RETAINED_RESULTS]
+
+
+def _unpack_cached(value: Any) -> Tuple[List[Dict[str, Any]], bool]:
+    """Returns (papers, complete) for a cached value; bare lists predate the completeness flag."""
+    if isinstance(value, dict):
+        return value.get("papers", []), bool(value.get("complete"))
+    return value or [], False
+
+
+def _submitted_since(query: str, since: str) -> str:
+    """Restricts a query to submissions from the minute of `since` onwards (arXiv dates are GMT)."""
+    start = datetime.fromisoformat(since)
+    start = start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start.astimezone(timezone.utc)
+    end = datetime.now(timezone.utc)
+    return f"({query}) AND submittedDate:[{start:%Y%m%d%H%M} TO {end:%Y%m%d%H%M}]"
+
+
+class ArxivUnavailableError(RuntimeError):
+    """Raised without contacting arXiv while a query's recent failure is negatively cached."""
+
+
 class ArxivService:
     def __init__(self):
-        self.client = arxiv.Client()
-        self.cache_file = "arxiv_cache.json"
+        self.client = get_arxiv_client()
+        self.cache = SQLiteCache("arxiv", ttl=ARXIV_CACHE_TTL_SECONDS)
+        # Newest `published` timestamp seen per query; outlives the result-list TTL.
+        self.high_water = SQLiteCache("arxiv_high_water")
+        self.failures = SQLiteCache("arxiv_failures", ttl=ARXIV_FAILURE_TTL_SECONDS)
 
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        return query_cache_key(query)
 
-
-    # Helper methods for cache (assuming they will be added or are implicitly handled)
     async def _get_from_cache(self, query: str) -> List[Dict[str, Any]]:
-        cache = await load_cache(self.cache_file)
-        return cache.get(query)
+        value = await self.cache.get(self._cache_key(query))
+        return _unpack_cached(value)[0] if value is not None else None
+
+    async def _save_to_cache(self, query: str, results: List[Dict[str, Any]], complete: bool = False):
+        """Stores a result list; `complete` marks it as every match arXiv has (fewer than requested)."""
+        key = self._cache_key(query)
+        await self.cache.set(key, {"papers": results, "complete": complete})
+        canonicalization_stats.record_write("arxiv", query, key)
+        newest = max((p["published"] for p in results if p.get("published")), default=None)
+        if newest:
+            await self.high_water.set(key, newest)
+
+    async def _stream_search(self, query: str, max_results: int) -> AsyncIterator[Dict[str, Any]]:
+        """Streams normalized results for one arXiv search, newest submissions first."""
+        search = arxiv.Search(
+            query=query,
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.SubmittedDate
+        )
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def _emit(kind: str, payload: Any = None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+            except RuntimeError:  # pragma: no cover - loop closed under us
+                stop.set()
+
+        def _produce():
+            # Runs on a worker thread; the arxiv client blocks while fetching each page.
+            try:
+                for result in self.client.results(search):
+                    if stop.is_set():
+                        return
+                    _emit(_ITEM, _normalize_result(result))
+            except Exception as exc:
+                _emit(_ERROR, exc)
+            finally:
+                _emit(_DONE)
+
+        # The first page's token is waited for here, on the loop, so queued searches hold no
+        # thread; later pages and retries are paced on the bounded arXiv executor.
+        limiter = getattr(self.client, "limiter", None)
+        if limiter is not None:
+            await limiter.acquire_async()
+        context = contextvars.copy_context()
+        context.run(_prepaid_request.set, limiter is not None)
+        producer = asyncio.ensure_future(loop.run_in_executor(_executor, context.run, _produce))
+        _producers.add(producer)
+        producer.add_done_callback(_producers.discard)
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == _DONE:
+                    return
+                if kind == _ERROR:
+                    raise payload
+                yield payload
+        finally:
+            # Tell the worker thread to stop paging if the consumer bailed out early.
+            stop.set()
+
+    async def stream_papers(self, query: str, max_results: int = 5) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields normalized paper dicts as the arXiv client pages through results.
+        The accumulated results are written to the cache at every page boundary, so
+        an interrupted stream still leaves its completed pages cached.
+
+        An expired cached list is served as-is while a background task refreshes it.
+        Queries that failed recently raise ArxivUnavailableError without contacting arXiv.
+        Cache misses raise CircuitOpenError while the arXiv breaker is open. Other upstream
+        errors are raised after any results already yielded.
+        """
+        key = self._cache_key(query)
+        entry = await self.cache.get_entry(key)
+        cached, complete = _unpack_cached(entry.value if entry is not None else None)
+        usable = entry is not None and (complete or len(cached) >= max_results)
+        hit = usable and not entry.expired
+        canonicalization_stats.record("arxiv", query, key, hit)
+        if hit:
+            logger.info(f"ArXiv cache hit for query: {query}")
+            for paper in cached[:max_results]:
+                yield paper
+            return
 
-    async def _save_to_cache(self, query: str, results: List[Dict[str, Any]]):
-        cache = await load_cache(self.cache_file)
-        cache[query] = results
-        await save_cache(self.cache_file, cache)
+        failure = await self.failures.get(key)
+        if usable:
+            if failure is None and not arxiv_breaker.rejecting:
+                logger.info(f"Serving stale ArXiv results for query: {query}; refreshing in background")
+                refresher.schedule(key, lambda: self._refresh(query, max_results, cached, complete))
+            for paper in cached[:max_results]:
+                yield paper
+            return
+        if failure is not None:
+            raise ArxivUnavailableError(f"ArXiv query failed recently, not retrying yet: {failure}")
+
+        async for paper in self._fetch(query, max_results):
+            yield paper
+
+    async def _refresh(self, query: str, max_results: int, cached: List[Dict[str, Any]], complete: bool) -> None:
+        # Callers were already served stale results, so refreshes are bulk work whoever triggered them
+        with request_priority(PRIORITY_BULK):
+            async for _ in self._fetch(query, max_results, cached, complete):
+                pass
+
+    async def _fetch(
+        self,
+        query: str,
+        max_results: int,
+        cached: Optional[List[Dict[str, Any]]] = None,
+        complete: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetches from arXiv and updates the cache. Given a previously cached list, only
+        submissions since the query's high-water mark are requested and merged in front of it.
+        """
+        key = self._cache_key(query)
+        since = await self.high_water.get(key) if cached else None
+        if since:
+            logger.info(f"ArXiv delta fetch for query: {query} (since {since})")
+            search_query = _submitted_since(query, since)
+        else:
+            cached = []
+            search_query = query
+
+        if not arxiv_breaker.allow():
+            raise CircuitOpenError("ArXiv circuit breaker is open; not querying upstream")
+
+        page_size = getattr(self.client, "page_size", 100)
+        fresh: List[Dict[str, Any]] = []
+        saved = 0
+        reported = False
+        try:
+            async for paper in self._stream_search(search_query, max_results):
+                if not reported:
+                    arxiv_breaker.record_success()
+                    reported = True
+                fresh.append(paper)
+                if len(fresh) % page_size == 0:
+                    await self._save_to_cache(query, _merge_results(fresh, cached))
+                    saved = len(fresh)
+                yield paper
+            if not reported:
+                arxiv_breaker.record_success()
+                reported = True
+        except Exception as exc:
+            reported = True
+            arxiv_breaker.record_failure(exc)
+            await self.failures.set(key, str(exc))
+            raise
+        finally:
+            if not reported:
+                # Cancelled or closed before arXiv answered: free the probe instead of leaving it held
+                arxiv_breaker.release()
+
+        # A full delta page may have skipped papers between it and the old list; keep only the delta then.
+        if len(fresh) >= max_results:
+            cached = []
+        # Running out before max_results means every match is cached (a delta inherits the old list's flag).
+        complete = len(fresh) < max_results and (complete or not since)
+        merged = _merge_results(fresh, cached)
+        complete = complete and len(merged) < ARXIV_MAX_RETAINED_RESULTS
+        if len(fresh) != saved or complete or (cached and not fresh):
+            await self._save_to_cache(query, merged, complete)
+
+        seen = {_paper_id(p) for p in fresh}
+        for paper in cached[:max(0, max_results - len(fresh))]:
+            if _paper_id(paper) not in seen:
+                yield paper
 
     @traceable
     async def search_papers(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
         Searches ArXiv for papers matching the query.
+        Concurrent calls for the same canonical query and size share one search.
         """
         logger.info(f"Searching ArXiv for: {query}")
-        
-        cached = await self._get_from_cache(query)
-        if cached:
-            logger.info(f"ArXiv cache hit for query: {query}")
-            return cached
-            
+
+        async def _collect() -> List[Dict[str, Any]]:
+            return [paper async for paper in self.stream_papers(query, max_results=max_results)]
+
         try:
-            # Add timeout handling implicitly via client if possible, or just wrap
-            # arxiv package doesn't expose timeout easily in Search, but we can rely on default.
-            # User requested "timeout handling".
-            # We can wrap in asyncio.wait_for if async, but this is sync.
-            # Let's just add normalization here.
-            
-            search = arxiv.Search(
-                query=query,
-                max_results=max_results,
-                sort_by=arxiv.SortCriterion.SubmittedDate
-            )
-            
-            def _fetch_results():
-                results_list = []
-                for result in self.client.results(search):
-                    # Normalize summary
-                    summary = result.summary.replace("\n", " ").strip()
-                    # Remove latex (simple heuristic)
-                    summary = summary.replace("$", "")
-                    
-                    results_list.append({
-                        "title": result.title,
-                        "summary": summary,
-                        "url": result.entry_id,
-                        "published": result.published.isoformat()
-                    })
-                return results_list
-
-            results = await asyncio.to_thread(_fetch_results)
-            
-            if results:
-                await self._save_to_cache(query, results)
-                
-            return results
+            papers = await search_flight.do((self._cache_key(query), max_results), _collect)
         except Exception as e:
             logger.error(f"ArXiv search failed: {e}")
             return []
+        # Each caller gets its own list; the paper dicts themselves are shared and read-only
+        return list(papers)
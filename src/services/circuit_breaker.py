@@ -0,0 +1,148 @@
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from src.services.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Process-wide closed/open/half-open breaker for one upstream service.
+
+    After `failure_threshold` consecutive failures the breaker opens and `allow()` rejects
+    calls for `reset_timeout` seconds. It then lets a single probe through (half-open):
+    success closes it, failure re-opens it. A probe that never reports back is replaced
+    after another `reset_timeout`, or at once if it calls `release()`. Thread-safe, so blocking clients on worker threads can share it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.failures = 0
+        self.rejections = 0
+        self.times_opened = 0
+
+    def _transition(self, state: CircuitState) -> None:
+        if state != self._state:
+            log = logger.warning if state == CircuitState.OPEN else logger.info
+            log(f"Circuit breaker '{self.name}': {self._state.value} -> {state.value}")
+            self._state = state
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    @property
+    def rejecting(self) -> bool:
+        """True while open and still inside the reset timeout (no probe would be allowed)."""
+        with self._lock:
+            return self._state == CircuitState.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Returns whether a call may go upstream now; rejected calls should use fallbacks."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CircuitState.OPEN and now - self._opened_at >= self.reset_timeout:
+                self._transition(CircuitState.HALF_OPEN)
+                self._probe_started = None
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN and (
+                self._probe_started is None or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            self._probe_started = None
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self, error: Any = None) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != CircuitState.OPEN:
+                    self.times_opened += 1
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+                if error is not None:
+                    logger.warning(f"Circuit breaker '{self.name}' tripped by: {error}")
+                self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """Ends a call that stopped without an outcome (e.g. cancelled), so a new probe may start at once."""
+        with self._lock:
+            self._probe_started = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_started = None
+            self._transition(CircuitState.CLOSED)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejections": self.rejections,
+                "times_opened": self.times_opened,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_guard = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 60.0) -> CircuitBreaker:
+    """Returns the process-wide breaker for `name`, creating it with these settings on first use."""
+    with _breakers_guard:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State and counters for every circuit breaker in this process."""
+    with _breakers_guard:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def reset_breakers() -> None:
+    """Closes every breaker (e.g. between tests or after an operator intervention)."""
+    with _breakers_guard:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
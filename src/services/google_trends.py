@@ -1,81 +1,195 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pytrends.request import TrendReq
 from langsmith import traceable
-from typing import List
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Dict, List, Optional, Tuple
+from src.services.circuit_breaker import get_breaker
 from src.services.logger import get_logger
-from src.services.utils import load_cache, save_cache
-import datetime
+from src.services.query import canonical_terms, canonicalization_stats, seed_set_key
+from src.services.singleflight import SingleFlight
+from src.services.utils import BackgroundRefresher, SQLiteCache
 
 logger = get_logger(__name__)
 
+TRENDS_CACHE_TTL_SECONDS = 12 * 60 * 60
+# One entry per canonical seed set; the least recently refreshed sets are evicted first.
+TRENDS_CACHE_MAX_ENTRIES = 256
+# Seeds used when a caller has none; trend_scanner and prefetch share them, and so one cache entry.
+DEFAULT_SEEDS = ["AI", "LLM", "Machine Learning"]
+# A failed fetch is not retried upstream for this long (Google rate limits are sticky).
+TRENDS_FAILURE_TTL_SECONDS = 5 * 60
+# Results missing some seeds' payloads are served only this long before being refetched.
+TRENDS_PARTIAL_TTL_SECONDS = 5 * 60
+
+# pytrends accepts at most five keywords per payload.
+PYTRENDS_MAX_KEYWORDS = 5
+TOP_QUERIES_PER_SEED = 5
+# Concurrent payloads are capped to stay under Google's rate limits.
+TRENDS_MAX_CONCURRENT_PAYLOADS = 3
+
+refresher = BackgroundRefresher("trends")
+fetch_flight = SingleFlight("trends")
+# Google rate limits persist for minutes, so stop calling after a few failures and probe later.
+trends_breaker = get_breaker("google_trends", failure_threshold=3, reset_timeout=120)
+_executor = ThreadPoolExecutor(max_workers=TRENDS_MAX_CONCURRENT_PAYLOADS, thread_name_prefix="pytrends")
+
+
+def _merge_ranked(seeds: List[str], ranked: Dict[str, List[Tuple[str, float]]]) -> List[str]:
+    """
+    Interleaves each seed's related queries by rank (every seed's #1, then every #2, ...),
+    ordering queries of equal rank by interest value, so no single seed crowds out the rest.
+    """
+    merged: List[str] = []
+    depth = max((len(queries) for queries in ranked.values()), default=0)
+    for rank in range(depth):
+        tier = [ranked[seed][rank] for seed in seeds if seed in ranked and rank < len(ranked[seed])]
+        tier.sort(key=lambda item: item[1], reverse=True)  # stable: seed order breaks ties
+        merged.extend(query for query, _ in tier)
+    return merged
+
 class GoogleTrendsService:
     def __init__(self):
-        self.cache_file = "trends_cache.json"
+        self.cache = SQLiteCache("trends", ttl=TRENDS_CACHE_TTL_SECONDS, max_entries=TRENDS_CACHE_MAX_ENTRIES)
+        self.failures = SQLiteCache("trends_failures", ttl=TRENDS_FAILURE_TTL_SECONDS)
 
-    def _fetch_pytrends_sync(self, keywords: List[str]) -> List[str]:
-        """Encapsulated blocking logic for pytrends to run in a thread."""
-        trending_list = []
-        try:
-            # Initialize pytrends here to avoid blocking __init__
-            pytrends = TrendReq(hl='en-US', tz=360)
-            
-            # This is a simplified usage. Real usage might involve related_queries or trending_searches
-            # For stability, we'll try to get related queries for our seed keywords
-            pytrends.build_payload(kw_list=keywords[:1], timeframe='now 7-d') # Limit to 1 for stability
-            related = pytrends.related_queries()
-            
-            for kw in keywords[:1]:
-                if related and kw in related and "top" in related[kw]:
-                    top = related[kw]['top']
-                    if top is not None:
-                        trending_list.extend(top['query'].head(5).tolist())
-            return trending_list
-        except Exception as e:
-            logger.error(f"Error executing synchronous pytrends call: {e}")
-            return []
+    def _fetch_pytrends_sync(self, keywords: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Encapsulated blocking logic for one pytrends payload (at most PYTRENDS_MAX_KEYWORDS seeds),
+        run on the trends executor. Returns each seed's top related queries with their
+        relative interest. Raises on upstream errors.
+        """
+        # Initialize pytrends here to avoid blocking __init__
+        pytrends = TrendReq(hl='en-US', tz=360)
+
+        # This is a simplified usage. Real usage might involve related_queries or trending_searches
+        # For stability, we'll try to get related queries for our seed keywords
+        pytrends.build_payload(kw_list=keywords, timeframe='now 7-d')
+        related = pytrends.related_queries()
+
+        ranked: Dict[str, List[Tuple[str, float]]] = {}
+        for kw in keywords:
+            if related and kw in related and "top" in related[kw]:
+                top = related[kw]['top']
+                if top is not None:
+                    queries = top['query'].head(TOP_QUERIES_PER_SEED).tolist()
+                    try:
+                        values = top['value'].head(TOP_QUERIES_PER_SEED).tolist()
+                    except (KeyError, TypeError):
+                        values = [0.0] * len(queries)  # no interest scores; keep Google's order
+                    ranked[kw] = list(zip(queries, values))
+        return ranked
+
+    async def _fetch_pytrends(self, keywords: List[str]) -> Tuple[List[str], bool]:
+        """
+        Splits the seeds into payloads of up to PYTRENDS_MAX_KEYWORDS, fetches them concurrently
+        on the bounded trends executor and merges the results. Returns (merged queries, partial),
+        where `partial` means some payloads failed. Raises only if every payload fails.
+        """
+        batches = [keywords[i:i + PYTRENDS_MAX_KEYWORDS] for i in range(0, len(keywords), PYTRENDS_MAX_KEYWORDS)]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(_executor, self._fetch_pytrends_sync, batch) for batch in batches),
+            return_exceptions=True,
+        )
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures and len(failures) == len(results):
+            raise failures[0]
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Trends payload {batch} failed: {result}")
+
+        ranked: Dict[str, List[Tuple[str, float]]] = {}
+        for result in results:
+            if not isinstance(result, BaseException):
+                ranked.update(result)
+        return _merge_ranked(keywords, ranked), bool(failures)
 
     @traceable
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def get_trending_topics(self, keywords: List[str] = None) -> List[str]:
         """
         Fetches trending topics related to the provided keywords or defaults to ML/AI.
-        Uses caching to avoid excessive API calls.
+        Uses caching to avoid excessive API calls: an expired entry is returned at once
+        and refreshed in the background. After a failed fetch for these seeds, or while the
+        Google Trends circuit breaker is open, cached data or the seeds as given are returned
+        without calling Google Trends.
         """
-        # Check cache first (12-hour cache)
-        now = datetime.datetime.now()
-        cache = await load_cache(self.cache_file)
-        
-        if cache.get("timestamp"):
-            cached_time = datetime.datetime.fromisoformat(cache["timestamp"])
-            if (now - cached_time) < datetime.timedelta(hours=12) and cache.get("topics"):
-                logger.info("Returning cached trending topics.")
-                return cache["topics"]
+        # Default keywords if none provided
+        raw_keywords = keywords or DEFAULT_SEEDS
+        # Case/whitespace variants and ordering of seeds are the same Trends query
+        keywords = canonical_terms(raw_keywords)
+        key = self._cache_key(keywords)
+
+        # Check cache first (12-hour TTL)
+        entry = await self.cache.get_entry(key)
+        hit = entry is not None and bool(entry.value) and not entry.expired
+        canonicalization_stats.record("trends", ", ".join(raw_keywords), key, hit)
+        if hit:
+            logger.info("Returning cached trending topics.")
+            return entry.value
+
+        failure = await self.failures.get(key)
+        if failure is None and trends_breaker.rejecting:
+            failure = "circuit breaker open"
+        if entry is not None and entry.value:
+            if failure is None:
+                logger.info("Returning stale trending topics; refreshing in background.")
+                refresher.schedule(key, lambda: self._fetch_coalesced(keywords))
+            return entry.value
+        if failure is not None:
+            logger.warning(f"Google Trends failed recently ({failure}); using seeds.")
+            return list(raw_keywords)
+
+        trending = await self._fetch_coalesced(keywords)
+        return trending if trending is not None else list(raw_keywords)
+
+    async def _fetch_coalesced(self, keywords: List[str]) -> Optional[List[str]]:
+        # Concurrent misses (and background refreshes) for the same seed set share one upstream fetch
+        trending = await fetch_flight.do(self._cache_key(keywords), lambda: self._fetch_and_store(keywords))
+        return list(trending) if trending is not None else None
+
+    @staticmethod
+    def _cache_key(keywords: List[str]) -> str:
+        return seed_set_key(keywords)
+
+    async def _fetch_and_store(self, keywords: List[str]) -> Optional[List[str]]:
+        """Fetches and caches the topics for canonical `keywords`; None when Trends could not be asked."""
+        key = self._cache_key(keywords)
+        if not trends_breaker.allow():
+            logger.warning("Google Trends circuit breaker is open; using seeds.")
+            return None
 
         logger.info("Fetching new trending topics from Google Trends.")
-        
-        # Default keywords if none provided
-        if not keywords:
-            keywords = ["Machine Learning", "Artificial Intelligence", "Generative AI", "LLM"]
 
         trending_list = []
         try:
-            # Run blocking pytrends logic in thread
-            fetched = await asyncio.to_thread(self._fetch_pytrends_sync, keywords)
-            trending_list.extend(fetched)
-            
+            # Blocking pytrends payloads run on the trends executor
+            fetched, partial = await self._fetch_pytrends(keywords)
+        except Exception as e:
+            logger.error(f"Error fetching trends: {e}")
+            trends_breaker.record_failure(e)
+            await self.failures.set(key, str(e))
+            return None  # callers fall back to their seeds
+        if partial:
+            # Some payloads were rejected upstream: not a healthy call, and not a complete answer
+            trends_breaker.record_failure("some Trends payloads failed")
+        else:
+            trends_breaker.record_success()
+        trending_list.extend(fetched)
+
+        try:
             # Fallback if empty or API issues
             if not trending_list:
                 logger.warning("No trending data found, using defaults.")
                 trending_list = keywords
 
-            # Deduplicate and normalize
-            trending_list = list(set([t.lower() for t in trending_list]))
+            # Deduplicate and normalize, keeping rank order
+            trending_list = list(dict.fromkeys(t.lower() for t in trending_list))
             
-            # Update cache
-            await save_cache(self.cache_file, {"timestamp": now.isoformat(), "topics": trending_list})
+            # Update cache; a partial result is refetched soon instead of hiding seeds for the full TTL
+            await self.cache.set(key, trending_list, ttl=TRENDS_PARTIAL_TTL_SECONDS if partial else None)
+            canonicalization_stats.record_write("trends", ", ".join(keywords), key)
             return trending_list
 
         except Exception as e:
-            logger.error(f"Error fetching trends: {e}")
-            return keywords # Return seeds on failure
+            logger.error(f"Error caching trends: {e}")
+            return trending_list or keywords
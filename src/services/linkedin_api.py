@@ -1,83 +1,266 @@
+import asyncio
+import importlib.util
+import threading
+import time
 import urllib.parse
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional, Tuple
 import httpx
+from pydantic import BaseModel
+from src.config.settings import settings
 from src.services.logger import get_logger
+from src.services.singleflight import SingleFlight
+from src.services.utils import SQLiteCache, hash_text
 
 logger = get_logger(__name__)
 
+LINKEDIN_TIMEOUT = httpx.Timeout(10.0, connect=10.0)
+LINKEDIN_POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=120.0)
+# HTTP/2 needs the optional `h2` package (installed by `httpx[http2]`).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# A member's URN never changes; the TTL only bounds how long a stale token's entry lingers.
+LINKEDIN_URN_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+# Responses meaning the token (and anything resolved with it) can no longer be trusted.
+AUTH_FAILURE_STATUSES = (401, 403)
+POST_FOOTER = "\n\nbrought to you by langgraph and agent inbox\nhttps://github.com/coolrboolr/linkedin-poster"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def token_key(access_token: str) -> str:
+    """Non-secret identifier for an access token (not the member: a refreshed token gets a new one)."""
+    return hash_text(access_token)
+
+
+class PublishResult(BaseModel):
+    """Outcome of one publish attempt, with enough detail for a caller to decide on retries."""
+    ok: bool
+    post_id: Optional[str] = None
+    status_code: Optional[int] = None  # None when no response arrived (network error)
+    retry_after: Optional[float] = None  # from a 429's Retry-After header
+    error: Optional[str] = None
+    duplicate: bool = False  # already published earlier; `post_id` is the original post
+
+    @property
+    def retryable(self) -> bool:
+        """Network errors, throttling and server errors may succeed later; other 4xx will not."""
+        return not self.ok and (self.status_code is None or self.status_code == 429 or self.status_code >= 500)
+
+
+def _failure(response: Optional[httpx.Response], error: str) -> PublishResult:
+    if response is None:
+        return PublishResult(ok=False, error=error)
+    retry_after = parse_retry_after(response.headers.get("Retry-After")) if response.status_code == 429 else None
+    return PublishResult(ok=False, status_code=response.status_code, retry_after=retry_after, error=error)
+
+# Concurrent publishes of the same content by the same account share one POST.
+publish_flight = SingleFlight("linkedin_publish")
+
+# One pooled client per event loop: httpx connections cannot be shared across loops.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_clients_guard = threading.Lock()
+# Per-loop async generators whose cleanup closes that loop's client (see _close_on_loop_shutdown).
+_shutdown_hooks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncIterator[None]]" = weakref.WeakKeyDictionary()
+
+
+async def _close_on_loop_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """
+    Parks at `yield` for the life of the loop. `asyncio.run` (and servers built on it)
+    finalizes pending async generators when the loop shuts down, which runs the `finally`
+    and releases the pool's keep-alive connections.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _start(hook: AsyncIterator[None]) -> None:
+    await hook.__anext__()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-lifetime LinkedIn HTTP client for the running event loop,
+    keeping TLS connections alive (multiplexed over HTTP/2 when available) between calls.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_guard:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=LINKEDIN_TIMEOUT, limits=LINKEDIN_POOL_LIMITS, http2=HTTP2_AVAILABLE)
+            _clients[loop] = client
+            hook = _shutdown_hooks[loop] = _close_on_loop_shutdown(client)
+            loop.create_task(_start(hook))
+        return client
+
+
+async def aclose_http_client() -> None:
+    """Closes the running loop's pooled client now; otherwise it is closed when its loop shuts down."""
+    with _clients_guard:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
 class LinkedInService:
-    def __init__(self, client_id: str = "", client_secret: str = "", access_token: str = "", author_urn: str = ""):
+    def __init__(
+        self,
+        client_id: str = "",
+        client_secret: str = "",
+        access_token: str = "",
+        author_urn: str = "",
+        http_client: Optional[httpx.AsyncClient] = None,
+        api_base: Optional[str] = None,
+    ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.access_token = access_token
         self.author_urn = author_urn
+        self.api_base = (api_base or settings.linkedin_api_base).rstrip("/")
+        # Cheap to construct: connections live in the shared pool unless a client is injected.
+        self._http_client = http_client
+        # Resolved author URNs, keyed by a hash of the access token (never the token itself).
+        self.urn_cache = SQLiteCache("linkedin_urn", ttl=LINKEDIN_URN_CACHE_TTL_SECONDS)
+        # Posts already published, keyed by author URN and content hash; kept indefinitely.
+        self.published = SQLiteCache("linkedin_published")
 
-    async def post_update(self, text: str) -> bool:
-        """
-        Posts an update to LinkedIn.
-        """
-        # Append footer
-        footer = "\n\nbrought to you by langgraph and agent inbox\nhttps://github.com/coolrboolr/linkedin-poster"
-        full_text = text + footer
+    @property
+    def token_key(self) -> str:
+        return token_key(self.access_token)
 
-        if not self.access_token:
-            logger.warning("LinkedIn access token not set. Skipping actual API call.")
-            logger.info(f"--- MOCK LINKEDIN POST ---\n{full_text}\n--------------------------")
-            return True
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
 
-        url = "https://api.linkedin.com/v2/ugcPosts"
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.access_token}",
             "X-Restli-Protocol-Version": "2.0.0",
             "Content-Type": "application/json",
         }
-        
-        # We need the user's Person URN to post.
-        # Check if explicitly provided first
-        author_urn = self.author_urn
+
+    async def author(self) -> Tuple[Optional[str], Optional[httpx.Response]]:
+        """
+        The member URN this service posts as: configured, cached for the token, or resolved
+        (and cached). Returns (urn, last response of a failed lookup).
+        """
+        known = await self._known_author()
+        if known:
+            return known, None
+        author_urn, last_response = await self._resolve_author_urn(self._headers())
+        if author_urn:
+            await self.urn_cache.set(self.token_key, author_urn)
+        return author_urn, last_response
+
+    async def _known_author(self) -> Optional[str]:
+        """The configured or cached author URN, without calling LinkedIn."""
+        if self.author_urn:
+            return self.author_urn
+        return await self.urn_cache.get(self.token_key)
+
+    async def account(self) -> str:
+        """
+        Identifies the member for publish quotas without calling LinkedIn: the configured or
+        cached author URN, which stays the same across token refreshes, else the token's key
+        (`OutboxWorker` re-keys those posts once a delivery resolves the URN).
+        """
+        return await self._known_author() or self.token_key
+
+    async def _resolve_author_urn(self, headers: Dict[str, str]) -> Tuple[Optional[str], Optional[httpx.Response]]:
+        """Looks up the member's Person URN; returns (urn, last response)."""
+        client = self.http_client
+        author_urn = None
         last_response = None
-        timeout = httpx.Timeout(10.0, connect=10.0)
 
         # Prefer OpenID Connect userinfo (recommended), with a legacy /me fallback.
         # Method 1: /userinfo (requires openid profile)
+        try:
+            userinfo_response = await client.get(f"{self.api_base}/v2/userinfo", headers=headers)
+            last_response = userinfo_response
+            if userinfo_response.status_code == 200:
+                subject = userinfo_response.json().get("sub")
+                if subject:
+                    author_urn = f"urn:li:person:{subject}"
+            else:
+                logger.warning(f"Userinfo failed: {userinfo_response.status_code} {userinfo_response.text}")
+        except Exception as e:
+            logger.warning(f"Userinfo exception: {e}")
+
+        # Method 2: /me (legacy; requires r_liteprofile or r_basicprofile)
         if not author_urn:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                try:
-                    userinfo_response = await client.get(
-                        "https://api.linkedin.com/v2/userinfo",
-                        headers=headers,
-                    )
-                    last_response = userinfo_response
-                    if userinfo_response.status_code == 200:
-                        subject = userinfo_response.json().get("sub")
-                        if subject:
-                            author_urn = f"urn:li:person:{subject}"
-                    else:
-                        logger.warning(f"Userinfo failed: {userinfo_response.status_code} {userinfo_response.text}")
-                except Exception as e:
-                    logger.warning(f"Userinfo exception: {e}")
-
-                # Method 2: /me (legacy; requires r_liteprofile or r_basicprofile)
-                if not author_urn:
-                    try:
-                        me_response = await client.get(
-                            "https://api.linkedin.com/v2/me",
-                            headers=headers,
-                        )
-                        last_response = me_response
-                        if me_response.status_code == 200:
-                            member_id = me_response.json().get("id")
-                            if member_id:
-                                author_urn = f"urn:li:person:{member_id}"
-                        else:
-                            logger.warning(f"Me endpoint failed: {me_response.status_code} {me_response.text}")
-                    except Exception as e:
-                        logger.warning(f"Me endpoint exception: {e}")
+            try:
+                me_response = await client.get(f"{self.api_base}/v2/me", headers=headers)
+                last_response = me_response
+                if me_response.status_code == 200:
+                    member_id = me_response.json().get("id")
+                    if member_id:
+                        author_urn = f"urn:li:person:{member_id}"
+                else:
+                    logger.warning(f"Me endpoint failed: {me_response.status_code} {me_response.text}")
+            except Exception as e:
+                logger.warning(f"Me endpoint exception: {e}")
 
+        return author_urn, last_response
+
+    async def post_update(self, text: str) -> bool:
+        """
+        Posts an update to LinkedIn.
+        """
+        return (await self.publish(text)).ok
+
+    async def publish(self, text: str) -> PublishResult:
+        """
+        Posts an update to LinkedIn and reports the post id, or why it failed.
+
+        Idempotent per member: content the author already published (e.g. by a replayed
+        thread, a retried outbox entry or under an earlier token) is not posted again; the
+        original post id is returned.
+        """
+        if not self.access_token:
+            logger.warning("LinkedIn access token not set. Skipping actual API call.")
+            logger.info(f"--- MOCK LINKEDIN POST ---\n{text + POST_FOOTER}\n--------------------------")
+            return PublishResult(ok=True)
+
+        author_urn, last_response = await self.author()
         if not author_urn:
             logger.error(
                 "Failed to fetch LinkedIn profile ID. Ensure token has 'openid profile' (or legacy r_liteprofile) scope."
             )
-            return False
+            return _failure(last_response, "Could not resolve the author URN")
+
+        key = f"{author_urn}:{hash_text(text.strip())}"
+        return await publish_flight.do(key, lambda: self._publish_once(key, author_urn, text))
+
+    async def _publish_once(self, key: str, author_urn: str, text: str) -> PublishResult:
+        original = await self.published.get(key)
+        if original is not None:
+            logger.info(f"Content already published to LinkedIn ({original.get('post_id')}); not posting again.")
+            return PublishResult(ok=True, post_id=original.get("post_id"), duplicate=True)
+
+        result = await self._post(author_urn, text)
+        if result.ok:
+            await self.published.set(key, {"post_id": result.post_id, "published_at": time.time()})
+        return result
+
+    async def _post(self, author_urn: str, text: str) -> PublishResult:
+        full_text = text + POST_FOOTER
+        url = f"{self.api_base}/v2/ugcPosts"
+        last_response = None
 
         payload = {
             "author": author_urn,
@@ -95,25 +278,28 @@ class LinkedInService:
             }
         }
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        try:
+            response = await self.http_client.post(url, headers=self._headers(), json=payload)
+            last_response = response
+            if response.status_code in AUTH_FAILURE_STATUSES:
+                # Token revoked or re-scoped: re-resolve the author on the next attempt
+                await self.urn_cache.delete(self.token_key)
+            response.raise_for_status()
+            post_id = None
             try:
-                response = await client.post(url, headers=headers, json=payload)
-                last_response = response
-                response.raise_for_status()
+                post_id = response.json().get("id")
+            except Exception:
                 post_id = None
-                try:
-                    post_id = response.json().get("id")
-                except Exception:
-                    post_id = None
-                if post_id:
-                    logger.info(f"Successfully posted to LinkedIn: {post_id}")
-                else:
-                    logger.info("Successfully posted to LinkedIn.")
-                return True
-            except Exception as e:
-                response_text = last_response.text if last_response is not None else "N/A"
-                logger.error(f"Failed to post to LinkedIn: {e}. Response: {response_text}")
-                return False
+            if post_id:
+                logger.info(f"Successfully posted to LinkedIn: {post_id}")
+            else:
+                logger.info("Successfully posted to LinkedIn.")
+            return PublishResult(ok=True, post_id=post_id, status_code=response.status_code)
+        except Exception as e:
+            response_text = last_response.text if last_response is not None else "N/A"
+            logger.error(f"Failed to post to LinkedIn: {e}. Response: {response_text}")
+            # Only an HTTP error status carries a response; anything else never reached LinkedIn
+            return _failure(e.response if isinstance(e, httpx.HTTPStatusError) else None, str(e))
 
     def get_oauth_url(self) -> str:
         """Returns the OAuth authorization URL."""
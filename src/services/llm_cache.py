@@ -0,0 +1,91 @@
+"""
+Opt-in, content-addressed cache for structured LLM calls.
+
+A response is keyed by a hash of (model, rendered prompt messages, output schema), so a
+resumed thread or a re-entered planning loop that sends the same prompt gets the stored
+answer without a model call. Only deterministic-enough nodes should opt in, by name, via
+LLM_CACHE_NODES (e.g. `rank_papers,update_memory`).
+"""
+import json
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from src.config.settings import settings
+from src.services.logger import get_logger
+from src.services.utils import SQLiteCache, hash_text
+
+logger = get_logger(__name__)
+
+LLM_CACHE_NAMESPACE = "llm_responses"
+
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def llm_cache_enabled(node: str) -> bool:
+    nodes = {name.strip() for name in (settings.llm_cache_nodes or "").split(",")}
+    return node in nodes
+
+
+def get_llm_cache() -> SQLiteCache:
+    return SQLiteCache(
+        LLM_CACHE_NAMESPACE,
+        ttl=settings.llm_cache_ttl_seconds,
+        max_entries=settings.llm_cache_max_entries,
+        max_bytes=settings.llm_cache_max_bytes,
+    )
+
+
+def llm_cache_key(model: str, messages: Any, schema: Type[BaseModel]) -> str:
+    rendered = [
+        {"type": getattr(message, "type", type(message).__name__), "content": getattr(message, "content", message)}
+        for message in messages
+    ]
+    payload = {
+        "model": model,
+        "messages": rendered,
+        "schema": f"{schema.__module__}.{schema.__qualname__}",
+        "schema_json": schema.model_json_schema(),
+    }
+    return hash_text(json.dumps(payload, sort_keys=True, default=str))
+
+
+async def cached_structured_ainvoke(
+    node: str,
+    prompt: Any,
+    llm: Any,
+    inputs: Dict[str, Any],
+    schema: Type[BaseModel],
+    model: Optional[str] = None,
+) -> Any:
+    """
+    Runs `prompt | llm` on `inputs`, where `llm` returns `schema` instances. When `node`
+    has the cache enabled, an identical earlier call is answered from disk instead.
+    """
+    if not llm_cache_enabled(node):
+        return await (prompt | llm).ainvoke(inputs)
+
+    messages = prompt.format_messages(**inputs)
+    key = llm_cache_key(model or settings.llm_model, messages, schema)
+    cache = get_llm_cache()
+    cached = await cache.get(key)
+    if cached is not None:
+        try:
+            result = schema.model_validate(cached)
+        except Exception as exc:
+            logger.warning(f"Discarding unreadable cached {schema.__name__} for {node}: {exc}")
+        else:
+            _stats["hits"] += 1
+            logger.info(f"LLM cache hit for {node}.")
+            return result
+
+    _stats["misses"] += 1
+    result = await llm.ainvoke(messages)
+    if isinstance(result, BaseModel):
+        await cache.set(key, result.model_dump(mode="json"))
+    return result
+
+
+def llm_cache_stats() -> Dict[str, int]:
+    """Hits and misses of the LLM response cache in this process."""
+    return dict(_stats)
@@ -0,0 +1,90 @@
+"""
+Token streaming for the drafting nodes.
+
+`stream_chat_response` runs a chat model with `astream` instead of `ainvoke`, so tokens
+reach LangGraph's `messages` stream mode as they arrive, and forwards each text delta
+to the `custom` stream mode as `{"node": ..., "token": ...}`. The aggregated message it
+returns matches what `ainvoke` would have returned, so callers build the same state.
+Clients that want time-to-first-token consume e.g.
+`graph.astream(..., stream_mode=["updates", "custom"])`.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from langgraph.config import get_stream_writer
+
+from src.services.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def stream_writer() -> Optional[Callable[[Dict[str, Any]], None]]:
+    """LangGraph's custom stream writer, or None when called outside a graph run."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None
+
+
+def emit(node: str, **payload: Any) -> None:
+    """Sends `{"node": node, **payload}` to the custom stream mode, if a graph run is listening."""
+    writer = stream_writer()
+    if writer is not None:
+        writer({"node": node, **payload})
+
+
+def _text_of(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # Content blocks (e.g. from Responses-style APIs): keep only the text parts
+    return "".join(
+        block.get("text", "") for block in content if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+async def stream_chat_response(
+    llm: Any,
+    messages: List[Any],
+    node: str,
+    on_text: Optional[Callable[[str], None]] = None,
+) -> Any:
+    """
+    Streams `llm` on `messages`, emitting each text delta for `node` (and passing it to
+    `on_text`), and returns the aggregated response message, tool calls included.
+
+    Models that are not Runnables (test doubles that only implement `ainvoke`) are
+    invoked as before.
+    """
+    if not isinstance(llm, Runnable):
+        return await llm.ainvoke(messages)
+
+    writer = stream_writer()
+    response = None
+    async for chunk in llm.astream(messages):
+        response = chunk if response is None else response + chunk
+        text = _text_of(chunk)
+        if not text:
+            continue
+        if writer is not None:
+            writer({"node": node, "token": text})
+        if on_text is not None:
+            on_text(text)
+    if response is None:
+        logger.warning(f"{node}: model stream ended without output.")
+        return AIMessage(content="")
+    return response
+
+
+async def streamed_ainvoke(
+    node: str,
+    prompt: Any,
+    llm: Any,
+    inputs: Dict[str, Any],
+    on_text: Optional[Callable[[str], None]] = None,
+) -> Any:
+    """`(prompt | llm).ainvoke(inputs)`, streaming the model's tokens for `node` when it can."""
+    if not isinstance(llm, Runnable):
+        return await (prompt | llm).ainvoke(inputs)
+    return await stream_chat_response(llm, prompt.format_messages(**inputs), node, on_text)
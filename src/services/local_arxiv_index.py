@@ -0,0 +1,371 @@
+"""
+Offline arXiv search backed by a SQLite FTS5 inverted index with BM25 ranking.
+
+Build the index from bulk metadata dumps, then point ARXIV_INDEX_PATH at it:
+
+    python -m src.services.local_arxiv_index ingest arxiv-metadata-oai-snapshot.json
+    python -m src.services.local_arxiv_index search 'all:"diffusion models"'
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langsmith import traceable
+
+from src.config.settings import settings
+from src.core.paths import DATA_DIR
+from src.services.logger import get_logger
+from src.services.query import OPERATORS, BoolOp, Node, QuerySyntaxError, Term, parse_query
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_PATH = DATA_DIR / "arxiv_index.sqlite3"
+
+# BM25 column weights for (title, summary, authors): title matches count most.
+BM25_WEIGHTS = (4.0, 1.0, 0.5)
+INGEST_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    rowid INTEGER PRIMARY KEY,
+    arxiv_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    categories TEXT,
+    published TEXT,
+    url TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, summary, authors,
+    content='papers', content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts(rowid, title, summary, authors)
+    VALUES (new.rowid, new.title, new.summary, new.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary, authors)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary, authors)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.authors);
+    INSERT INTO papers_fts(rowid, title, summary, authors)
+    VALUES (new.rowid, new.title, new.summary, new.authors);
+END;
+"""
+
+# arXiv API field prefixes -> FTS5 column filters (None searches every column).
+_FIELD_COLUMNS = {
+    "ti": "title",
+    "abs": "summary",
+    "au": "authors",
+    "all": None,
+}
+_WORD_RE = re.compile(r"\w+")
+
+
+def _render_fts(node: Node) -> Optional[str]:
+    if isinstance(node, Term):
+        words = [] if node.range else _WORD_RE.findall(node.text)
+        if not words:
+            return None
+        # Quoted phrases stay phrases; free text (e.g. a title) matches each word
+        term = '"' + " ".join(words) + '"' if node.phrase else " ".join(f'"{w}"' for w in words)
+        column = _FIELD_COLUMNS.get((node.field or "all").lower())
+        if not column:
+            return term
+        # A column filter binds to one phrase only, so several words need parentheses
+        return f"{column} : ({term})" if len(words) > 1 and not node.phrase else f"{column} : {term}"
+    rendered = [
+        f"({text})" if isinstance(child, BoolOp) else text
+        for child, text in ((child, _render_fts(child)) for child in node.operands)
+        if text is not None
+    ]
+    if node.op == "ANDNOT":
+        if _render_fts(node.operands[0]) is None:
+            return None
+        return " NOT ".join(rendered)
+    return f" {node.op} ".join(rendered) or None
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Translates an arXiv API query (e.g. `all:"LLM" OR ti:agents ANDNOT abs:survey`)
+    into an FTS5 MATCH expression.
+    """
+    try:
+        return _render_fts(parse_query(query)) or ""
+    except QuerySyntaxError:
+        return " ".join(f'"{w}"' for w in _WORD_RE.findall(query) if w not in OPERATORS)
+
+
+def _clean_text(text: str) -> str:
+    # Same normalization as ArxivService results
+    return " ".join((text or "").split()).replace("$", "")
+
+
+def _record(arxiv_id: str, title: str, summary: str, authors: List[str],
+            categories: str = "", published: str = "") -> Optional[Dict[str, Any]]:
+    arxiv_id = (arxiv_id or "").strip()
+    if not arxiv_id or not title:
+        return None
+    return {
+        "arxiv_id": arxiv_id,
+        "title": " ".join(title.split()),
+        "summary": _clean_text(summary),
+        "authors": [a for a in (" ".join(name.split()) for name in authors) if a],
+        "categories": categories or "",
+        "published": published or "",
+        "url": f"http://arxiv.org/abs/{arxiv_id}",
+    }
+
+
+def _parse_date(value: str) -> str:
+    """Normalizes RFC 2822 (Kaggle `versions`) or ISO dates to ISO 8601."""
+    if not value:
+        return ""
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+def parse_jsonl_records(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parses Kaggle-style arXiv metadata (one JSON object per line)."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed JSONL line in arXiv dump.")
+            continue
+        if raw.get("authors_parsed"):
+            authors = [" ".join(part for part in reversed(names[:2]) if part) for names in raw["authors_parsed"]]
+        else:
+            authors = re.split(r",\s*|\s+and\s+", raw.get("authors") or "")
+        versions = raw.get("versions") or []
+        published = _parse_date(versions[0].get("created", "")) if versions else raw.get("update_date", "")
+        record = _record(
+            arxiv_id=raw.get("id", ""),
+            title=raw.get("title", ""),
+            summary=raw.get("abstract", ""),
+            authors=authors,
+            categories=raw.get("categories", ""),
+            published=published,
+        )
+        if record:
+            yield record
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_oai_pmh_records(source: Any) -> Iterator[Dict[str, Any]]:
+    """Parses OAI-PMH ListRecords XML in the `arXiv` or `oai_dc` metadata formats."""
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if _local(elem.tag) != "record":
+            continue
+        fields: Dict[str, List[str]] = {}
+        authors: List[str] = []
+        for child in elem.iter():
+            name = _local(child.tag)
+            if name == "author":
+                parts = {_local(p.tag): (p.text or "") for p in child}
+                authors.append(f"{parts.get('forenames', '')} {parts.get('keyname', '')}")
+            elif child.text and child.text.strip():
+                fields.setdefault(name, []).append(child.text.strip())
+        elem.clear()
+
+        if "id" in fields:  # arXiv metadata format
+            record = _record(
+                arxiv_id=fields["id"][0],
+                title=fields.get("title", [""])[0],
+                summary=fields.get("abstract", [""])[0],
+                authors=authors,
+                categories=fields.get("categories", [""])[0],
+                published=fields.get("created", [""])[0],
+            )
+        else:  # oai_dc: <dc:identifier>http://arxiv.org/abs/ID</dc:identifier>
+            identifier = next((i for i in fields.get("identifier", []) if "arxiv.org/abs/" in i), "")
+            record = _record(
+                arxiv_id=identifier.rsplit("arxiv.org/abs/", 1)[-1],
+                title=fields.get("title", [""])[0],
+                summary=fields.get("description", [""])[0],
+                authors=fields.get("creator", []),
+                published=fields.get("date", [""])[0],
+            )
+        if record:
+            yield record
+
+
+def read_dump(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yields normalized records from a JSONL or OAI-PMH XML dump (optionally gzipped)."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    name = path.name[:-3] if path.suffix == ".gz" else path.name
+    if name.endswith(".xml"):
+        with opener(path, "rb") as handle:
+            yield from parse_oai_pmh_records(handle)
+    else:
+        with opener(path, "rt", encoding="utf-8") as handle:
+            yield from parse_jsonl_records(handle)
+
+
+class LocalArxivIndex:
+    """
+    Search backend with the same `search_papers` interface as ArxivService,
+    served from a local BM25 index instead of the remote API.
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Upserts records (keyed by arXiv ID) in batches; returns how many were written."""
+        total = 0
+        batch: List[Dict[str, Any]] = []
+        with self._lock:
+            conn = self._connect()
+            for record in records:
+                batch.append(record)
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    total += self._write_batch(conn, batch)
+                    batch = []
+                    logger.info(f"Indexed {total} arXiv records...")
+            if batch:
+                total += self._write_batch(conn, batch)
+            conn.execute("INSERT INTO papers_fts(papers_fts) VALUES ('optimize')")
+            conn.commit()
+        return total
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> int:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO papers (arxiv_id, title, summary, authors, categories, published, url)
+                VALUES (:arxiv_id, :title, :summary, :authors, :categories, :published, :url)
+                ON CONFLICT (arxiv_id) DO UPDATE SET
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    authors = excluded.authors,
+                    categories = excluded.categories,
+                    published = excluded.published,
+                    url = excluded.url
+                """,
+                [{**r, "authors": ", ".join(r["authors"])} for r in batch],
+            )
+        return len(batch)
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Blocking BM25 search; use `search_papers` from async code."""
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"""
+                    SELECT p.title, p.summary, p.url, p.published, p.authors
+                    FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+                    WHERE papers_fts MATCH ?
+                    ORDER BY bm25(papers_fts, {", ".join(map(str, BM25_WEIGHTS))})
+                    LIMIT ?
+                    """,
+                    (fts_query, max_results),
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.error(f"Local arXiv index query failed for {fts_query!r}: {e}")
+                return []
+        return [
+            {
+                "title": title,
+                "summary": summary,
+                "url": url,
+                "published": published,
+                "authors": [a for a in authors.split(", ") if a],
+            }
+            for title, summary, url, published, authors in rows
+        ]
+
+    @traceable
+    async def search_papers(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Searches the local index for papers matching an arXiv-style query.
+        """
+        logger.info(f"Searching local ArXiv index for: {query}")
+        return await asyncio.to_thread(self.search, query, max_results)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+_local_index: Optional[LocalArxivIndex] = None
+_warned_missing_path: Optional[Path] = None
+
+
+def get_local_arxiv_index() -> Optional[LocalArxivIndex]:
+    """Returns the configured local index, or None when ARXIV_INDEX_PATH is unset or missing."""
+    global _local_index, _warned_missing_path
+    if not settings.arxiv_index_path:
+        return None
+    path = Path(settings.arxiv_index_path)
+    if not path.exists():
+        if _warned_missing_path != path:
+            logger.warning(f"ARXIV_INDEX_PATH {path} does not exist; using the remote ArXiv API.")
+            _warned_missing_path = path
+        return None
+    if _local_index is None or _local_index.path != path:
+        _local_index = LocalArxivIndex(path)
+    return _local_index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or query the offline arXiv index.")
+    parser.add_argument("--index", default=settings.arxiv_index_path or str(DEFAULT_INDEX_PATH))
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = commands.add_parser("ingest", help="Load JSONL / OAI-PMH XML dumps into the index.")
+    ingest_cmd.add_argument("dumps", nargs="+", type=Path)
+    search_cmd = commands.add_parser("search", help="Run an arXiv-style query against the index.")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("-n", "--max-results", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    index = LocalArxivIndex(args.index)
+    if args.command == "ingest":
+        for dump in args.dumps:
+            written = index.ingest(read_dump(dump))
+            print(f"{dump}: indexed {written} records")
+        print(f"{index.path}: {index.count()} papers total")
+    else:
+        for paper in index.search(args.query, args.max_results):
+            print(f"{paper['published'][:10]}  {paper['title']}  {paper['url']}")
+
+
+if __name__ == "__main__":
+    main()
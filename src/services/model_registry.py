@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from langchain.chat_models import init_chat_model
+
+from src.services.utils import hash_text
+
+# Chat models per event loop: their async HTTP clients hold connections bound to the loop.
+_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+_loopless: Dict[Hashable, Any] = {}
+_models_guard = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _models_for_current_loop() -> Dict[Hashable, Any]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _loopless
+    models = _models.get(loop)
+    if models is None:
+        models = _models[loop] = {}
+    return models
+
+
+def _get_or_create(key: Hashable, create: Callable[[], Any]) -> Any:
+    with _models_guard:
+        models = _models_for_current_loop()
+        model = models.get(key)
+        if model is not None:
+            _stats["hits"] += 1
+            return model
+        _stats["misses"] += 1
+    # Built outside the lock: constructing a client can be slow, and a rare duplicate is harmless
+    model = create()
+    with _models_guard:
+        return _models_for_current_loop().setdefault(key, model)
+
+
+def get_chat_model(
+    model: str,
+    api_key: Optional[str] = None,
+    *,
+    tools: Sequence[Any] = (),
+    schema: Optional[type] = None,
+    method: str = "function_calling",
+    **kwargs: Any,
+) -> Any:
+    """
+    Returns a shared chat model for (model, api key, bound tools, structured-output schema),
+    creating it with `init_chat_model` on first use in the running event loop.
+
+    Instances are reused across node calls, so their HTTP connection pools and tool
+    bindings are too. Tools are identified by name.
+    """
+    if tools and schema is not None:
+        raise ValueError("Bind either tools or a structured-output schema, not both.")
+    base_key = (model, hash_text(api_key or ""), tuple(sorted(kwargs.items())))
+    base = _get_or_create(base_key, lambda: init_chat_model(model, api_key=api_key, **kwargs))
+    if tools:
+        names = tuple(getattr(tool, "name", repr(tool)) for tool in tools)
+        return _get_or_create(base_key + ("tools", names), lambda: base.bind_tools(list(tools)))
+    if schema is not None:
+        return _get_or_create(
+            base_key + ("schema", schema, method), lambda: base.with_structured_output(schema, method=method)
+        )
+    return base
+
+
+def model_registry_stats() -> Dict[str, int]:
+    """Hit/miss counters for the chat model registry, and how many models it holds."""
+    with _models_guard:
+        held = sum(len(models) for models in _models.values()) + len(_loopless)
+        return {**_stats, "models": held}
+
+
+def clear_model_registry() -> None:
+    """Drops every cached model (e.g. after rotating API keys)."""
+    with _models_guard:
+        _models.clear()
+        _loopless.clear()
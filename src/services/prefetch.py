@@ -0,0 +1,128 @@
+"""
+Background warming of the trends and arXiv caches.
+
+Runs the same queries as the bootstrap nodes (`trend_scanner`, `arxiv_fetcher`) for the
+seeds in `data/memory/topic_preferences.json`, so new threads start on warm caches.
+
+In the LangGraph server process set PREFETCH_ENABLED=true; standalone:
+
+    python -m src.services.prefetch            # loop forever
+    python -m src.services.prefetch --once     # single warm-up pass
+"""
+import argparse
+import asyncio
+import random
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.agents.arxiv_fetcher import MAX_KEYWORD_SEARCHES, search_keyword
+from src.agents.trend_scanner import filter_trends, trend_seeds
+from src.config.settings import settings
+from src.memory import MemoryStore
+from src.services import arxiv_client, google_trends
+from src.services.local_arxiv_index import get_local_arxiv_index
+from src.services.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Keeps prefetch bursts small next to interactive traffic sharing the same upstreams.
+PREFETCH_MAX_CONCURRENCY = 2
+# Each sleep is the interval +/- this fraction, so several processes do not fire in lockstep.
+PREFETCH_JITTER = 0.2
+
+
+class PrefetchScheduler:
+    """Periodically re-runs the bootstrap trends/arXiv queries to keep their cache entries warm."""
+
+    def __init__(
+        self,
+        interval: float = settings.prefetch_interval_seconds,
+        jitter: float = PREFETCH_JITTER,
+        max_concurrency: int = PREFETCH_MAX_CONCURRENCY,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.runs = 0
+
+    async def _load_topic_preferences(self) -> Dict[str, Any]:
+        store = MemoryStore()
+        await store.load()
+        return store.get_all()["topic_preferences"]
+
+    async def run_once(self) -> Dict[str, Any]:
+        """One warm-up pass; returns the seeds and keywords it covered."""
+        preferences = await self._load_topic_preferences()
+        seeds = trend_seeds(preferences)
+        trends = await google_trends.GoogleTrendsService().get_trending_topics(keywords=seeds)
+        keywords = filter_trends(trends, preferences.get("avoid", []))[:MAX_KEYWORD_SEARCHES]
+        if get_local_arxiv_index() is not None:
+            keywords = []  # papers are served from the offline index; nothing to warm
+
+        service = arxiv_client.ArxivService()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _warm(keyword: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await search_keyword(service, keyword)
+
+        await asyncio.gather(*(_warm(keyword) for keyword in keywords))
+        # Expired entries were served stale and are refreshing in the background; finish those too.
+        await asyncio.gather(
+            *google_trends.refresher.pending(), *arxiv_client.refresher.pending(), return_exceptions=True
+        )
+        self.runs += 1
+        logger.info(f"Prefetch pass {self.runs} warmed trends for {seeds} and arXiv for {keywords}")
+        return {"seeds": seeds, "keywords": keywords}
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def run_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.run_once()
+            except Exception as exc:
+                logger.error(f"Prefetch pass failed: {exc}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+
+_background_thread: Optional[threading.Thread] = None
+_background_guard = threading.Lock()
+
+
+def start_background_prefetch(scheduler: Optional[PrefetchScheduler] = None) -> threading.Thread:
+    """
+    Runs a scheduler on a daemon thread with its own event loop (idempotent), so it never
+    competes with the graph's loop and dies with the process.
+    """
+    global _background_thread
+    with _background_guard:
+        if _background_thread is None or not _background_thread.is_alive():
+            scheduler = scheduler or PrefetchScheduler()
+            _background_thread = threading.Thread(
+                target=lambda: asyncio.run(scheduler.run_forever()),
+                name="cache-prefetch",
+                daemon=True,
+            )
+            _background_thread.start()
+            logger.info(f"Started background cache prefetch every ~{scheduler.interval:.0f}s")
+        return _background_thread
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Warm the trends and arXiv caches.")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit.")
+    parser.add_argument("--interval", type=float, default=settings.prefetch_interval_seconds)
+    args = parser.parse_args(argv)
+
+    scheduler = PrefetchScheduler(interval=args.interval)
+    asyncio.run(scheduler.run_once() if args.once else scheduler.run_forever())
+
+
+if __name__ == "__main__":
+    main()
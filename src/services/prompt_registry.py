@@ -0,0 +1,153 @@
+"""
+Prompt templates from `src/config/prompts`, read and compiled once.
+
+Nodes fetch templates through `get_prompt`/`load_prompt_text`. A file is re-read only
+when its mtime (or size) changes, and each distinct text is compiled once, so an LLM
+turn costs a `stat` instead of a thread hop, a read and a template parse. Edited
+prompts take effect on the next call; an edit that drops a required variable is
+rejected and the previous version keeps being served.
+"""
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.core.paths import PROMPTS_DIR
+from src.services.logger import get_logger
+from src.services.utils import LRUCache, hash_text
+
+logger = get_logger(__name__)
+
+# Variables each node fills in; templates must use exactly these.
+REQUIRED_PROMPT_VARIABLES: Dict[str, frozenset] = {
+    "clarification_prompt.md": frozenset({
+        "paper_title", "paper_summary", "paper_candidates", "history", "revision_summary",
+        "comprehension_level", "topic", "preferences",
+    }),
+    "post_format_prompt.md": frozenset({
+        "title", "summary", "style", "format", "previous_draft", "latest_instruction",
+        "revision_summary", "chat_history", "all_edit_requests",
+    }),
+    "ranking_prompt.md": frozenset({"topic", "interests", "conversation", "papers"}),
+    "memory_style_prompt.md": frozenset({"feedback", "current_style"}),
+    "comprehension_memory_prompt.md": frozenset({"feedback", "current_preferences"}),
+}
+
+PROMPT_COMPILE_CACHE_ENTRIES = 64
+
+
+class PromptValidationError(ValueError):
+    """A prompt template is missing variables its node supplies, or uses ones it does not."""
+
+
+def prompt_problems(name: str, text: str) -> List[str]:
+    """Describes how `text` deviates from the variables required for prompt `name`."""
+    required = REQUIRED_PROMPT_VARIABLES.get(name)
+    try:
+        variables = set(ChatPromptTemplate.from_template(text).input_variables)
+    except Exception as exc:
+        return [f"{name}: does not compile ({exc})"]
+    if required is None:
+        return []
+    problems = []
+    if required - variables:
+        problems.append(f"{name}: missing {sorted(required - variables)}")
+    if variables - required:
+        problems.append(f"{name}: unknown {sorted(variables - required)}")
+    return problems
+
+
+def _signature(path: Path) -> Tuple[Any, Any]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PromptRegistry:
+    """Prompt texts keyed by path (revalidated by mtime) and compiled templates keyed by text."""
+
+    def __init__(self):
+        self._texts: Dict[Hashable, Tuple[Any, str]] = {}
+        self._compiled = LRUCache(max_entries=PROMPT_COMPILE_CACHE_ENTRIES)
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def load_text(self, name: str) -> str:
+        """The prompt's text, re-read only when the file changed since the last call."""
+        path = PROMPTS_DIR / name
+        signature = _signature(path)
+        with self._lock:
+            cached = self._texts.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        text = path.read_text()
+        if cached is not None:
+            problems = prompt_problems(name, text)
+            if problems:
+                logger.error(f"Ignoring edited prompt {path}: {'; '.join(problems)}")
+                text = cached[1]
+            else:
+                logger.info(f"Reloaded prompt {path}")
+                self.reloads += 1
+        with self._lock:
+            self._texts[path] = (signature, text)
+        return text
+
+    def compile(self, text: str) -> Any:
+        """The template for `text`, parsed once per distinct text. Treat it as read-only."""
+        key = hash_text(text)
+        template = self._compiled.get(key)
+        if template is None:
+            template = ChatPromptTemplate.from_template(text)
+            self._compiled.put(key, template, size=len(text))
+        return template
+
+    def get(self, name: str) -> Any:
+        """The compiled template for prompt `name`."""
+        return self.compile(self.load_text(name))
+
+    def clear(self) -> None:
+        """Forgets every loaded text and compiled template (e.g. between tests)."""
+        with self._lock:
+            self._texts.clear()
+        self._compiled.clear()
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> None:
+        """Reads, validates and compiles prompts (every `*.md` by default); raises on any problem."""
+        names = sorted(names) if names is not None else sorted(p.name for p in PROMPTS_DIR.glob("*.md"))
+        missing = [name for name in REQUIRED_PROMPT_VARIABLES if not (PROMPTS_DIR / name).exists()]
+        problems = [f"{name}: file not found" for name in missing]
+        for name in names:
+            text = self.load_text(name)
+            found = prompt_problems(name, text)
+            problems.extend(found)
+            if not found:
+                self.compile(text)
+        if problems:
+            raise PromptValidationError("Invalid prompt templates: " + "; ".join(problems))
+
+
+prompt_registry = PromptRegistry()
+
+
+def load_prompt_text(name: str) -> str:
+    return prompt_registry.load_text(name)
+
+
+def get_prompt(name: str) -> Any:
+    return prompt_registry.get(name)
+
+
+def compile_prompt(text: str) -> Any:
+    return prompt_registry.compile(text)
+
+
+def validate_prompts() -> None:
+    """Startup check: loads and compiles every prompt, raising PromptValidationError on problems."""
+    prompt_registry.preload()
+
+
+def clear_prompt_registry() -> None:
+    """Drops every cached prompt text and template (e.g. between tests)."""
+    prompt_registry.clear()
@@ -0,0 +1,543 @@
+"""
+Durable outbox for LinkedIn posts.
+
+`publisher_node` enqueues approved drafts here, due now or at their `publish_at`, and
+returns; an `OutboxWorker` drains the queue in the background with bounded concurrency,
+exponential backoff, `Retry-After` handling for 429s and a per-account rolling daily quota.
+Rows survive restarts: posts claimed by a worker that died are picked up again once their
+lease expires.
+
+The worker keeps only posts due within the next hour in an in-memory timer wheel, refilled
+from the `(status, next_attempt_at)` index, and sleeps until the earliest of them; memory
+and idle cost stay flat however many posts are scheduled further out.
+
+    python -m src.services.publish_outbox status [ID]   # queue counts, or one post
+    python -m src.services.publish_outbox run --once    # drain due posts and exit
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.config.settings import settings
+from src.core.paths import DATA_DIR
+from src.services.linkedin_api import LinkedInService, PublishResult, aclose_http_client
+from src.services.logger import get_logger
+from src.services.timer_wheel import TimerWheel
+
+logger = get_logger(__name__)
+
+DEFAULT_OUTBOX_PATH = DATA_DIR / "publish_outbox.sqlite3"
+
+PUBLISH_MAX_CONCURRENCY = 2
+PUBLISH_MAX_ATTEMPTS = 8
+PUBLISH_BACKOFF_BASE_SECONDS = 5.0
+PUBLISH_BACKOFF_MAX_SECONDS = 30 * 60
+# A claimed post whose worker has not reported back within the lease is claimable again.
+PUBLISH_LEASE_SECONDS = 120
+PUBLISH_WHEEL_TICK_SECONDS = 1.0
+PUBLISH_WHEEL_SLOTS = 3600  # one hour horizon
+# How often the wheel is topped up from disk; also bounds how long posts enqueued by
+# another process wait to be noticed.
+PUBLISH_REFILL_INTERVAL_SECONDS = 60.0
+PUBLISH_REFILL_BATCH = 1000
+QUOTA_WINDOW_SECONDS = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    content TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    published_at REAL,
+    post_id TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_account_published ON outbox (account, published_at);
+CREATE TABLE IF NOT EXISTS account_throttle (
+    account TEXT PRIMARY KEY,
+    blocked_until REAL NOT NULL
+);
+"""
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    PUBLISHED = "published"
+    FAILED = "failed"
+
+
+class OutboxEntry(BaseModel):
+    id: int
+    account: str
+    content: str
+    status: OutboxStatus
+    attempts: int
+    next_attempt_at: float
+    created_at: float
+    updated_at: float
+    published_at: Optional[float] = None
+    post_id: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class PublishOutbox:
+    """
+    SQLite-backed queue of posts and their delivery state, plus per-account throttling.
+
+    Claims run in an IMMEDIATE transaction, so several processes (the graph server and
+    the CLI worker, say) can share one outbox file without delivering a post twice.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or DEFAULT_OUTBOX_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    # Reads fetch under the lock too: a cursor stepped outside it races other threads on the connection.
+    def _query_one(self, sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _query_all(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _enqueue_sync(self, account: str, content: str, not_before: Optional[float]) -> OutboxEntry:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "INSERT INTO outbox (account, content, status, next_attempt_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?) RETURNING *",
+                (account, content, OutboxStatus.PENDING.value, not_before or now, now, now),
+            ).fetchone()
+        return OutboxEntry(**row)
+
+    def _get_sync(self, entry_id: int) -> Optional[OutboxEntry]:
+        row = self._query_one("SELECT * FROM outbox WHERE id = ?", (entry_id,))
+        return OutboxEntry(**row) if row else None
+
+    def _list_sync(self, status: Optional[OutboxStatus], limit: int) -> List[OutboxEntry]:
+        if status is None:
+            rows = self._query_all("SELECT * FROM outbox ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            rows = self._query_all(
+                "SELECT * FROM outbox WHERE status = ? ORDER BY id DESC LIMIT ?", (status.value, limit)
+            )
+        return [OutboxEntry(**row) for row in rows]
+
+    def _counts_sync(self) -> Dict[str, int]:
+        rows = self._query_all("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        counts = {status.value: 0 for status in OutboxStatus}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def _quota_remaining(self, account: str, quota: int, now: float) -> Tuple[int, float]:
+        """Posts the account may still publish in the rolling window, and when its oldest counted post ages out."""
+        rows = self._conn.execute(
+            "SELECT published_at FROM outbox WHERE account = ? AND published_at > ?"
+            " ORDER BY published_at DESC LIMIT ?",
+            (account, now - QUOTA_WINDOW_SECONDS, quota),
+        ).fetchall()
+        frees_at = rows[-1][0] + QUOTA_WINDOW_SECONDS if rows else now
+        return quota - len(rows), frees_at
+
+    def _claim_due_sync(self, limit: int, quota: int, now: float) -> List[OutboxEntry]:
+        claimed: List[OutboxEntry] = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT outbox.* FROM outbox"
+                    " LEFT JOIN account_throttle ON account_throttle.account = outbox.account"
+                    " WHERE status IN (?, ?) AND next_attempt_at <= ?"
+                    " AND (account_throttle.blocked_until IS NULL OR account_throttle.blocked_until <= ?)"
+                    " ORDER BY next_attempt_at, id",
+                    (OutboxStatus.PENDING.value, OutboxStatus.IN_FLIGHT.value, now, now),
+                ).fetchall()
+                remaining: Dict[str, Tuple[int, float]] = {}
+                claimed_per_account: Dict[str, int] = {}
+                for row in rows:
+                    if len(claimed) >= limit:
+                        break
+                    account = row["account"]
+                    if account not in remaining:
+                        remaining[account] = self._quota_remaining(account, quota, now)
+                    left, frees_at = remaining[account]
+                    if left <= 0:
+                        # Over quota: park the post until a slot frees up instead of rescanning it
+                        self._conn.execute(
+                            "UPDATE outbox SET status = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                            (OutboxStatus.PENDING.value, max(frees_at, now + 1), now, row["id"]),
+                        )
+                        continue
+                    if claimed_per_account.get(account, 0) >= left:
+                        continue  # this batch already uses the rest of the quota; revisit next pass
+                    entry = self._conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, updated_at = ?"
+                        " WHERE id = ? RETURNING *",
+                        (OutboxStatus.IN_FLIGHT.value, now + PUBLISH_LEASE_SECONDS, now, row["id"]),
+                    ).fetchone()
+                    claimed.append(OutboxEntry(**entry))
+                    claimed_per_account[account] = claimed_per_account.get(account, 0) + 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def _due_before_sync(self, until: float, limit: int) -> List[Tuple[int, float]]:
+        rows = self._query_all(
+            "SELECT id, next_attempt_at FROM outbox WHERE status IN (?, ?) AND next_attempt_at < ?"
+            " ORDER BY next_attempt_at LIMIT ?",
+            (OutboxStatus.PENDING.value, OutboxStatus.IN_FLIGHT.value, until, limit),
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def _mark_published_sync(self, entry_id: int, post_id: Optional[str]) -> None:
+        now = time.time()
+        self._execute(
+            "UPDATE outbox SET status = ?, published_at = ?, post_id = ?, last_error = NULL, updated_at = ?"
+            " WHERE id = ?",
+            (OutboxStatus.PUBLISHED.value, now, post_id, now, entry_id),
+        )
+
+    def _mark_retry_sync(self, entry_id: int, delay: float, error: str, refund_attempt: bool) -> None:
+        now = time.time()
+        self._execute(
+            "UPDATE outbox SET status = ?, attempts = attempts - ?, next_attempt_at = ?, last_error = ?,"
+            " updated_at = ? WHERE id = ?",
+            (OutboxStatus.PENDING.value, int(refund_attempt), now + delay, error, now, entry_id),
+        )
+
+    def _mark_failed_sync(self, entry_id: int, error: str) -> None:
+        self._execute(
+            "UPDATE outbox SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+            (OutboxStatus.FAILED.value, error, time.time(), entry_id),
+        )
+
+    def _throttle_sync(self, account: str, until: float) -> None:
+        self._execute(
+            "INSERT INTO account_throttle (account, blocked_until) VALUES (?, ?)"
+            " ON CONFLICT (account) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)",
+            (account, until),
+        )
+
+    def _rekey_account_sync(self, old: str, new: str) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = self._conn.execute("UPDATE outbox SET account = ? WHERE account = ?", (new, old)).rowcount
+                self._conn.execute(
+                    "INSERT INTO account_throttle (account, blocked_until)"
+                    " SELECT ?, blocked_until FROM account_throttle WHERE account = ?"
+                    " ON CONFLICT (account) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)",
+                    (new, old),
+                )
+                self._conn.execute("DELETE FROM account_throttle WHERE account = ?", (old,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return moved
+
+    def _throttled_until_sync(self, account: str) -> Optional[float]:
+        row = self._query_one("SELECT blocked_until FROM account_throttle WHERE account = ?", (account,))
+        return row[0] if row else None
+
+    async def enqueue(self, account: str, content: str, not_before: Optional[float] = None) -> OutboxEntry:
+        """Queues a post for `account` (see `LinkedInService.account`), due now or at `not_before`."""
+        return await asyncio.to_thread(self._enqueue_sync, account, content, not_before)
+
+    async def get(self, entry_id: int) -> Optional[OutboxEntry]:
+        return await asyncio.to_thread(self._get_sync, entry_id)
+
+    async def list(self, status: Optional[OutboxStatus] = None, limit: int = 50) -> List[OutboxEntry]:
+        """Most recent posts first, optionally only those in one status."""
+        return await asyncio.to_thread(self._list_sync, status, limit)
+
+    async def counts(self) -> Dict[str, int]:
+        """Number of posts in each status."""
+        return await asyncio.to_thread(self._counts_sync)
+
+    async def claim_due(self, limit: int, quota: Optional[int] = None, now: Optional[float] = None) -> List[OutboxEntry]:
+        """
+        Leases up to `limit` due posts to the caller, skipping throttled accounts and
+        deferring posts of accounts that have used their quota.
+        """
+        quota = settings.linkedin_daily_post_quota if quota is None else quota
+        return await asyncio.to_thread(self._claim_due_sync, limit, quota, now or time.time())
+
+    async def due_before(self, until: float, limit: int = PUBLISH_REFILL_BATCH) -> List[Tuple[int, float]]:
+        """(id, due time) of up to `limit` undelivered posts due before `until`, earliest first."""
+        return await asyncio.to_thread(self._due_before_sync, until, limit)
+
+    async def mark_published(self, entry_id: int, post_id: Optional[str]) -> None:
+        await asyncio.to_thread(self._mark_published_sync, entry_id, post_id)
+
+    async def mark_retry(self, entry_id: int, delay: float, error: str, refund_attempt: bool = False) -> None:
+        """Returns a claimed post to the queue, due after `delay` seconds."""
+        await asyncio.to_thread(self._mark_retry_sync, entry_id, delay, error, refund_attempt)
+
+    async def mark_failed(self, entry_id: int, error: str) -> None:
+        await asyncio.to_thread(self._mark_failed_sync, entry_id, error)
+
+    async def throttle_account(self, account: str, until: float) -> None:
+        """Holds every post of `account` until `until` (epoch seconds)."""
+        await asyncio.to_thread(self._throttle_sync, account, until)
+
+    async def throttled_until(self, account: str) -> Optional[float]:
+        return await asyncio.to_thread(self._throttled_until_sync, account)
+
+    async def rekey_account(self, old: str, new: str) -> int:
+        """Moves every post and throttle of account `old` to `new`; returns how many posts moved."""
+        return await asyncio.to_thread(self._rekey_account_sync, old, new)
+
+
+_outboxes: Dict[Path, PublishOutbox] = {}
+_outboxes_guard = threading.Lock()
+
+
+def get_publish_outbox(path: Optional[Path] = None) -> PublishOutbox:
+    """Process-wide outbox handle for `path` (defaults to `DEFAULT_OUTBOX_PATH`)."""
+    path = Path(path or DEFAULT_OUTBOX_PATH)
+    with _outboxes_guard:
+        outbox = _outboxes.get(path)
+        if outbox is None:
+            outbox = PublishOutbox(path)
+            _outboxes[path] = outbox
+        return outbox
+
+
+def default_linkedin_service(account: str) -> LinkedInService:
+    """The configured LinkedIn credentials; this app publishes as a single account."""
+    return LinkedInService(
+        client_id=settings.linkedin_client_id or "",
+        client_secret=settings.linkedin_client_secret or "",
+        access_token=settings.linkedin_access_token or "",
+        author_urn=settings.linkedin_author_urn or "",
+    )
+
+
+class OutboxWorker:
+    """Delivers due outbox posts, at most `max_concurrency` at a time."""
+
+    def __init__(
+        self,
+        outbox: Optional[PublishOutbox] = None,
+        service_factory: Callable[[str], LinkedInService] = default_linkedin_service,
+        max_concurrency: int = PUBLISH_MAX_CONCURRENCY,
+        max_attempts: int = PUBLISH_MAX_ATTEMPTS,
+        refill_interval: float = PUBLISH_REFILL_INTERVAL_SECONDS,
+    ):
+        self.outbox = outbox
+        self.service_factory = service_factory
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.refill_interval = refill_interval
+        self.wheel = TimerWheel(tick=PUBLISH_WHEEL_TICK_SECONDS, slots=PUBLISH_WHEEL_SLOTS, start=time.time())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _outbox(self) -> PublishOutbox:
+        return self.outbox or get_publish_outbox()
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter, capped at PUBLISH_BACKOFF_MAX_SECONDS."""
+        delay = min(PUBLISH_BACKOFF_MAX_SECONDS, PUBLISH_BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _deliver(self, entry: OutboxEntry) -> OutboxStatus:
+        outbox = self._outbox()
+        service = self.service_factory(entry.account)
+        try:
+            result = await service.publish(entry.content)
+        except Exception as exc:
+            result = PublishResult(ok=False, error=str(exc))
+        account = await self._adopt_member_account(service, entry)
+
+        if result.ok:
+            await outbox.mark_published(entry.id, result.post_id)
+            note = " earlier; not posted again" if result.duplicate else ""
+            logger.info(f"Outbox post {entry.id} published{note} ({result.post_id or 'no id'}).")
+            return OutboxStatus.PUBLISHED
+
+        error = f"{result.status_code or 'network'}: {result.error}"
+        if result.status_code == 429:
+            # Throttling says nothing about the post itself, so it does not use up an attempt
+            delay = result.retry_after if result.retry_after is not None else self.backoff(entry.attempts)
+            await outbox.throttle_account(account, time.time() + delay)
+            await outbox.mark_retry(entry.id, delay, error, refund_attempt=True)
+            self.wheel.add(entry.id, time.time() + delay)
+            logger.warning(f"Outbox post {entry.id} throttled by LinkedIn; holding the account for {delay:.0f}s.")
+            return OutboxStatus.PENDING
+        if result.retryable and entry.attempts < self.max_attempts:
+            delay = self.backoff(entry.attempts)
+            await outbox.mark_retry(entry.id, delay, error)
+            self.wheel.add(entry.id, time.time() + delay)
+            logger.warning(f"Outbox post {entry.id} attempt {entry.attempts} failed ({error}); retrying in {delay:.0f}s.")
+            return OutboxStatus.PENDING
+        await outbox.mark_failed(entry.id, error)
+        logger.error(f"Outbox post {entry.id} failed after {entry.attempts} attempt(s): {error}")
+        return OutboxStatus.FAILED
+
+    async def _adopt_member_account(self, service: LinkedInService, entry: OutboxEntry) -> str:
+        """
+        Posts queued before the member's URN was known are keyed by their token; once a
+        delivery has resolved it, move them (and their quota history) to the URN.
+        """
+        if entry.account != service.token_key:
+            return entry.account
+        try:
+            account = await service.account()
+        except Exception as exc:
+            logger.warning(f"Could not look up the account of outbox post {entry.id}: {exc}")
+            return entry.account
+        if account != entry.account:
+            moved = await self._outbox().rekey_account(entry.account, account)
+            logger.info(f"Re-keyed {moved} outbox post(s) to the resolved LinkedIn member.")
+        return account
+
+    async def run_once(self) -> List[OutboxStatus]:
+        """Claims and delivers one batch of due posts; returns their resulting statuses."""
+        entries = await self._outbox().claim_due(self.max_concurrency)
+        return list(await asyncio.gather(*(self._deliver(entry) for entry in entries)))
+
+    async def drain(self) -> int:
+        """Delivers batches until nothing is due; returns how many deliveries were attempted."""
+        delivered = 0
+        while statuses := await self.run_once():
+            delivered += len(statuses)
+        return delivered
+
+    def schedule(self, entry: OutboxEntry) -> None:
+        """
+        Tells the worker about a post enqueued in this process so it fires on time without
+        waiting for the next refill. Safe to call from any thread.
+        """
+        self.wheel.add(entry.id, entry.next_attempt_at)
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def refill(self, now: Optional[float] = None) -> int:
+        """Loads posts due within the wheel's horizon from disk; returns how many were added."""
+        now = time.time() if now is None else now
+        due = await self._outbox().due_before(now + self.wheel.horizon - self.wheel.tick)
+        return sum(self.wheel.add(entry_id, due_at) for entry_id, due_at in due)
+
+    async def run_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            await self._serve(stop)
+        finally:
+            # The worker's loop ends with it; release its LinkedIn connections
+            await aclose_http_client()
+
+    async def _serve(self, stop: asyncio.Event) -> None:
+        refill_at = 0.0
+        while not stop.is_set():
+            self._wake.clear()  # before the pass, so posts scheduled during it still wake the next wait
+            now = time.time()
+            try:
+                if now >= refill_at:
+                    await self.refill(now)
+                    refill_at = now + self.refill_interval
+                if self.wheel.advance(now):
+                    await self.drain()
+            except Exception as exc:
+                logger.error(f"Outbox worker pass failed: {exc}")
+            next_due = self.wheel.next_due()
+            wake_at = refill_at if next_due is None else min(refill_at, next_due)
+            waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(self._wake.wait())]
+            await asyncio.wait(waiters, timeout=max(0.0, wake_at - time.time()), return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+
+_worker_thread: Optional[threading.Thread] = None
+_background_worker: Optional[OutboxWorker] = None
+_worker_guard = threading.Lock()
+
+
+def start_publish_worker(worker: Optional[OutboxWorker] = None) -> threading.Thread:
+    """
+    Runs an outbox worker on a daemon thread with its own event loop (idempotent).
+    Posts in flight when the process exits are retried after their lease expires.
+    """
+    global _worker_thread, _background_worker
+    with _worker_guard:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            worker = worker or OutboxWorker()
+            _background_worker = worker
+            _worker_thread = threading.Thread(
+                target=lambda: asyncio.run(worker.run_forever()),
+                name="publish-outbox",
+                daemon=True,
+            )
+            _worker_thread.start()
+            logger.info("Started background publish worker.")
+        return _worker_thread
+
+
+def notify_publish_worker(entry: OutboxEntry) -> None:
+    """Hands a newly queued post to the background worker, if this process runs one."""
+    worker = _background_worker
+    if worker is not None:
+        worker.schedule(entry)
+
+
+async def _status(entry_id: Optional[int]) -> Dict[str, Any]:
+    outbox = get_publish_outbox()
+    if entry_id is None:
+        return await outbox.counts()
+    entry = await outbox.get(entry_id)
+    return entry.model_dump(mode="json") if entry else {}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or drain the LinkedIn publish outbox.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    status = commands.add_parser("status", help="Show queue counts, or one post's state.")
+    status.add_argument("id", type=int, nargs="?")
+    run = commands.add_parser("run", help="Deliver queued posts.")
+    run.add_argument("--once", action="store_true", help="Deliver what is due now and exit.")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        print(json.dumps(asyncio.run(_status(args.id)), indent=2))
+    else:
+        worker = OutboxWorker()
+        asyncio.run(worker.drain() if args.once else worker.run_forever())
+
+
+if __name__ == "__main__":
+    main()
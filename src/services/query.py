@@ -0,0 +1,264 @@
+"""
+Parsing and canonicalization of arXiv-style boolean search queries.
+
+Equivalent queries (`all:"LLM" OR all:"AI"` vs `all:"ai" OR all:"llm"`) share one
+canonical form, and therefore one cache key, across every service that searches.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from src.services.utils import LRUCache, hash_text, normalize_cache_key
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<paren>[()])'
+    r'|(?:(?P<field>[A-Za-z]+):)?(?:"(?P<phrase>[^"]*)"|\[(?P<range>[^\]]*)\]|(?P<bare>[^\s()"]+)))'
+)
+OPERATORS = ("AND", "OR", "ANDNOT")
+# Bounds on the spellings CanonicalizationStats remembers: cache keys tracked, and spellings per key.
+CANONICALIZATION_STATS_MAX_KEYS = 4096
+CANONICALIZATION_STATS_MAX_SPELLINGS = 16
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Term:
+    """A single search term. `phrase` terms were quoted; `range` terms are `field:[a TO b]`."""
+
+    field: Optional[str]
+    text: str
+    phrase: bool = False
+    range: bool = False
+
+    def render(self) -> str:
+        if self.range:
+            body = f"[{self.text}]"
+        elif self.phrase and " " in self.text:
+            body = f'"{self.text}"'
+        else:
+            body = self.text
+        return f"{self.field}:{body}" if self.field else body
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    """AND / OR over any number of operands, or ANDNOT over exactly (include, exclude)."""
+
+    op: str
+    operands: Tuple["Node", ...]
+
+    def render(self) -> str:
+        return f" {self.op} ".join(
+            f"({node.render()})" if isinstance(node, BoolOp) else node.render() for node in self.operands
+        )
+
+
+Node = Union[Term, BoolOp]
+
+
+def _tokenize(query: str) -> List[Union[str, Term]]:
+    tokens: List[Union[str, Term]] = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = _TOKEN_RE.match(query, pos)
+        if not match or match.end() == pos:
+            raise QuerySyntaxError(f"Unexpected input at position {pos}: {query[pos:]!r}")
+        pos = match.end()
+        field = match.group("field")
+        if match.group("paren"):
+            tokens.append(match.group("paren"))
+        elif match.group("range") is not None:
+            tokens.append(Term(field, " ".join(match.group("range").split()), range=True))
+        elif match.group("phrase") is not None:
+            tokens.append(Term(field, " ".join(match.group("phrase").split()), phrase=True))
+        elif field is None and match.group("bare") in OPERATORS:
+            tokens.append(match.group("bare"))
+        else:
+            tokens.append(Term(field, match.group("bare")))
+    # Consecutive unfielded bare words form one free-text term, e.g. a paper title.
+    merged: List[Union[str, Term]] = []
+    for token in tokens:
+        prev = merged[-1] if merged else None
+        if (isinstance(token, Term) and isinstance(prev, Term) and token.field is None and prev.field is None
+                and not (token.phrase or token.range or prev.phrase or prev.range)):
+            merged[-1] = Term(None, f"{prev.text} {token.text}")
+        else:
+            merged.append(token)
+    return merged
+
+
+class _Parser:
+    # Grammar: or := and ("OR" and)* ; and := atom (("AND" | "ANDNOT" | <adjacent>) atom)*
+    def __init__(self, tokens: List[Union[str, Term]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected token {self.peek()!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        operands = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else BoolOp("OR", tuple(operands))
+
+    def parse_and(self) -> Node:
+        node = self.parse_atom()
+        while self.peek() not in (None, "OR", ")"):
+            op = self.take() if self.peek() in ("AND", "ANDNOT") else "AND"
+            right = self.parse_atom()
+            node = BoolOp(op, (node, right))
+        return node
+
+    def parse_atom(self) -> Node:
+        token = self.take()
+        if token == "(":
+            node = self.parse_or()
+            if self.take() != ")":
+                raise QuerySyntaxError("Unbalanced parentheses")
+            return node
+        if isinstance(token, Term):
+            return token
+        raise QuerySyntaxError(f"Expected a term, got {token!r}")
+
+
+def parse_query(query: str) -> Node:
+    """Parses an arXiv API query into a tree of Term / BoolOp nodes."""
+    tokens = _tokenize(query)
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+    return _Parser(tokens).parse()
+
+
+def canonicalize(node: Node) -> Node:
+    """
+    Case-folds term text, flattens nested AND/OR and sorts/dedupes their operands.
+    ANDNOT keeps its operand order.
+    """
+    if isinstance(node, Term):
+        text = node.text if node.range else node.text.casefold()
+        # A quoted single word matches exactly like the bare word
+        return Term(node.field, text, phrase=node.phrase and " " in text, range=node.range)
+    operands = [canonicalize(child) for child in node.operands]
+    if node.op == "ANDNOT":
+        return BoolOp("ANDNOT", tuple(operands))
+    flat: Dict[str, Node] = {}
+    for child in operands:
+        children = child.operands if isinstance(child, BoolOp) and child.op == node.op else (child,)
+        for grandchild in children:
+            flat.setdefault(grandchild.render(), grandchild)
+    if len(flat) == 1:
+        return next(iter(flat.values()))
+    return BoolOp(node.op, tuple(flat[key] for key in sorted(flat)))
+
+
+def canonical_query(query: str) -> str:
+    """
+    Returns the canonical text of a query. Unparseable input falls back to
+    whitespace/case normalization so it still gets a stable key.
+    """
+    try:
+        return canonicalize(parse_query(query)).render()
+    except QuerySyntaxError:
+        return normalize_cache_key(query)
+
+
+def query_cache_key(query: str) -> str:
+    """Cache key shared by all equivalent spellings of a query."""
+    return hash_text(canonical_query(query))
+
+
+def keyword_query(keyword: str) -> str:
+    """arXiv query for a trending keyword, e.g. `all:"Machine Learning"`."""
+    return f'all:"{" ".join(keyword.replace(chr(34), "").split())}"'
+
+
+def canonical_terms(terms: Iterable[str]) -> List[str]:
+    """Case-folded, whitespace-collapsed, de-duplicated and sorted keyword list."""
+    return sorted({normalize_cache_key(term) for term in terms if term and term.strip()})
+
+
+def seed_set_key(terms: Iterable[str]) -> str:
+    """Cache key for an unordered keyword set, e.g. a user's trend seeds."""
+    return hash_text("\n".join(canonical_terms(terms)))
+
+
+class CanonicalizationStats:
+    """
+    Counts cache hits that only matched because of canonicalization: the entry was
+    found under its canonical key, but this raw spelling had not been looked up or
+    stored under that key before. Spellings are remembered per process, for the most
+    recently used keys and up to a few per key, so `gained` is approximate once those
+    bounds are reached.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = CANONICALIZATION_STATS_MAX_KEYS,
+        max_spellings: int = CANONICALIZATION_STATS_MAX_SPELLINGS,
+    ):
+        self._lock = threading.Lock()
+        self._max_spellings = max_spellings
+        self._spellings = LRUCache(max_entries=max_keys)
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _seen(self, namespace: str, key: str) -> Set[str]:
+        seen = self._spellings.get((namespace, key))
+        if seen is None:
+            seen = set()
+            self._spellings.put((namespace, key), seen, size=1)
+        return seen
+
+    def _remember(self, seen: Set[str], spelling: str) -> None:
+        if len(seen) < self._max_spellings:
+            seen.add(spelling)
+
+    def record(self, namespace: str, raw_query: str, key: str, hit: bool) -> None:
+        spelling = normalize_cache_key(raw_query)
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"lookups": 0, "hits": 0, "gained": 0})
+            seen = self._seen(namespace, key)
+            counters["lookups"] += 1
+            if hit:
+                counters["hits"] += 1
+                if spelling not in seen:
+                    counters["gained"] += 1
+            self._remember(seen, spelling)
+
+    def record_write(self, namespace: str, raw_query: str, key: str) -> None:
+        with self._lock:
+            self._remember(self._seen(namespace, key), normalize_cache_key(raw_query))
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._counters.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spellings.clear()
+            self._counters.clear()
+
+
+canonicalization_stats = CanonicalizationStats()
+
+
+def canonicalization_report() -> Dict[str, Dict[str, int]]:
+    """Per-namespace lookups, hits, and hits gained by query canonicalization."""
+    return canonicalization_stats.report()
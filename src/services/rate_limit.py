@@ -0,0 +1,184 @@
+import asyncio
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Lower values are served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+_request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_BULK)
+
+# How often a waiter that is not at the head of the queue re-checks it while tokens are
+# available (queued priorities can rise without anyone touching the limiter).
+QUEUE_POLL_SECONDS = 0.05
+
+
+class SharedPriority:
+    """
+    Priority of work done on behalf of several callers (e.g. one coalesced fetch): the most
+    urgent priority of any caller waiting on it, or of shared work it runs inside.
+    """
+
+    def __init__(self, priority: int, parent: Optional["SharedPriority"] = None):
+        self._priority = priority
+        self._parent = parent
+
+    @property
+    def value(self) -> int:
+        return self._priority if self._parent is None else min(self._priority, self._parent.value)
+
+    def raise_to(self, priority: int) -> None:
+        """Makes the work at least as urgent as `priority`, including requests already queued."""
+        self._priority = min(self._priority, priority)
+
+
+_shared_priority: ContextVar[Optional[SharedPriority]] = ContextVar("shared_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    Sets the scheduling priority for rate-limited requests made in this context, overriding
+    any priority inherited from shared work. The value follows `asyncio.to_thread`, so
+    blocking clients on worker threads see it too.
+    """
+    token = _request_priority.set(priority)
+    shared_token = _shared_priority.set(None)
+    try:
+        yield
+    finally:
+        _shared_priority.reset(shared_token)
+        _request_priority.reset(token)
+
+
+def current_priority() -> int:
+    priority = _request_priority.get()
+    shared = _shared_priority.get()
+    return priority if shared is None else min(priority, shared.value)
+
+
+def shared_priority_context() -> Tuple[contextvars.Context, SharedPriority]:
+    """
+    A copy of the current context for running shared work in, and the SharedPriority its
+    rate-limited requests use; callers that join the work later call `raise_to` on it.
+    """
+    shared = SharedPriority(_request_priority.get(), parent=_shared_priority.get())
+    context = contextvars.copy_context()
+    context.run(_shared_priority.set, shared)
+    return context, shared
+
+
+def _priority_source(priority: Optional[int]) -> Callable[[], int]:
+    """The queueing priority of a request: fixed if given, else read live from its context."""
+    if priority is not None:
+        return lambda: priority
+    own = _request_priority.get()
+    shared = _shared_priority.get()
+    if shared is None:
+        return lambda: own
+    return lambda: min(own, shared.value)
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket shared by every thread and event loop in the process.
+
+    Callers queue by (priority, arrival order); only the head of the queue may take a
+    token, so a waiting interactive request is always granted before queued bulk work.
+    Priorities are re-read while queued, so a request whose shared work is joined by a
+    more urgent caller moves up. Threads block in `acquire`; coroutines wait in
+    `acquire_async` on their event loop without holding a worker thread.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._waiters: Dict[int, Callable[[], int]] = {}
+        self._head: Optional[int] = None  # the head as last seen by any waiter
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self.granted = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_grant_locked(self, ticket: int) -> Tuple[bool, Optional[float]]:
+        """
+        Grants `ticket` a token if it heads the queue and one is available. Otherwise returns
+        how long to wait before checking again.
+        """
+        self._refill(time.monotonic())
+        head = min(self._waiters, key=lambda seq: (self._waiters[seq](), seq))
+        until_token = (1 - self._tokens) / self.rate
+        if head == ticket:
+            self._head = head
+            if self._tokens >= 1:
+                del self._waiters[ticket]
+                self._tokens -= 1
+                self._head = None
+                self._cond.notify_all()
+                return True, None
+            return False, until_token
+        if head != self._head:
+            # A raised priority moved someone else to the head while it slept; wake it once.
+            self._head = head
+            self._cond.notify_all()
+        return False, QUEUE_POLL_SECONDS if self._tokens >= 1 else until_token
+
+    def _withdraw(self, ticket: int) -> None:
+        with self._cond:
+            self._waiters.pop(ticket, None)
+            if self._head == ticket:
+                self._head = None
+            self._cond.notify_all()
+
+    def _record_grant(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._cond:
+            self.granted += 1
+            self.waited_seconds += waited
+        return waited
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """Blocks until a token is granted; returns the seconds spent waiting."""
+        ticket = next(self._sequence)
+        started = time.monotonic()
+        with self._cond:
+            self._waiters[ticket] = _priority_source(priority)
+            try:
+                while True:
+                    granted, timeout = self._try_grant_locked(ticket)
+                    if granted:
+                        break
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._withdraw(ticket)
+                raise
+        return self._record_grant(started)
+
+    async def acquire_async(self, priority: Optional[int] = None) -> float:
+        """Async variant of `acquire`: waits on the event loop instead of a worker thread."""
+        ticket = next(self._sequence)
+        started = time.monotonic()
+        with self._cond:
+            self._waiters[ticket] = _priority_source(priority)
+        try:
+            while True:
+                with self._cond:
+                    granted, timeout = self._try_grant_locked(ticket)
+                if granted:
+                    break
+                await asyncio.sleep(timeout)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+        return self._record_grant(started)
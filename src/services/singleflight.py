@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from src.services.rate_limit import SharedPriority, current_priority, shared_priority_context
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+_groups_guard = threading.Lock()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller (the leader) starts the work as a task; callers arriving while it
+    runs await the same task and receive the same result or exception. Calls are keyed
+    per event loop, since a task cannot be awaited from another loop. Results are shared
+    between coalesced callers, so treat them as read-only.
+
+    The work's rate-limited requests run at the most urgent priority of the callers
+    waiting on it, so an interactive caller joining a bulk call is not served as bulk.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Tuple[int, Hashable], Tuple[asyncio.Task, SharedPriority]] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        with _groups_guard:
+            _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            inflight = self._inflight.get(flight_key)
+            if inflight is None:
+                self.executions += 1
+                context, shared = shared_priority_context()
+                task = loop.create_task(fn(), context=context)
+                self._inflight[flight_key] = (task, shared)
+                task.add_done_callback(lambda done: self._finished(flight_key, done))
+            else:
+                task, shared = inflight
+                shared.raise_to(current_priority())
+                self.coalesced += 1
+        # Shielded so one caller being cancelled does not cancel the others' shared call.
+        return await asyncio.shield(task)
+
+    def _finished(self, flight_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            inflight = self._inflight.get(flight_key)
+            if inflight is not None and inflight[0] is task:
+                del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; every awaiting caller already got it
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-group call, execution and coalesced-call counters for this process."""
+    with _groups_guard:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
@@ -0,0 +1,174 @@
+"""
+Speculative execution of the steps that follow a human interrupt.
+
+While the graph is paused on `conversation_agent` (or `human_paper_review`), the nodes
+submit the work the user's most likely answer leads to: ranking the candidates and a
+first draft for the top one (the graph registers that chain with `register_after_accept`). Each result is stored under a fingerprint of the exact
+inputs its node would build, so the node reuses it only if the real state after the
+answer produces the same inputs; any answer that changes them simply misses. Results
+are scoped to the graph thread that produced them.
+
+Speculative work runs on a daemon thread with its own event loop, so it survives the
+graph run that paused. Enable it with SPECULATION_ENABLED=true (it spends model calls
+on answers the user may never give).
+"""
+import asyncio
+import concurrent.futures
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+
+from langgraph.config import get_config
+
+from src.config.settings import settings
+from src.services.logger import get_logger
+from src.services.utils import SQLiteCache, hash_text
+
+logger = get_logger(__name__)
+
+SPECULATION_NAMESPACE = "speculation"
+
+# Kinds of speculative results
+SPECULATIVE_CLARIFICATION = "clarification"
+SPECULATIVE_RANKING = "ranking"
+SPECULATIVE_DRAFT = "draft"
+
+
+def speculation_enabled() -> bool:
+    return bool(settings.speculation_enabled)
+
+
+def current_thread_id() -> Optional[str]:
+    """The `thread_id` of the graph run calling this, or None outside one."""
+    try:
+        return get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        return None
+
+
+def speculation_fingerprint(
+    kind: str, thread_id: Optional[str], inputs: Mapping[str, Any], model: Optional[str] = None
+) -> str:
+    payload = {"kind": kind, "thread": thread_id, "model": model or settings.llm_model, "inputs": dict(inputs)}
+    return hash_text(json.dumps(payload, sort_keys=True, default=str))
+
+
+class Speculator:
+    """Runs speculative producers in the background and hands their results to the real nodes."""
+
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        self.cache = cache or SQLiteCache(SPECULATION_NAMESPACE, ttl=settings.speculation_ttl_seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.RLock()
+        self.stats = {"submitted": 0, "hits": 0, "misses": 0, "failed": 0}
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="speculation", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def spawn(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Runs `coro` on the background loop; failures are logged, never raised to the caller."""
+        return asyncio.run_coroutine_threadsafe(self._guarded(coro), self._background_loop())
+
+    async def _guarded(self, coro: Awaitable[Any]) -> Any:
+        try:
+            return await coro
+        except Exception as exc:
+            self.stats["failed"] += 1
+            logger.warning(f"Speculative work failed: {exc}")
+            return None
+
+    def submit(
+        self,
+        kind: str,
+        thread_id: Optional[str],
+        inputs: Mapping[str, Any],
+        produce: Callable[[], Awaitable[Any]],
+    ) -> concurrent.futures.Future:
+        """
+        Starts `produce()` in the background unless a result for (kind, thread, inputs) is
+        stored or already being produced. The returned future resolves to the result (None
+        on failure).
+        """
+        key = speculation_fingerprint(kind, thread_id, inputs)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self.spawn(self._produce(key, kind, produce))
+                future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _produce(self, key: str, kind: str, produce: Callable[[], Awaitable[Any]]) -> Any:
+        stored = await self.cache.get(key)
+        if stored is not None:
+            return stored
+        self.stats["submitted"] += 1
+        logger.info(f"Speculating {kind}.")
+        value = await produce()
+        if value is not None:
+            await self.cache.set(key, value)
+        return value
+
+    async def store(self, kind: str, thread_id: Optional[str], inputs: Mapping[str, Any], value: Any) -> None:
+        """Stores a result produced in the foreground, for a node that will run again on the same inputs."""
+        await self.cache.set(speculation_fingerprint(kind, thread_id, inputs), value)
+
+    async def claim(
+        self, kind: str, thread_id: Optional[str], inputs: Mapping[str, Any], wait: Optional[float] = None
+    ) -> Any:
+        """
+        Takes the speculative result for exactly this thread and these inputs, waiting up to
+        `wait` seconds (default settings.speculation_wait_seconds) if it is still being
+        produced. A result is used once; returns None on a miss.
+        """
+        key = speculation_fingerprint(kind, thread_id, inputs)
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            wait = settings.speculation_wait_seconds if wait is None else wait
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=wait)
+            except Exception:
+                logger.info(f"Speculative {kind} not ready in {wait:.0f}s; computing it now.")
+        value = await self.cache.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        await self.cache.delete(key)
+        self.stats["hits"] += 1
+        logger.info(f"Using speculative {kind}.")
+        return value
+
+
+speculator = Speculator()
+
+# Starts the work that follows an accepted interrupt, given the state after the accept.
+# Registered by the graph wiring, so a paused node need not import the nodes after it.
+_after_accept: Optional[Callable[[Any, Optional[str]], Optional[concurrent.futures.Future]]] = None
+
+
+def register_after_accept(
+    speculate: Optional[Callable[[Any, Optional[str]], Optional[concurrent.futures.Future]]],
+) -> None:
+    global _after_accept
+    _after_accept = speculate
+
+
+def speculate_after_accept(state: Any, thread_id: Optional[str]) -> Optional[concurrent.futures.Future]:
+    """Speculates what follows an accept of `state` in `thread_id`; None when nothing is registered or due."""
+    return _after_accept(state, thread_id) if _after_accept is not None else None
+
+
+def speculation_stats() -> Dict[str, int]:
+    """Counters of speculative work started, used and wasted in this process."""
+    return dict(speculator.stats)
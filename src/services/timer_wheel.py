@@ -0,0 +1,93 @@
+import math
+import threading
+from typing import Dict, Hashable, List, Optional
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel holding the timers due within one rotation (`slots * tick` seconds).
+
+    Adding, cancelling and expiring a timer are O(1); `advance` only visits the slots whose
+    tick has passed. Timers further out than the horizon are refused, so memory is bounded
+    by what is due soon rather than by everything scheduled: callers keep the long tail on
+    disk and top the wheel up as time moves on. Thread-safe, so producers on other threads
+    can add timers to a wheel driven by one event loop.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 3600, start: float = 0.0):
+        self.tick = tick
+        self.slots = slots
+        self._buckets: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current = math.floor(start / tick)
+        self._lock = threading.Lock()
+
+    @property
+    def horizon(self) -> float:
+        return self.slots * self.tick
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._slot_of
+
+    def add(self, key: Hashable, due: float) -> bool:
+        """
+        Schedules (or reschedules) `key`; returns False when `due` lies beyond the horizon.
+        Overdue timers land in the current slot and fire on the next `advance`.
+        """
+        with self._lock:
+            tick = max(math.floor(due / self.tick), self._current)
+            if tick >= self._current + self.slots:
+                return False
+            self._remove_locked(key)
+            slot = tick % self.slots
+            self._buckets[slot][key] = due
+            self._slot_of[key] = slot
+            return True
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._buckets[slot][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Moves the wheel to `now` and returns the keys that came due, earliest first."""
+        expired: List[tuple] = []
+        with self._lock:
+            target = math.floor(now / self.tick)
+            # After a long pause every slot has passed; visit each once
+            first = max(self._current, target - self.slots + 1)
+            for tick in range(first, target + 1):
+                bucket = self._buckets[tick % self.slots]
+                for key, due in list(bucket.items()):
+                    if due <= now:
+                        del bucket[key]
+                        del self._slot_of[key]
+                        expired.append((due, key))
+            self._current = max(self._current, target)
+        return [key for _, key in sorted(expired, key=lambda item: item[0])]
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest timer, or None when the wheel is empty."""
+        with self._lock:
+            if not self._slot_of:
+                return None
+            for offset in range(self.slots):
+                bucket = self._buckets[(self._current + offset) % self.slots]
+                if bucket:
+                    return min(bucket.values())
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            for bucket in self._buckets:
+                bucket.clear()
+            self._slot_of.clear()
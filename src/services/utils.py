@@ -1,11 +1,122 @@
 import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
 from src.core.paths import CACHE_DIR
+from src.services.logger import get_logger
 
 import asyncio
 
+logger = get_logger(__name__)
+
+# Single SQLite file shared by every service cache; each service gets its own namespace.
+CACHE_DB_FILENAME = "cache.sqlite3"
+
+# Budgets for the in-process tier that sits in front of the on-disk caches.
+MEMORY_CACHE_MAX_ENTRIES = 2048
+MEMORY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU bounded by entry count and an approximate byte budget.
+
+    Entries may carry a `version` (e.g. a file signature); a lookup with a different
+    version drops the entry and counts as a miss. Values are shared, not copied, so
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_MAX_ENTRIES, max_bytes: int = MEMORY_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Any = None) -> Any:
+        """Returns the cached value, or None on a miss or version mismatch."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, size, stored_version = item
+            if stored_version != version:
+                self._remove(key, size)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int, version: Any = None) -> None:
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size, version)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._remove(key, item[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._data:
+                self.invalidations += len(self._data)
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._data[key]
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+            }
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """Returns (mtime_ns, size) for a file, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Parsed JSON cache files, revalidated against each file's mtime/size on every load.
+_json_memory = LRUCache()
+
 def get_cache_path(filename: str) -> Path:
     """Returns the path to a cache file."""
     # This is a fast directory check/create, acceptable to be sync usually, 
@@ -20,10 +131,18 @@ def get_cache_path(filename: str) -> Path:
     return CACHE_DIR / filename
 
 async def load_cache(filename: str) -> Dict[str, Any]:
-    """Loads a JSON cache file."""
+    """
+    Loads a JSON cache file.
+    Repeat loads of an unchanged file are served from memory; treat the result as read-only.
+    """
     path = get_cache_path(filename)
-    if not path.exists():
+    signature = _file_signature(path)
+    if signature is None:
         return {}
+
+    cached = _json_memory.get(path, version=signature)
+    if cached is not None:
+        return cached
     
     def _read():
         try:
@@ -31,7 +150,9 @@ async def load_cache(filename: str) -> Dict[str, Any]:
         except json.JSONDecodeError:
             return {}
 
-    return await asyncio.to_thread(_read)
+    data = await asyncio.to_thread(_read)
+    _json_memory.put(path, data, size=signature[1], version=signature)
+    return data
 
 async def save_cache(filename: str, data: Dict[str, Any]):
     """Saves data to a JSON cache file using atomic write."""
@@ -43,7 +164,302 @@ async def save_cache(filename: str, data: Dict[str, Any]):
         tmp_path.replace(path)
 
     await asyncio.to_thread(_write)
+    _json_memory.pop(path)
 
 def hash_text(text: str) -> str:
     """Returns an MD5 hash of the given text."""
     return hashlib.md5(text.encode()).hexdigest()
+
+def normalize_cache_key(text: str) -> str:
+    """Collapses whitespace and case-folds a query so trivial variations share a cache entry."""
+    return " ".join(text.split()).casefold()
+
+
+class CacheEntry(BaseModel):
+    """A single row from a SQLiteCache namespace."""
+
+    key: str
+    value: Any = None
+    expires_at: Optional[float] = None
+    updated_at: float
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+
+_databases: Dict[Path, "_CacheDatabase"] = {}
+_databases_guard = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (namespace, expires_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_updated_at ON cache_entries (namespace, updated_at);
+"""
+
+
+class _CacheDatabase:
+    """
+    Process-wide handle for one cache database: a shared connection, its lock, and
+    the in-memory tier in front of it.
+
+    The memory tier is flushed whenever the file's mtime/size changes for a reason
+    other than our own writes (another process updated the cache).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+        self.memory = LRUCache()
+        # Stored payload length per byte-bounded namespace, computed on first use.
+        self.namespace_bytes: Dict[str, int] = {}
+        self.signature = _file_signature(path)
+
+    def revalidate(self) -> None:
+        signature = _file_signature(self.path)
+        if signature != self.signature:
+            self.memory.clear()
+            self.namespace_bytes.clear()
+            self.signature = signature
+
+    def mark_written(self) -> None:
+        """Records the signature produced by our own write; call while holding `lock`."""
+        self.signature = _file_signature(self.path)
+
+
+def _get_database(path: Path) -> _CacheDatabase:
+    with _databases_guard:
+        db = _databases.get(path)
+        if db is None:
+            db = _CacheDatabase(path)
+            _databases[path] = db
+        return db
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss/eviction counters for every in-memory cache tier in this process."""
+    stats = {"json": _json_memory.stats()}
+    with _databases_guard:
+        databases = list(_databases.values())
+    for db in databases:
+        stats[f"sqlite:{db.path.name}"] = db.memory.stats()
+    return stats
+
+
+class SQLiteCache:
+    """
+    Key/value cache stored as one row per entry in a SQLite table.
+
+    Lookups go through the (namespace, key) primary key and writes are single-row
+    upserts, so their cost stays flat as the cache grows. Values must be JSON-serializable.
+    With `max_entries` and/or `max_bytes` (total JSON payload length), each write evicts the
+    namespace's least recently written entries until it is within those bounds.
+    Recently used entries are also kept in memory, so repeat lookups skip the thread hop,
+    SQL query and JSON decode; treat returned values as read-only.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        filename: str = CACHE_DB_FILENAME,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.filename = filename
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _database(self) -> _CacheDatabase:
+        return _get_database(get_cache_path(self.filename))
+
+    def _get_entry_sync(self, db: _CacheDatabase, key: str) -> Optional[CacheEntry]:
+        # The memory tier is only updated under `db.lock`, so a write that lands after our
+        # SELECT cannot be overwritten by the older row read here.
+        with db.lock:
+            row = db.conn.execute(
+                "SELECT value, expires_at, updated_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                value = json.loads(row[0])
+            except json.JSONDecodeError:
+                return None
+            entry = CacheEntry(key=key, value=value, expires_at=row[1], updated_at=row[2])
+            db.memory.put((self.namespace, key), entry, size=len(row[0]))
+        return entry
+
+    def _set_sync(self, db: _CacheDatabase, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        payload = json.dumps(value)
+        with db.lock:
+            previous_size = 0
+            if self.max_bytes is not None:
+                db.revalidate()  # another process's writes invalidate our byte total
+                row = db.conn.execute(
+                    "SELECT length(value) FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                previous_size = row[0] if row else 0
+            db.conn.execute(
+                """
+                INSERT INTO cache_entries (namespace, key, value, expires_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET
+                    value = excluded.value,
+                    expires_at = excluded.expires_at,
+                    updated_at = excluded.updated_at
+                """,
+                (self.namespace, key, payload, expires_at, now),
+            )
+            evicted = self._evict_locked(db, len(payload) - previous_size)
+            db.mark_written()
+            for evicted_key in evicted:
+                db.memory.pop((self.namespace, evicted_key))
+            if key not in evicted:
+                entry = CacheEntry(key=key, value=value, expires_at=expires_at, updated_at=now)
+                db.memory.put((self.namespace, key), entry, size=len(payload))
+
+    def _evict_locked(self, db: _CacheDatabase, written: int) -> List[str]:
+        """
+        Deletes the namespace's least recently written entries beyond `max_entries`, then
+        oldest-first until its payloads fit in `max_bytes`. `written` is how much the write
+        just made grew the namespace. Returns the evicted keys.
+        """
+        doomed: List[Tuple[str, int]] = []
+        if self.max_entries is not None:
+            doomed = db.conn.execute(
+                "SELECT key, length(value) FROM cache_entries WHERE namespace = ? "
+                "ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                (self.namespace, self.max_entries),
+            ).fetchall()
+        if self.max_bytes is not None:
+            total = db.namespace_bytes.get(self.namespace)
+            if total is None:
+                total = db.conn.execute(
+                    "SELECT COALESCE(SUM(length(value)), 0) FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,),
+                ).fetchone()[0]
+            else:
+                total += written
+            total -= sum(size for _, size in doomed)
+            if total > self.max_bytes:
+                already = {key for key, _ in doomed}
+                for key, size in db.conn.execute(
+                    "SELECT key, length(value) FROM cache_entries WHERE namespace = ? ORDER BY updated_at",
+                    (self.namespace,),
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    if key not in already:
+                        doomed.append((key, size))
+                        total -= size
+            db.namespace_bytes[self.namespace] = total
+        evicted = [key for key, _ in doomed]
+        if evicted:
+            db.conn.executemany(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                [(self.namespace, key) for key in evicted],
+            )
+        return evicted
+
+    def _delete_sync(self, db: _CacheDatabase, key: str) -> None:
+        with db.lock:
+            db.conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            db.mark_written()
+            db.memory.pop((self.namespace, key))
+            db.namespace_bytes.pop(self.namespace, None)
+
+    def _purge_expired_sync(self, db: _CacheDatabase) -> int:
+        with db.lock:
+            purged = db.conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?"
+                " RETURNING key",
+                (self.namespace, time.time()),
+            ).fetchall()
+            db.mark_written()
+            # Other namespaces share the memory tier; drop only what was purged here
+            for (key,) in purged:
+                db.memory.pop((self.namespace, key))
+            if purged:
+                db.namespace_bytes.pop(self.namespace, None)
+        return len(purged)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Returns the raw entry for a key, including expired ones."""
+        db = self._database()
+        db.revalidate()
+        entry = db.memory.get((self.namespace, key))
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self._get_entry_sync, db, key)
+
+    async def get(self, key: str) -> Any:
+        """Returns the cached value, or None when the key is missing or expired."""
+        entry = await self.get_entry(key)
+        if entry is None or entry.expired:
+            return None
+        return entry.value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Upserts a single entry. `ttl` (seconds) defaults to the cache-wide TTL."""
+        await asyncio.to_thread(self._set_sync, self._database(), key, value, self.ttl if ttl is None else ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete_sync, self._database(), key)
+
+    async def purge_expired(self) -> int:
+        """Deletes expired entries in this namespace and returns how many were removed."""
+        return await asyncio.to_thread(self._purge_expired_sync, self._database())
+
+
+class BackgroundRefresher:
+    """
+    Runs cache refreshes as background tasks, at most one in flight per key and event loop,
+    so callers can be served stale data immediately (stale-while-revalidate).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    def schedule(self, key: Hashable, refresh: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Starts `refresh()` unless a refresh for `key` is already running; returns its task."""
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is not None and not task.done():
+            return task
+        task = loop.create_task(refresh())
+        self._tasks[task_key] = task
+        task.add_done_callback(lambda done: self._finished(task_key, done))
+        return task
+
+    def _finished(self, task_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background {self.name} refresh failed: {task.exception()}")
+
+    def pending(self) -> List[asyncio.Task]:
+        """Refresh tasks still running on the current event loop."""
+        loop_id = id(asyncio.get_running_loop())
+        return [task for (owner, _), task in self._tasks.items() if owner == loop_id and not task.done()]
@@ -1,7 +1,48 @@
+import re
+from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any
 from src.memory.models import MemoryEvent
 
+_ARXIV_ID_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?$")
+
+
+def _paper_keys(paper: Dict[str, Any]) -> List[str]:
+    """Identity keys for a paper: its arXiv ID (version stripped) and its normalized title."""
+    keys = []
+    match = _ARXIV_ID_RE.search(paper.get("url") or "")
+    if match:
+        keys.append(f"id:{match.group(1)}")
+    title = " ".join(re.sub(r"[^\w]+", " ", paper.get("title") or "").split()).casefold()
+    if title:
+        keys.append(f"title:{title}")
+    return keys
+
+
+def merge_paper_candidates(
+    existing: List[Dict[str, Any]], new: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Reducer for `paper_candidates`, used when parallel arXiv branches report back.
+    - Drops duplicates by arXiv ID or normalized title (first occurrence wins).
+    - Interleaves papers round-robin by their search `keyword` so one popular
+      keyword cannot crowd the others out of the top of the list.
+    """
+    seen: set[str] = set()
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for paper in (existing or []) + (new or []):
+        keys = _paper_keys(paper)
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        groups.setdefault(paper.get("keyword"), []).append(paper)
+
+    merged: List[Dict[str, Any]] = []
+    buckets = list(groups.values())
+    for rank in range(max((len(bucket) for bucket in buckets), default=0)):
+        merged.extend(bucket[rank] for bucket in buckets if rank < len(bucket))
+    return merged
+
 class AppState(BaseModel):
     model_config = ConfigDict(extra='allow', arbitrary_types_allowed=True)
     """
@@ -11,7 +52,10 @@ class AppState(BaseModel):
     trending_keywords: List[str] = Field(default_factory=list, description="List of trending keywords found.")
     
     # ArXiv Fetching
-    paper_candidates: List[Dict[str, Any]] = Field(default_factory=list, description="List of paper metadata dictionaries.")
+    paper_candidates: Annotated[List[Dict[str, Any]], merge_paper_candidates] = Field(
+        default_factory=list,
+        description="List of paper metadata dictionaries, merged across per-keyword arXiv searches.",
+    )
     selected_paper: Optional[Dict[str, Any]] = Field(None, description="The single paper selected for the post.")
     paper_approved: bool = Field(False, description="Flag indicating if the user has confirmed the paper selection.")
     
@@ -32,6 +76,10 @@ class AppState(BaseModel):
     human_feedback: Optional[str] = Field(None, description="Feedback provided by the human user.")
     approved: bool = Field(False, description="Flag indicating if the post has been approved.")
     revision_requested: bool = Field(False, description="Human requested a rewrite of the current draft.")
+    publish_at: Optional[datetime] = Field(
+        None, description="When to publish the approved post (naive times are UTC); None publishes right away."
+    )
+    publish_job_id: Optional[int] = Field(None, description="Outbox id of the queued LinkedIn post; query its delivery status with it.")
     return_to_conversation: bool = Field(
         False,
         description="Flag to hop from execution back into the conversation loop for further discussion.",
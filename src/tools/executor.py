@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence
+
+from langchain_core.messages import ToolMessage
+
+from src.config.settings import settings
+from src.services.logger import get_logger
+
+logger = get_logger(__name__)
+
+TOOL_MAX_CONCURRENCY = 4
+# Per-tool overrides of settings.tool_timeout_seconds.
+TOOL_TIMEOUTS: Dict[str, float] = {}
+
+
+async def _run_tool_call(
+    call: Mapping[str, Any], tool: Any, semaphore: asyncio.Semaphore, timeout: float
+) -> ToolMessage:
+    async with semaphore:
+        try:
+            result = await asyncio.wait_for(tool.ainvoke(call.get("args", {})), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Tool {tool.name} timed out after {timeout:.0f}s")
+            result = f"{tool.name} timed out."
+        except Exception as exc:
+            logger.error(f"Tool {tool.name} failed: {exc}")
+            result = f"{tool.name} unavailable."
+    return ToolMessage(content=str(result), tool_call_id=call.get("id"))
+
+
+async def _unknown_tool_call(call: Mapping[str, Any]) -> ToolMessage:
+    logger.warning(f"Unknown tool requested: {call.get('name')}")
+    # Every tool call needs a reply, or the next model request is rejected
+    return ToolMessage(content=f"Unknown tool {call.get('name')}.", tool_call_id=call.get("id"))
+
+
+async def run_tool_calls(
+    tool_calls: Sequence[Mapping[str, Any]],
+    tool_map: Mapping[str, Any],
+    max_concurrency: int = TOOL_MAX_CONCURRENCY,
+    timeout: Optional[float] = None,
+) -> List[ToolMessage]:
+    """
+    Runs one model turn's tool calls concurrently (at most `max_concurrency` at once, each
+    under its timeout) and returns their ToolMessages in the order the calls were made.
+    Failures, timeouts and unknown tools become error messages so the model can carry on
+    without them.
+    """
+    timeout = settings.tool_timeout_seconds if timeout is None else timeout
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pending = []
+    for call in tool_calls:
+        tool = tool_map.get(call.get("name"))
+        if not tool:
+            pending.append(_unknown_tool_call(call))
+            continue
+        pending.append(_run_tool_call(call, tool, semaphore, TOOL_TIMEOUTS.get(tool.name, timeout)))
+    return list(await asyncio.gather(*pending))
+
+
+def answer_only(llm_with_tools: Any) -> Any:
+    """`llm_with_tools` with tool use switched off (`tool_choice="none"`), so it has to answer in text."""
+    bind = getattr(llm_with_tools, "bind", None)
+    return bind(tool_choice="none") if callable(bind) else llm_with_tools
+
+
+def _budget_exhausted_reply(call: Mapping[str, Any]) -> ToolMessage:
+    return ToolMessage(
+        content="Not run: the tool budget is used up. Answer with what you have.", tool_call_id=call.get("id")
+    )
+
+
+async def run_tool_loop(
+    llm_with_tools: Any,
+    messages: List[Any],
+    tool_map: Mapping[str, Any],
+    max_steps: Optional[int] = None,
+    invoke: Optional[Callable[[List[Any]], Awaitable[Any]]] = None,
+    final_invoke: Optional[Callable[[List[Any]], Awaitable[Any]]] = None,
+) -> Any:
+    """
+    Calls the model, runs the tools it asks for, and feeds the results back until it
+    answers without tool calls. Returns the final response.
+
+    After `max_steps` tool rounds, calls still pending are answered as not run and the model
+    is asked once more with tools off, so the result is always a text answer.
+    `invoke` replaces `llm_with_tools.ainvoke` for each model call (e.g. to stream tokens);
+    `final_invoke` replaces that last tools-off call (default: `answer_only(llm_with_tools)`).
+    """
+    max_steps = settings.tool_max_steps if max_steps is None else max_steps
+    invoke = invoke or llm_with_tools.ainvoke
+    response = await invoke(messages)
+    for _ in range(max_steps):
+        tool_calls = getattr(response, "tool_calls", None) or []
+        if not tool_calls:
+            return response
+        tool_messages = await run_tool_calls(tool_calls, tool_map)
+        messages = messages + [response] + tool_messages
+        response = await invoke(messages)
+
+    tool_calls = getattr(response, "tool_calls", None) or []
+    if not tool_calls:
+        return response
+    logger.warning(f"Tool step budget ({max_steps}) exhausted; asking for an answer without tools.")
+    messages = messages + [response] + [_budget_exhausted_reply(call) for call in tool_calls]
+    final_invoke = final_invoke or answer_only(llm_with_tools).ainvoke
+    return await final_invoke(messages)
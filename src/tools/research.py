@@ -5,7 +5,9 @@ from langchain_core.tools import tool
 
 from src.config.settings import settings
 from src.services.arxiv_client import ArxivService
+from src.services.local_arxiv_index import get_local_arxiv_index
 from src.services.logger import get_logger
+from src.services.rate_limit import PRIORITY_INTERACTIVE, request_priority
 
 logger = get_logger(__name__)
 
@@ -60,10 +62,12 @@ async def expand_paper_context(title: str, summary: str) -> str:
     if not title and not summary:
         return "No paper provided to expand."
 
-    service = ArxivService()
+    service = get_local_arxiv_index() or ArxivService()
     try:
         query = title or summary[:80]
-        papers = await service.search_papers(query=query, max_results=3)
+        # A user is waiting on this call, so it jumps ahead of queued bulk fetches
+        with request_priority(PRIORITY_INTERACTIVE):
+            papers = await service.search_papers(query=query, max_results=3)
     except Exception as exc:
         logger.error(f"ArXiv expansion failed: {exc}")
         papers = []
@@ -17,3 +17,44 @@ def _seed():
     random.seed(1337)
     if np is not None:
         np.random.seed(1337)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep service caches out of the repo's data/cache directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("src.services.utils.CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def _isolated_publish_outbox(tmp_path, monkeypatch):
+    """Queue posts in a per-test outbox file instead of data/publish_outbox.sqlite3."""
+    path = tmp_path / "publish_outbox.sqlite3"
+    monkeypatch.setattr("src.services.publish_outbox.DEFAULT_OUTBOX_PATH", path)
+    # A background worker thread would outlive the test; tests drive OutboxWorker directly.
+    monkeypatch.setattr("src.agents.publisher.start_publish_worker", lambda worker=None: None)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuit_breakers():
+    """Breakers are process-wide; don't let one test's failures trip the next."""
+    from src.services.circuit_breaker import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def _reset_registries():
+    """Nodes share chat models and compiled prompts; don't hand one test's mocks to the next."""
+    from src.services.model_registry import clear_model_registry
+    from src.services.prompt_registry import clear_prompt_registry
+
+    clear_model_registry()
+    clear_prompt_registry()
+    yield
+    clear_model_registry()
+    clear_prompt_registry()
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.graph import graph
 from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
 
 pytestmark = pytest.mark.anyio
 
@@ -46,9 +47,9 @@ async def test_checkpoint_resumes_mid_run(monkeypatch):
     initial_state.post_draft = None
     initial_state.approved = False
 
-    with patch('src.agents.post_writer.init_chat_model', return_value=LLMStub()), \
-         patch('src.agents.post_writer.ChatPromptTemplate.from_template', return_value=PromptStub("template")), \
-         patch('src.agents.post_writer.PROMPTS_DIR') as mock_prompts_dir, \
+    with patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry, return_value=LLMStub()), \
+         patch('src.services.prompt_registry.ChatPromptTemplate.from_template', return_value=PromptStub("template")), \
+         patch('src.services.prompt_registry.PROMPTS_DIR') as mock_prompts_dir, \
          patch('src.agents.human_approval.interrupt', return_value={"type": "accept", "args": "ok"}), \
          patch('src.agents.post_writer.settings.openai_api_key', "key", create=True), \
          patch('src.agents.post_writer.settings.llm_model', "gpt-stub", create=True):
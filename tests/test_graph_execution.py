@@ -3,6 +3,7 @@ from langsmith.run_helpers import traceable
 from src.graph import graph
 from src.state import AppState
 from unittest.mock import patch, MagicMock, AsyncMock
+from tests.utils.chat_models import fake_model_registry
 
 @traceable
 @pytest.mark.asyncio
@@ -13,14 +14,14 @@ async def test_full_graph_execution():
     # Mock all external services to avoid API calls and ensure deterministic flow
     with patch('src.agents.trend_scanner.GoogleTrendsService') as MockTrends, \
          patch('src.agents.arxiv_fetcher.ArxivService') as MockArxiv, \
-         patch('src.agents.relevance_ranker.init_chat_model') as MockRankerModel, \
-         patch('src.agents.relevance_ranker.ChatPromptTemplate') as MockRankPrompt, \
-         patch('src.agents.conversation_agent.init_chat_model') as MockConvModel, \
-         patch('src.agents.post_writer.init_chat_model') as MockWriterModel, \
+         patch('src.agents.relevance_ranker.get_chat_model', new_callable=fake_model_registry) as MockRankerModel, \
+         patch('src.agents.relevance_ranker.get_prompt') as MockRankPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockConvModel, \
+         patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry) as MockWriterModel, \
          patch('src.agents.human_approval.interrupt', return_value={"type": "accept", "args": "Looks good"}) as mock_approval_interrupt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "accept", "args": None}) as mock_conv_interrupt, \
          patch('src.agents.human_paper_review.interrupt', return_value={"type": "accept", "args": None}) as mock_review_interrupt, \
-         patch('src.agents.publisher.LinkedInService') as MockLinkedInService, \
+         patch('src.agents.publisher.start_publish_worker') as mock_start_worker, \
          patch('src.agents.memory_loader.MemoryStore') as MockStoreLoader, \
          patch('src.agents.memory_updater.MemoryStore') as MockStoreUpdater:
          
@@ -62,7 +63,7 @@ async def test_full_graph_execution():
         structured_ranker_llm.ainvoke = AsyncMock(return_value=RankResult())
         structured_ranker_llm.invoke = MagicMock(return_value=RankResult())
         # chain = prompt | structured_llm
-        mock_rank_prompt = MockRankPrompt.from_template.return_value
+        mock_rank_prompt = MockRankPrompt.return_value
         mock_rank_prompt.__or__.return_value = structured_ranker_llm
         
         # Conversation LLM returns question
@@ -82,7 +83,6 @@ async def test_full_graph_execution():
         mock_writer_instance.invoke.return_value = mock_writer_response
         mock_writer_instance.return_value = mock_writer_response
         MockWriterModel.return_value = mock_writer_instance
-        MockLinkedInService.return_value.post_update = AsyncMock(return_value=True)
 
         state = AppState()
         
@@ -130,14 +130,14 @@ async def test_full_graph_revise_flow():
     """
     with patch('src.agents.trend_scanner.GoogleTrendsService') as MockTrends, \
          patch('src.agents.arxiv_fetcher.ArxivService') as MockArxiv, \
-         patch('src.agents.relevance_ranker.init_chat_model') as MockRankerModel, \
-         patch('src.agents.relevance_ranker.ChatPromptTemplate') as MockRankPrompt, \
-         patch('src.agents.conversation_agent.init_chat_model') as MockConvModel, \
-         patch('src.agents.post_writer.init_chat_model') as MockWriterModel, \
+         patch('src.agents.relevance_ranker.get_chat_model', new_callable=fake_model_registry) as MockRankerModel, \
+         patch('src.agents.relevance_ranker.get_prompt') as MockRankPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockConvModel, \
+         patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry) as MockWriterModel, \
          patch('src.agents.human_approval.interrupt') as mock_approval_interrupt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "accept", "args": None}) as mock_conv_interrupt, \
          patch('src.agents.human_paper_review.interrupt', return_value={"type": "accept", "args": None}) as mock_review_interrupt, \
-         patch('src.agents.publisher.LinkedInService') as MockLinkedInService, \
+         patch('src.agents.publisher.start_publish_worker') as mock_start_worker, \
          patch('src.agents.memory_loader.MemoryStore') as MockStoreLoader, \
          patch('src.agents.memory_updater.MemoryStore') as MockStoreUpdater:
          
@@ -175,7 +175,7 @@ async def test_full_graph_revise_flow():
             rationale = "v1"
 
         structured_ranker_llm.ainvoke = AsyncMock(return_value=RankResult())
-        mock_rank_prompt = MockRankPrompt.from_template.return_value
+        mock_rank_prompt = MockRankPrompt.return_value
         mock_rank_prompt.__or__.return_value = structured_ranker_llm
         
         # Conversation
@@ -197,7 +197,6 @@ async def test_full_graph_revise_flow():
         mock_writer_instance.ainvoke = AsyncMock(side_effect=[mock_writer_response_v1, mock_writer_response_v2])
         mock_writer_instance.side_effect = [mock_writer_response_v1, mock_writer_response_v2] # Handle __call__
         MockWriterModel.return_value = mock_writer_instance
-        MockLinkedInService.return_value.post_update = AsyncMock(return_value=True)
         
         # Approval interrupt - first request edit (revision), then accept
         mock_approval_interrupt.side_effect = [
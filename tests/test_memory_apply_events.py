@@ -76,7 +76,7 @@ async def test_apply_memory_events_style_and_comp_llm():
     style_llm.ainvoke = AsyncMock(return_value=style_result)
     comp_llm.ainvoke = AsyncMock(return_value=comp_result)
 
-    with patch('src.memory.apply_events.ChatPromptTemplate') as MockPrompt:
+    with patch('src.services.prompt_registry.ChatPromptTemplate') as MockPrompt:
         mock_template_style = MagicMock()
         mock_template_comp = MagicMock()
         MockPrompt.from_template.side_effect = [mock_template_style, mock_template_comp]
@@ -7,6 +7,7 @@ from src.agents.human_approval import human_approval
 from src.agents.memory_updater import update_memory
 from src.agents.post_writer import write_post
 from src.core.paths import MEMORY_DIR
+from tests.utils.chat_models import fake_model_registry
 
 @pytest.mark.asyncio
 async def test_multi_iteration_edit_persistence():
@@ -95,7 +96,7 @@ async def test_multi_iteration_edit_persistence():
                 return MagicMock(content="Draft 3 (Short)", tool_calls=[])
 
         with patch("src.agents.post_writer.settings") as mock_settings, \
-             patch("src.agents.post_writer.init_chat_model") as mock_init_llm:
+             patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry) as mock_init_llm:
             
             mock_settings.openai_api_key = "fake_key"
             mock_settings.tavily_api_key = "fake" # Enable tools path
@@ -127,7 +128,7 @@ async def test_multi_iteration_edit_persistence():
 
         # --- Step 7: Memory Updater ---
         # Mock LLMs for memory extraction
-        with patch("src.agents.memory_updater.init_chat_model") as mock_init_mem:
+        with patch("src.agents.memory_updater.get_chat_model", new_callable=fake_model_registry) as mock_init_mem:
             mock_llm_mem = MagicMock()
             mock_init_mem.return_value = mock_llm_mem
             
@@ -1,5 +1,7 @@
-from src.agents.arxiv_fetcher import fetch_arxiv_papers
-from src.state import AppState
+import asyncio
+
+from src.agents.arxiv_fetcher import fetch_arxiv_papers, plan_arxiv_searches
+from src.state import AppState, merge_paper_candidates
 from unittest.mock import patch, AsyncMock
 import pytest
 
@@ -19,3 +21,48 @@ async def test_arxiv_fetcher_basic():
         mock_search.assert_called_once()
         args, _ = mock_search.call_args
         assert 'all:"AI"' in args[0]
+
+
+@pytest.mark.asyncio
+async def test_arxiv_fetcher_searches_keywords_concurrently_and_balances():
+    started = []
+    release = asyncio.Event()
+
+    async def fake_search(query, max_results=5):
+        started.append(query)
+        if len(started) == 3:
+            release.set()
+        await release.wait()  # only completes once every search is in flight
+        keyword = query.split('"')[1]
+        return [{"title": f"{keyword} paper {i}", "url": f"http://arxiv.org/abs/{keyword}.{i}v1"} for i in range(3)]
+
+    with patch('src.services.arxiv_client.ArxivService.search_papers', side_effect=fake_search):
+        state = AppState(trending_keywords=["llm", "rl", "vision", "ignored"])
+        updates = await asyncio.wait_for(fetch_arxiv_papers(state), timeout=2)
+
+    titles = [p["title"] for p in updates["paper_candidates"]]
+    assert titles[:3] == ["llm paper 0", "rl paper 0", "vision paper 0"]
+    assert len(titles) == 9
+    assert len(started) == 3
+
+
+def test_plan_arxiv_searches_sends_one_branch_per_keyword():
+    sends = plan_arxiv_searches(AppState(trending_keywords=["a", "b"]))
+    assert [s.node for s in sends] == ["arxiv_fetcher", "arxiv_fetcher"]
+    assert [s.arg.trending_keywords for s in sends] == [["a"], ["b"]]
+
+
+def test_merge_paper_candidates_dedupes_by_id_and_title():
+    first = [
+        {"title": "Attention Is All You Need", "url": "http://arxiv.org/abs/1706.03762v1", "keyword": "a"},
+        {"title": "Other", "keyword": "a"},
+    ]
+    second = [
+        {"title": "Different title, same id", "url": "http://arxiv.org/abs/1706.03762v5", "keyword": "b"},
+        {"title": "attention is all you need!", "keyword": "b"},
+        {"title": "Unique", "keyword": "b"},
+    ]
+
+    merged = merge_paper_candidates(merge_paper_candidates([], first), second)
+
+    assert [p["title"] for p in merged] == ["Attention Is All You Need", "Unique", "Other"]
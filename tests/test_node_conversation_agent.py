@@ -4,14 +4,15 @@ from src.state import AppState
 from unittest.mock import MagicMock, patch, AsyncMock
 import pytest
 from langgraph.errors import GraphInterrupt
+from tests.utils.chat_models import fake_model_registry
 
 @pytest.mark.asyncio
 async def test_conversation_agent_openai():
     # Case 1: Paper selected -> model asks, user says READY
     state = AppState(selected_paper={"title": "Paper", "summary": "Summary"})
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "accept", "args": None}) as mock_interrupt:
 
         mock_runnable = MagicMock()
@@ -23,7 +24,7 @@ async def test_conversation_agent_openai():
 
         mock_runnable.ainvoke.side_effect = async_return
 
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
 
         updates = await conversation_node(state)
@@ -36,8 +37,8 @@ async def test_conversation_agent_openai():
     state = AppState(selected_paper=None)
     
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', return_value=None) as mock_interrupt:
         
         mock_runnable = MagicMock()
@@ -48,7 +49,7 @@ async def test_conversation_agent_openai():
             return mock_content
         mock_runnable.ainvoke.side_effect = async_return
         
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
         
         updates = await conversation_node(state)
@@ -61,8 +62,8 @@ async def test_conversation_agent_openai():
     state = AppState(selected_paper=None)
     
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "accept", "args": None}) as mock_interrupt:
         
         mock_runnable = MagicMock()
@@ -72,7 +73,7 @@ async def test_conversation_agent_openai():
             return mock_content
         mock_runnable.ainvoke.side_effect = async_return
         
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
         
         updates = await conversation_node(state)
@@ -84,8 +85,8 @@ async def test_conversation_agent_openai():
 async def test_conversation_agent_propagates_interrupt():
     state = AppState(selected_paper={"title": "Paper", "summary": "Summary"})
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', side_effect=GraphInterrupt("test interrupt")):
 
         mock_runnable = MagicMock()
@@ -97,7 +98,7 @@ async def test_conversation_agent_propagates_interrupt():
 
         mock_runnable.ainvoke.side_effect = async_return
 
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
 
         with pytest.raises(GraphInterrupt):
@@ -108,8 +109,8 @@ async def test_conversation_agent_propagates_interrupt():
 async def test_conversation_agent_response_adds_memory_and_history():
     state = AppState(selected_paper={"title": "Paper", "summary": "Summary"})
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "response", "args": "Can you simplify?"}):
 
         mock_runnable = MagicMock()
@@ -121,7 +122,7 @@ async def test_conversation_agent_response_adds_memory_and_history():
 
         mock_runnable.ainvoke.side_effect = async_return
 
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
 
         updates = await conversation_node(state)
@@ -135,8 +136,8 @@ async def test_conversation_agent_response_adds_memory_and_history():
 async def test_conversation_agent_ignore_sets_exit():
     state = AppState(selected_paper={"title": "Paper", "summary": "Summary"})
     with patch.object(settings, "openai_api_key", "test-key", create=True), \
-         patch('src.agents.conversation_agent.init_chat_model') as MockInitModel, \
-         patch('src.agents.conversation_agent.ChatPromptTemplate') as MockPrompt, \
+         patch('src.agents.conversation_agent.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.agents.conversation_agent.compile_prompt') as MockPrompt, \
          patch('src.agents.conversation_agent.interrupt', return_value={"type": "ignore", "args": None}):
 
         mock_runnable = MagicMock()
@@ -148,7 +149,7 @@ async def test_conversation_agent_ignore_sets_exit():
 
         mock_runnable.ainvoke.side_effect = async_return
 
-        mock_template = MockPrompt.from_template.return_value
+        mock_template = MockPrompt.return_value
         mock_template.__or__.return_value = mock_runnable
 
         updates = await conversation_node(state)
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch
 from src.agents.human_approval import human_approval
+from src.graph import execution_router
 from src.state import AppState
 
 
@@ -57,3 +58,37 @@ async def test_human_approval_ignore_sets_exit():
         updates = await human_approval(state)
 
     assert updates["exit_requested"] is True
+
+
+@pytest.mark.asyncio
+async def test_human_approval_accept_with_publish_at_schedules_the_post():
+    state = AppState(post_draft="Draft")
+    with patch('src.agents.human_approval.interrupt', return_value={"type": "accept", "args": {"publish_at": "2030-01-07T09:00:00Z"}}):
+        updates = await human_approval(state)
+
+    assert updates["approved"] is True
+    assert AppState(**{**state.model_dump(), **updates}).publish_at.isoformat() == "2030-01-07T09:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_human_approval_normalizes_naive_publish_at_to_utc():
+    state = AppState(post_draft="Draft")
+    with patch('src.agents.human_approval.interrupt', return_value={"type": "accept", "args": {"publish_at": "2030-01-07T09:00:00"}}):
+        updates = await human_approval(state)
+
+    assert updates["publish_at"].isoformat() == "2030-01-07T09:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_human_approval_rejects_unreadable_publish_at_and_asks_again():
+    state = AppState(post_draft="Draft")
+    with patch('src.agents.human_approval.interrupt', return_value={"type": "accept", "args": {"publish_at": "next tuesday 9am"}}):
+        updates = await human_approval(state)
+
+    assert updates["approved"] is False
+    assert "publish_at" not in updates
+    assert "next tuesday 9am" in updates["chat_history"][-1]["message"]
+    # The update applies cleanly, and the router sends the draft back for approval
+    next_state = AppState(**{**state.model_dump(), **updates})
+    assert next_state.publish_at is None
+    assert (await execution_router(next_state))["next_step"] == "human_approval"
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 from src.agents.memory_updater import update_memory
 from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
 
 @pytest.mark.asyncio
 async def test_memory_updater_style_update(tmp_path):
@@ -17,7 +18,7 @@ async def test_memory_updater_style_update(tmp_path):
     
     # Mock MemoryStore to use tmp_path
     with patch('src.agents.memory_updater.MemoryStore') as MockStore, \
-         patch('src.agents.memory_updater.init_chat_model') as MockInitModel, \
+         patch('src.agents.memory_updater.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
          patch('src.agents.memory_updater.apply_memory_events') as mock_apply_events, \
          patch('src.agents.memory_updater.settings') as mock_settings:
          
@@ -82,7 +83,7 @@ async def test_memory_updater_comprehension_update():
     )
 
     with patch('src.agents.memory_updater.MemoryStore') as MockStore, \
-         patch('src.agents.memory_updater.init_chat_model') as MockInitModel, \
+         patch('src.agents.memory_updater.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
          patch('src.agents.memory_updater.apply_memory_events') as mock_apply_events, \
          patch('src.agents.memory_updater.settings') as mock_settings:
 
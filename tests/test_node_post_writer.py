@@ -3,6 +3,7 @@ from src.config.settings import settings
 from src.state import AppState
 from unittest.mock import MagicMock, patch
 import pytest
+from tests.utils.chat_models import fake_model_registry
 
 @pytest.mark.asyncio
 async def test_post_writer_basic():
@@ -10,8 +11,8 @@ async def test_post_writer_basic():
     state = AppState(selected_paper=paper)
     
     # Mock ChatOpenAI and its invoke method
-    with patch('src.agents.post_writer.init_chat_model') as MockInitModel, \
-         patch('src.agents.post_writer.PROMPTS_DIR') as MockPromptsDir:
+    with patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.services.prompt_registry.PROMPTS_DIR') as MockPromptsDir:
         
         # Mock prompt file existence and read
         mock_prompt_file = MagicMock()
@@ -28,7 +29,7 @@ async def test_post_writer_basic():
             return mock_content
         mock_runnable.ainvoke.side_effect = async_return
         
-        with patch('src.agents.post_writer.ChatPromptTemplate') as MockPrompt:
+        with patch('src.services.prompt_registry.ChatPromptTemplate') as MockPrompt:
              mock_template = MockPrompt.from_template.return_value
              mock_template.__or__.return_value = mock_runnable
              
@@ -54,9 +55,9 @@ async def test_post_writer_respects_format_preferences():
         },
     )
 
-    with patch('src.agents.post_writer.init_chat_model') as MockInitModel, \
-         patch('src.agents.post_writer.PROMPTS_DIR') as MockPromptsDir, \
-         patch('src.agents.post_writer.ChatPromptTemplate') as MockPrompt, \
+    with patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.services.prompt_registry.PROMPTS_DIR') as MockPromptsDir, \
+         patch('src.services.prompt_registry.ChatPromptTemplate') as MockPrompt, \
          patch('src.agents.post_writer.settings') as mock_settings:
 
         mock_settings.openai_api_key = "test-key"
@@ -101,7 +102,7 @@ async def test_post_writer_missing_prompt_file():
     paper = {"title": "Test", "summary": "Summary"}
     state = AppState(selected_paper=paper)
 
-    with patch('src.agents.post_writer.PROMPTS_DIR') as MockPromptsDir:
+    with patch('src.services.prompt_registry.PROMPTS_DIR') as MockPromptsDir:
         mock_path = MagicMock()
         mock_path.read_text.side_effect = FileNotFoundError()
         MockPromptsDir.__truediv__.return_value = mock_path
@@ -115,7 +116,7 @@ async def test_post_writer_missing_api_key():
     paper = {"title": "Test", "summary": "Summary"}
     state = AppState(selected_paper=paper)
 
-    with patch('src.agents.post_writer.PROMPTS_DIR') as MockPromptsDir, \
+    with patch('src.services.prompt_registry.PROMPTS_DIR') as MockPromptsDir, \
          patch('src.agents.post_writer.settings') as mock_settings:
 
         mock_settings.openai_api_key = None
@@ -138,9 +139,9 @@ async def test_post_writer_includes_all_edit_requests():
         ],
     )
 
-    with patch('src.agents.post_writer.init_chat_model') as MockInitModel, \
-         patch('src.agents.post_writer.PROMPTS_DIR') as MockPromptsDir, \
-         patch('src.agents.post_writer.ChatPromptTemplate') as MockPrompt, \
+    with patch('src.agents.post_writer.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.services.prompt_registry.PROMPTS_DIR') as MockPromptsDir, \
+         patch('src.services.prompt_registry.ChatPromptTemplate') as MockPrompt, \
          patch('src.agents.post_writer.settings') as mock_settings:
 
         mock_settings.openai_api_key = "test-key"
@@ -222,9 +223,9 @@ async def test_post_writer_uses_tools_when_available(monkeypatch):
     with patch.object(settings, "openai_api_key", "key", create=True), \
          patch.object(settings, "tavily_api_key", "tv", create=True), \
          patch.object(settings, "llm_model", "gpt-stub", create=True), \
-         patch("src.agents.post_writer.init_chat_model", return_value=LLMStub()), \
-         patch("src.agents.post_writer.ChatPromptTemplate.from_template", return_value=PromptStub("t")), \
-         patch("src.agents.post_writer.PROMPTS_DIR") as mock_prompts_dir:
+         patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry, return_value=LLMStub()), \
+         patch("src.services.prompt_registry.ChatPromptTemplate.from_template", return_value=PromptStub("t")), \
+         patch("src.services.prompt_registry.PROMPTS_DIR") as mock_prompts_dir:
 
         mock_prompt_file = MagicMock()
         mock_prompt_file.read_text.return_value = "Template"
@@ -288,9 +289,9 @@ async def test_post_writer_handles_tool_failure(monkeypatch):
     with patch.object(settings, "openai_api_key", "key", create=True), \
          patch.object(settings, "tavily_api_key", "tv", create=True), \
          patch.object(settings, "llm_model", "gpt-stub", create=True), \
-         patch("src.agents.post_writer.init_chat_model", return_value=LLMStub()), \
-         patch("src.agents.post_writer.ChatPromptTemplate.from_template", return_value=PromptStub("t")), \
-         patch("src.agents.post_writer.PROMPTS_DIR") as mock_prompts_dir:
+         patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry, return_value=LLMStub()), \
+         patch("src.services.prompt_registry.ChatPromptTemplate.from_template", return_value=PromptStub("t")), \
+         patch("src.services.prompt_registry.PROMPTS_DIR") as mock_prompts_dir:
 
         mock_prompt_file = MagicMock()
         mock_prompt_file.read_text.return_value = "Template"
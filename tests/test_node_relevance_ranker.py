@@ -2,14 +2,15 @@ from src.agents.relevance_ranker import rank_papers
 from src.state import AppState
 from unittest.mock import MagicMock, patch
 import pytest
+from tests.utils.chat_models import fake_model_registry
 
 @pytest.mark.asyncio
 async def test_relevance_ranker_openai():
     candidates = [{"title": "Paper 1", "summary": "Summary 1"}, {"title": "Paper 2", "summary": "Summary 2"}]
     state = AppState(paper_candidates=candidates, trending_keywords=["AI"])
     
-    with patch('src.agents.relevance_ranker.init_chat_model') as MockInitModel, \
-         patch('src.agents.relevance_ranker.ChatPromptTemplate') as MockPrompt:
+    with patch('src.agents.relevance_ranker.get_chat_model', new_callable=fake_model_registry) as MockInitModel, \
+         patch('src.services.prompt_registry.ChatPromptTemplate') as MockPrompt:
         
         base_llm = MockInitModel.return_value
         structured_llm = MagicMock()
@@ -5,6 +5,7 @@ import pytest
 
 from src.graph import graph
 from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
 
 
 @pytest.mark.asyncio
@@ -14,16 +15,17 @@ async def test_graph_completes_under_two_seconds():
 
     with patch("src.agents.trend_scanner.GoogleTrendsService") as MockTrends, \
          patch("src.agents.arxiv_fetcher.ArxivService") as MockArxiv, \
-         patch("src.agents.relevance_ranker.init_chat_model") as MockRankerModel, \
-         patch("src.agents.relevance_ranker.ChatPromptTemplate") as MockRankPrompt, \
+         patch("src.agents.relevance_ranker.get_chat_model", new_callable=fake_model_registry) as MockRankerModel, \
+         patch("src.agents.relevance_ranker.get_prompt") as MockRankPrompt, \
          patch("src.agents.conversation_agent._invoke_with_tools", new=AsyncMock(return_value=("content", [], "question"))), \
          patch("src.agents.conversation_agent._invoke_legacy", new=AsyncMock(return_value=("content", [], "question"))), \
-         patch("src.agents.conversation_agent.init_chat_model") as MockConvModel, \
-         patch("src.agents.post_writer.init_chat_model") as MockWriterModel, \
-         patch("src.agents.post_writer.ChatPromptTemplate") as MockPWPrompt, \
+         patch("src.agents.conversation_agent.get_chat_model", new_callable=fake_model_registry) as MockConvModel, \
+         patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry) as MockWriterModel, \
+         patch("src.agents.post_writer.compile_prompt") as MockPWPrompt, \
          patch("src.agents.human_approval.interrupt", return_value={"type": "accept", "args": "Looks good"}), \
          patch("src.agents.conversation_agent.interrupt", return_value={"type": "accept", "args": None}), \
          patch("src.agents.human_paper_review.interrupt", return_value={"type": "accept", "args": None}), \
+         patch("src.agents.memory_updater.get_chat_model", new_callable=fake_model_registry), \
          patch("src.agents.memory_loader.MemoryStore") as MockStoreLoader, \
          patch("src.agents.memory_updater.MemoryStore") as MockStoreUpdater:
 
@@ -59,7 +61,7 @@ async def test_graph_completes_under_two_seconds():
 
         structured_ranker_llm.ainvoke = AsyncMock(return_value=RankResult())
         structured_ranker_llm.invoke = MagicMock(return_value=RankResult())
-        mock_rank_prompt = MockRankPrompt.from_template.return_value
+        mock_rank_prompt = MockRankPrompt.return_value
         mock_rank_prompt.__or__.return_value = structured_ranker_llm
 
         class ConvResp:
@@ -78,7 +80,7 @@ async def test_graph_completes_under_two_seconds():
                 self.ainvoke = AsyncMock(return_value=WriterResp())
         MockWriterModel.return_value = WriterLLM()
 
-        mock_pw_prompt = MockPWPrompt.from_template.return_value
+        mock_pw_prompt = MockPWPrompt.return_value
         runnable = MagicMock()
 
         async def pw_async_return(inputs, *_, **__):
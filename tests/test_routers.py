@@ -39,3 +39,13 @@ async def test_execution_router_branches(kwargs, expected):
     state = AppState(**kwargs)
     result = await execution_router(state)
     assert result["next_step"] == expected
+
+
+def test_route_planning_fans_out_arxiv_fetch():
+    from src.graph import route_planning
+
+    state = AppState(trending_keywords=["ai", "llm"], next_step="arxiv_fetcher")
+    sends = route_planning(state)
+    assert [s.arg.trending_keywords for s in sends] == [["ai"], ["llm"]]
+
+    assert route_planning(AppState(next_step="trend_scanner")) == "trend_scanner"
@@ -0,0 +1,227 @@
+import asyncio
+import datetime
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import arxiv_client
+from src.services.arxiv_client import ArxivService
+
+
+def make_result(i):
+    return SimpleNamespace(
+        title=f"Paper {i}",
+        summary=f"Summary\n$x_{i}$",
+        entry_id=f"http://arxiv.org/abs/2401.0000{i}v1",
+        published=datetime.datetime(2024, 1, 1 + i),
+    )
+
+
+class PagedClient:
+    """Fake arxiv.Client that blocks before its second page until released."""
+
+    page_size = 2
+
+    def __init__(self, total=4):
+        self.total = total
+        self.second_page = threading.Event()
+        self.calls = 0
+
+    def results(self, search):
+        self.calls += 1
+        for i in range(min(self.total, search.max_results)):
+            if i == self.page_size:
+                self.second_page.wait(timeout=5)
+            yield make_result(i)
+
+
+@pytest.mark.asyncio
+async def test_stream_papers_yields_first_page_before_later_pages():
+    svc = ArxivService()
+    svc.client = PagedClient()
+
+    stream = svc.stream_papers("all:llm", max_results=4)
+    first = await asyncio.wait_for(anext(stream), timeout=2)
+    second = await asyncio.wait_for(anext(stream), timeout=2)
+
+    assert first == {
+        "title": "Paper 0",
+        "summary": "Summary x_0",
+        "url": "http://arxiv.org/abs/2401.00000v1",
+        "published": "2024-01-01T00:00:00",
+    }
+    assert second["title"] == "Paper 1"
+
+    # Reaching the next item makes the first page's results land in the cache.
+    third_task = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0.05)
+    assert [p["title"] for p in await svc._get_from_cache("all:llm")] == ["Paper 0", "Paper 1"]
+
+    svc.client.second_page.set()
+    third = await asyncio.wait_for(third_task, timeout=2)
+    rest = [p async for p in stream]
+
+    assert [p["title"] for p in [third, *rest]] == ["Paper 2", "Paper 3"]
+    assert len(await svc._get_from_cache("all:llm")) == 4
+
+
+@pytest.mark.asyncio
+async def test_search_papers_collects_stream_and_reuses_cache():
+    svc = ArxivService()
+    svc.client = PagedClient(total=3)
+    svc.client.second_page.set()
+
+    papers = await svc.search_papers("all:rl", max_results=3)
+    assert [p["title"] for p in papers] == ["Paper 0", "Paper 1", "Paper 2"]
+
+    again = await svc.search_papers("all:rl", max_results=2)
+    assert [p["title"] for p in again] == ["Paper 0", "Paper 1"]
+    assert svc.client.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_search_papers_returns_empty_list_on_upstream_error():
+    class BrokenClient:
+        page_size = 100
+
+        def results(self, _search):
+            raise RuntimeError("arxiv down")
+
+    svc = ArxivService()
+    svc.client = BrokenClient()
+
+    assert await svc.search_papers("all:ai") == []
+
+
+@pytest.mark.asyncio
+async def test_failed_query_is_negatively_cached():
+    class CountingBrokenClient:
+        page_size = 100
+        calls = 0
+
+        def results(self, _search):
+            self.calls += 1
+            raise RuntimeError("arxiv down")
+
+    svc = ArxivService()
+    svc.client = CountingBrokenClient()
+
+    assert await svc.search_papers("all:ai") == []
+    with pytest.raises(arxiv_client.ArxivUnavailableError):
+        async for _ in svc.stream_papers("all:AI"):
+            pass
+    assert svc.client.calls == 1
+
+    # Stale results are still served, but no refresh is attempted while the failure is cached
+    await svc.cache.set(svc._cache_key("all:ai"), [{"title": "Old"}], ttl=-1)
+    assert await svc.search_papers("all:ai", max_results=1) == [{"title": "Old"}]
+    assert arxiv_client.refresher.pending() == []
+
+
+class RecordingClient:
+    """Fake arxiv.Client that returns canned results and records each search query."""
+
+    page_size = 100
+
+    def __init__(self, results):
+        self.pages = list(results)
+        self.queries = []
+
+    def results(self, search):
+        self.queries.append(search.query)
+        yield from self.pages.pop(0)[: search.max_results]
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_fetches_only_papers_after_high_water_mark():
+    svc = ArxivService()
+    svc.client = RecordingClient([[make_result(3), make_result(2)], [make_result(4), make_result(3)]])
+
+    first = await svc.search_papers("all:llm", max_results=2)
+    assert [p["title"] for p in first] == ["Paper 3", "Paper 2"]
+    assert await svc.high_water.get(svc._cache_key("all:llm")) == "2024-01-04T00:00:00"
+
+    # Expire the list but keep the mark; the refresh asks only for newer submissions.
+    await svc.cache.set(svc._cache_key("all:llm"), await svc._get_from_cache("all:llm"), ttl=-1)
+    stale = await svc.search_papers("all:llm", max_results=2)
+    assert stale == first
+    await asyncio.gather(*arxiv_client.refresher.pending())
+
+    assert svc.client.queries[1].startswith("(all:llm) AND submittedDate:[202401040000 TO ")
+    refreshed = await svc.search_papers("all:llm", max_results=2)
+    assert [p["title"] for p in refreshed] == ["Paper 4", "Paper 3"]
+    assert await svc.high_water.get(svc._cache_key("all:llm")) == "2024-01-05T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_small_delta_is_merged_in_front_of_cached_results():
+    svc = ArxivService()
+    svc.client = RecordingClient([[make_result(4)]])
+    old = [{"title": f"Old {i}", "url": f"http://arxiv.org/abs/old{i}v1", "published": "2024-01-03T00:00:00"} for i in range(3)]
+    await svc._save_to_cache("all:llm", old)
+    await svc.cache.set(svc._cache_key("all:llm"), old, ttl=-1)
+
+    assert await svc.search_papers("all:llm", max_results=3) == old
+    await asyncio.gather(*arxiv_client.refresher.pending())
+
+    assert [p["title"] for p in await svc._get_from_cache("all:llm")] == ["Paper 4", "Old 0", "Old 1", "Old 2"]
+
+
+@pytest.mark.asyncio
+async def test_empty_delta_refreshes_cached_list():
+    svc = ArxivService()
+    svc.client = RecordingClient([[]])
+    old = [{"title": "Old", "url": "http://arxiv.org/abs/old", "published": "2024-01-03T00:00:00"}]
+    await svc._save_to_cache("all:llm", old)
+    await svc.cache.set(svc._cache_key("all:llm"), old, ttl=-1)
+
+    assert await svc.search_papers("all:llm", max_results=1) == old
+    await asyncio.gather(*arxiv_client.refresher.pending())
+    entry = await svc.cache.get_entry(svc._cache_key("all:llm"))
+    assert not entry.expired
+
+
+@pytest.mark.asyncio
+async def test_short_complete_result_list_is_a_cache_hit():
+    svc = ArxivService()
+    svc.client = RecordingClient([[make_result(1)]])
+
+    assert len(await svc.search_papers("ti:rare", max_results=5)) == 1
+    # arXiv had fewer matches than requested, so the cached list is complete
+    assert len(await svc.search_papers("ti:rare", max_results=5)) == 1
+    assert len(svc.client.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_first_page_token_is_taken_on_the_loop_and_pages_run_on_the_arxiv_executor(monkeypatch):
+    calls = []
+
+    class RecordingLimiter:
+        async def acquire_async(self):
+            calls.append("loop")
+            return 0.0
+
+        def acquire(self):
+            calls.append("thread")
+            return 0.0
+
+    client = arxiv_client.ScheduledArxivClient(RecordingLimiter())
+    monkeypatch.setattr(arxiv_client.arxiv.Client, "_parse_feed", lambda self, url, first_page=True, _try_index=0: None)
+    threads = []
+
+    def results(search):
+        for i in range(2):
+            client._parse_feed("http://export.arxiv.org/api/query", first_page=i == 0)
+            threads.append(threading.current_thread().name)
+            yield make_result(i)
+
+    client.results = results
+    svc = ArxivService()
+    svc.client = client
+
+    papers = [paper async for paper in svc._stream_search("all:llm", 2)]
+
+    assert len(papers) == 2
+    assert calls == ["loop", "thread"]
+    assert all(name.startswith("arxiv") for name in threads)
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from src.services import utils
+from src.services.arxiv_client import ArxivService
+from src.services.utils import (
+    BackgroundRefresher,
+    LRUCache,
+    SQLiteCache,
+    cache_stats,
+    get_cache_path,
+    load_cache,
+    normalize_cache_key,
+    save_cache,
+)
+
+
+def test_normalize_cache_key_collapses_whitespace_and_case():
+    assert normalize_cache_key('  all:"LLM"   OR all:"AI" ') == 'all:"llm" or all:"ai"'
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_roundtrip_and_upsert():
+    cache = SQLiteCache("test")
+
+    assert await cache.get("missing") is None
+
+    await cache.set("q", [{"title": "A"}])
+    assert await cache.get("q") == [{"title": "A"}]
+
+    await cache.set("q", [{"title": "B"}])
+    assert await cache.get("q") == [{"title": "B"}]
+
+    await cache.delete("q")
+    assert await cache.get("q") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_ttl_expiry_and_purge():
+    cache = SQLiteCache("test", ttl=60)
+    await cache.set("fresh", 1)
+    await cache.set("stale", 2, ttl=-1)
+
+    assert await cache.get("fresh") == 1
+    assert await cache.get("stale") is None
+
+    entry = await cache.get_entry("stale")
+    assert entry is not None and entry.expired and entry.value == 2
+
+    assert await cache.purge_expired() == 1
+    assert await cache.get_entry("stale") is None
+    assert await cache.get("fresh") == 1
+
+
+@pytest.mark.asyncio
+async def test_purging_one_namespace_keeps_the_others_in_memory():
+    purged = SQLiteCache("purged", ttl=60)
+    other = SQLiteCache("other", ttl=60)
+    await purged.set("stale", 1, ttl=-1)
+    await purged.set("fresh", 2)
+    await other.set("kept", 3)
+    memory = other._database().memory
+
+    assert await purged.purge_expired() == 1
+    assert memory.get(("purged", "stale")) is None
+    assert memory.get(("purged", "fresh")) is not None
+    assert memory.get(("other", "kept")) is not None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_namespaces_are_isolated():
+    await SQLiteCache("one").set("key", "a")
+    await SQLiteCache("two").set("key", "b")
+
+    assert await SQLiteCache("one").get("key") == "a"
+    assert await SQLiteCache("two").get("key") == "b"
+
+
+@pytest.mark.asyncio
+async def test_arxiv_service_serves_normalized_query_from_cache(monkeypatch):
+    svc = ArxivService()
+
+    class FailingClient:
+        def results(self, _search):
+            raise AssertionError("arXiv should not be queried on a cache hit")
+
+    svc.client = FailingClient()
+    await svc._save_to_cache('all:"LLM"', [{"title": "Cached"}])
+
+    assert await svc.search_papers('all:"llm"  ', max_results=1) == [{"title": "Cached"}]
+
+
+def test_lru_cache_evicts_by_entry_count_and_bytes():
+    lru = LRUCache(max_entries=2, max_bytes=100)
+    lru.put("a", 1, size=10)
+    lru.put("b", 2, size=10)
+    assert lru.get("a") == 1  # "b" is now least recently used
+    lru.put("c", 3, size=10)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+
+    lru.put("big", 4, size=95)
+    assert lru.get("a") is None and lru.get("c") is None
+    assert lru.get("big") == 4
+
+    stats = lru.stats()
+    assert stats["evictions"] == 3
+    assert stats["entries"] == 1 and stats["bytes"] == 95
+    assert stats["hits"] == 4 and stats["misses"] == 3
+
+
+def test_lru_cache_drops_entries_with_stale_version():
+    lru = LRUCache()
+    lru.put("file", {"k": 1}, size=1, version=(1, 10))
+
+    assert lru.get("file", version=(1, 10)) == {"k": 1}
+    assert lru.get("file", version=(2, 10)) is None
+    assert lru.stats()["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_serves_repeat_reads_from_memory(monkeypatch):
+    cache = SQLiteCache("test")
+    await cache.set("q", ["paper"])
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("repeat reads should not touch SQLite")
+
+    monkeypatch.setattr(SQLiteCache, "_get_entry_sync", fail)
+    assert await cache.get("q") == ["paper"]
+    assert await cache.get("q") == ["paper"]
+    assert cache_stats()["sqlite:cache.sqlite3"]["hits"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_memory_tier_revalidates_after_external_write():
+    cache = SQLiteCache("test")
+    await cache.set("q", "ours")
+    assert await cache.get("q") == "ours"
+
+    # Simulate another process updating the same database file.
+    path = get_cache_path("cache.sqlite3")
+    external = sqlite3.connect(path)
+    with external:
+        external.execute(
+            "UPDATE cache_entries SET value = ? WHERE namespace = ? AND key = ?",
+            (json.dumps("theirs"), "test", "q"),
+        )
+    external.close()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert await cache.get("q") == "theirs"
+
+
+@pytest.mark.asyncio
+async def test_load_cache_reuses_parsed_file_until_it_changes():
+    await save_cache("sample.json", {"a": 1})
+    first = await load_cache("sample.json")
+    second = await load_cache("sample.json")
+    assert first == {"a": 1}
+    assert second is first
+
+    await save_cache("sample.json", {"a": 2, "b": 3})
+    assert await load_cache("sample.json") == {"a": 2, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_background_refresher_runs_one_refresh_per_key():
+    refresher = BackgroundRefresher("test")
+    release = asyncio.Event()
+    runs = []
+
+    async def refresh():
+        runs.append(1)
+        await release.wait()
+
+    first = refresher.schedule("k", refresh)
+    assert refresher.schedule("k", refresh) is first
+    other = refresher.schedule("other", refresh)
+    assert set(refresher.pending()) == {first, other}
+
+    release.set()
+    await asyncio.gather(first, other)
+    assert len(runs) == 2 and refresher.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_max_entries_evicts_least_recently_written():
+    cache = SQLiteCache("bounded", max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.set("a", 10)  # rewrite makes "b" the oldest
+    await cache.set("c", 3)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 10 and await cache.get("c") == 3
+    # Other namespaces are unaffected by the bound
+    await SQLiteCache("unbounded").set("x", 1)
+    assert await SQLiteCache("unbounded").get("x") == 1
+
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_max_bytes_evicts_oldest_until_within_budget():
+    cache = SQLiteCache("sized", max_bytes=30)  # each value below is a 12-character payload
+    for key in "abc":
+        await cache.set(key, "x" * 10)
+
+    assert await cache.get("a") is None
+    assert await cache.get("b") == await cache.get("c") == "x" * 10
+
+    # Growing an entry counts only the difference; deletes are accounted for too
+    await cache.delete("b")
+    await cache.set("c", "x" * 20)
+    await cache.set("d", "y")
+    assert await cache.get("c") == "x" * 20 and await cache.get("d") == "y"
+    await cache.set("e", "z" * 10)
+    assert await cache.get("c") is None
+    assert await cache.get("d") == "y" and await cache.get("e") == "z" * 10
+
+    # A value larger than the whole budget is not kept
+    await cache.set("huge", "h" * 100)
+    assert await cache.get("huge") is None
+
+def test_sqlite_cache_read_does_not_overwrite_a_concurrent_write_in_memory(monkeypatch):
+    cache = SQLiteCache("race")
+    db = cache._database()
+    cache._set_sync(db, "k", "old", None)
+    db.memory.clear()
+    writer = None
+    real_entry = utils.CacheEntry
+
+    def entry_from_read(*args, **kwargs):
+        # A write lands after the read's SELECT, before it fills the memory tier
+        nonlocal writer
+        if writer is None:
+            writer = threading.Thread(target=cache._set_sync, args=(db, "k", "new", None))
+            writer.start()
+            writer.join(timeout=0.2)
+        return real_entry(*args, **kwargs)
+
+    monkeypatch.setattr(utils, "CacheEntry", entry_from_read)
+    assert cache._get_entry_sync(db, "k").value == "old"
+    writer.join()
+
+    assert db.memory.get(("race", "k")).value == "new"
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.services import arxiv_client, google_trends
+from src.services.arxiv_client import ArxivService
+from src.services.circuit_breaker import CircuitBreaker, CircuitState, breaker_stats
+from src.services.google_trends import GoogleTrendsService
+
+
+def test_breaker_opens_after_threshold_and_probes_after_timeout(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("src.services.circuit_breaker.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN and breaker.rejecting
+    assert not breaker.allow()
+
+    clock[0] += 30
+    assert not breaker.rejecting
+    assert breaker.allow()  # the single half-open probe
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()  # probe failed: straight back to open
+    assert breaker.state == CircuitState.OPEN
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+    assert breaker.stats() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "successes": 1,
+        "failures": 3,
+        "rejections": 2,
+        "times_opened": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_open_trends_breaker_skips_upstream(monkeypatch):
+    calls = []
+
+    def failing(self, keywords):
+        calls.append(keywords)
+        raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr(GoogleTrendsService, "_fetch_pytrends_sync", failing)
+
+    svc = GoogleTrendsService()
+    # Different seed sets, so the per-key negative cache does not short-circuit
+    for i in range(google_trends.trends_breaker.failure_threshold):
+        assert await svc.get_trending_topics([f"seed{i}"]) == [f"seed{i}"]
+    assert breaker_stats()["google_trends"]["state"] == "open"
+
+    # Open breaker: seeds come back immediately without touching pytrends
+    assert await svc.get_trending_topics(["other"]) == ["other"]
+    assert len(calls) == google_trends.trends_breaker.failure_threshold
+
+    # ...and cached data is still served (stale, without a refresh attempt)
+    await svc.cache.set(svc._cache_key(["cached"]), ["old topic"], ttl=-1)
+    assert await svc.get_trending_topics(["cached"]) == ["old topic"]
+    assert google_trends.refresher.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_open_arxiv_breaker_fails_fast():
+    class BrokenClient:
+        page_size = 100
+        calls = 0
+
+        def results(self, _search):
+            BrokenClient.calls += 1
+            raise RuntimeError("503")
+
+    svc = ArxivService()
+    svc.client = BrokenClient()
+    for i in range(arxiv_client.arxiv_breaker.failure_threshold):
+        assert await svc.search_papers(f"all:q{i}") == []
+    assert arxiv_client.arxiv_breaker.state == CircuitState.OPEN
+
+    assert await svc.search_papers("all:fresh") == []
+    assert BrokenClient.calls == arxiv_client.arxiv_breaker.failure_threshold
+
+
+@pytest.mark.asyncio
+async def test_cancelled_arxiv_probe_lets_the_next_call_probe():
+    breaker = arxiv_client.arxiv_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at -= breaker.reset_timeout  # timeout elapsed: the next call is the probe
+    release_upstream = threading.Event()
+
+    class HangingClient:
+        page_size = 100
+
+        def results(self, _search):
+            release_upstream.wait(5)
+            return iter([])
+
+    svc = ArxivService()
+    svc.client = HangingClient()
+    # The consumer gives up before the first paper arrives
+    task = asyncio.create_task(svc.stream_papers("all:probe").__anext__())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    release_upstream.set()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow()
@@ -1,9 +1,10 @@
-import datetime
+import asyncio
 from types import SimpleNamespace
 
 import pytest
 
-from src.services.google_trends import GoogleTrendsService
+from src.services import google_trends
+from src.services.google_trends import DEFAULT_SEEDS, GoogleTrendsService
 
 
 class DummyQuery:
@@ -40,52 +41,50 @@ class DummyTrendReq:
 
 
 @pytest.mark.asyncio
-async def test_google_trends_cache_miss_fetches_and_saves(monkeypatch, tmp_path):
+async def test_google_trends_cache_miss_fetches_and_saves(monkeypatch):
     related = {"ml": {"top": DummyTop(["Quantum", "AI news"])}}  # casing will be normalized
     trend = DummyTrendReq(related)
-    cache_bucket = {}
 
     monkeypatch.setattr("src.services.google_trends.TrendReq", lambda **_: trend)
-    
-    async def mock_load(_):
-        return cache_bucket.get("data", {})
-    
-    async def mock_save(_, data):
-        cache_bucket.setdefault("data", data)
-        
-    monkeypatch.setattr("src.services.google_trends.load_cache", mock_load)
-    monkeypatch.setattr("src.services.google_trends.save_cache", mock_save)
 
     svc = GoogleTrendsService()
     topics = await svc.get_trending_topics(["ml"])
 
     assert set(topics) == {"quantum", "ai news"}
-    assert "timestamp" in cache_bucket.get("data", {})
+    assert set(await svc.cache.get(svc._cache_key(["ml"]))) == {"quantum", "ai news"}
 
 
 @pytest.mark.asyncio
-async def test_google_trends_stale_cache_refetches(monkeypatch):
-    old_timestamp = (datetime.datetime.now() - datetime.timedelta(hours=13)).isoformat()
+async def test_google_trends_fresh_cache_skips_fetch(monkeypatch):
+    def fail(**_):
+        raise AssertionError("pytrends should not be called on a cache hit")
+
+    monkeypatch.setattr("src.services.google_trends.TrendReq", fail)
+
+    svc = GoogleTrendsService()
+    await svc.cache.set(svc._cache_key(["ai"]), ["cached topic"])
+
+    assert await svc.get_trending_topics(["ai"]) == ["cached topic"]
+
+
+@pytest.mark.asyncio
+async def test_google_trends_stale_cache_served_while_refreshing(monkeypatch):
     related = {"ai": {"top": DummyTop(["fresh topic"])}}  # should override stale cache
     trend = DummyTrendReq(related)
-    cache_bucket = {"data": {"timestamp": old_timestamp, "topics": ["old"]}}
 
     monkeypatch.setattr("src.services.google_trends.TrendReq", lambda **_: trend)
-    
-    async def mock_load(_):
-        return cache_bucket["data"]
-        
-    async def mock_save(_, data):
-        cache_bucket["data"] = data
-
-    monkeypatch.setattr("src.services.google_trends.load_cache", mock_load)
-    monkeypatch.setattr("src.services.google_trends.save_cache", mock_save)
 
     svc = GoogleTrendsService()
+    await svc.cache.set(svc._cache_key(["ai"]), ["old"], ttl=-1)
     topics = await svc.get_trending_topics(["ai"])
 
-    assert topics == ["fresh topic"]
-    assert cache_bucket["data"]["topics"] == ["fresh topic"]
+    # Stale topics come back immediately; a background refresh replaces them
+    assert topics == ["old"]
+    await asyncio.gather(*google_trends.refresher.pending())
+
+    assert len(trend.payloads) == 1
+    assert await svc.cache.get(svc._cache_key(["ai"])) == ["fresh topic"]
+    assert await svc.get_trending_topics(["ai"]) == ["fresh topic"]
 
 
 @pytest.mark.asyncio
@@ -98,17 +97,115 @@ async def test_google_trends_handles_network_failure(monkeypatch):
             raise RuntimeError("network down")
 
     monkeypatch.setattr("src.services.google_trends.TrendReq", FailingTrendReq)
-    
-    async def mock_load(_):
-        return {}
-        
-    async def mock_save(*_):
-        return None
-        
-    monkeypatch.setattr("src.services.google_trends.load_cache", mock_load)
-    monkeypatch.setattr("src.services.google_trends.save_cache", mock_save)
 
     svc = GoogleTrendsService()
     fallback = await svc.get_trending_topics(["custom"])
 
     assert fallback == ["custom"]
+    assert await svc.cache.get(svc._cache_key(["custom"])) is None
+
+
+@pytest.mark.asyncio
+async def test_google_trends_failure_is_negatively_cached(monkeypatch):
+    calls = []
+
+    class FailingTrendReq:
+        def __init__(self, **_):
+            calls.append(1)
+
+        def build_payload(self, *_, **__):
+            raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr("src.services.google_trends.TrendReq", FailingTrendReq)
+
+    svc = GoogleTrendsService()
+    assert await svc.get_trending_topics(["custom"]) == ["custom"]
+    assert await svc.get_trending_topics(["custom"]) == ["custom"]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_google_trends_cache_is_keyed_by_seed_set(monkeypatch):
+    def fail(**_):
+        raise AssertionError("pytrends should not be called on a cache hit")
+
+    monkeypatch.setattr("src.services.google_trends.TrendReq", fail)
+
+    svc = GoogleTrendsService()
+    await svc.cache.set(svc._cache_key(["llm", "ai"]), ["agents"])
+    await svc.cache.set(svc._cache_key(["robotics"]), ["humanoids"])
+
+    # Same seeds in another order/case share an entry; other users' seeds get their own
+    assert await svc.get_trending_topics(["AI", " LLM"]) == ["agents"]
+    assert await svc.get_trending_topics(["Robotics"]) == ["humanoids"]
+
+
+class RankedTop:
+    """related_queries()['top'] stand-in with both `query` and `value` columns."""
+
+    def __init__(self, rows):
+        self.columns = {"query": DummyQuery([q for q, _ in rows]), "value": DummyQuery([v for _, v in rows])}
+
+    def __getitem__(self, key):
+        return self.columns[key]
+
+
+@pytest.mark.asyncio
+async def test_google_trends_batches_every_seed_and_merges_by_rank(monkeypatch):
+    seeds = [f"s{i}" for i in range(7)]
+    related = {seed: {"top": RankedTop([(f"{seed} a", 10), (f"{seed} b", 5)])} for seed in seeds}
+    related["s6"] = {"top": RankedTop([("s6 a", 90), ("s6 b", 80)])}
+    related["s1"] = {"top": DummyTop(["s1 a"])}  # no value column
+    trend = DummyTrendReq(related)
+
+    monkeypatch.setattr("src.services.google_trends.TrendReq", lambda **_: trend)
+
+    svc = GoogleTrendsService()
+    topics = await svc.get_trending_topics(seeds)
+
+    assert sorted(p["kw_list"] for p in trend.payloads) == [["s0", "s1", "s2", "s3", "s4"], ["s5", "s6"]]
+    # Every seed's top query comes before any second-ranked query; interest breaks ties
+    assert topics[:7] == ["s6 a", "s0 a", "s2 a", "s3 a", "s4 a", "s5 a", "s1 a"]
+    assert topics[7] == "s6 b" and len(topics) == 13
+
+
+@pytest.mark.asyncio
+async def test_google_trends_keeps_results_from_successful_payloads(monkeypatch):
+    class PartlyFailingTrendReq(DummyTrendReq):
+        def build_payload(self, kw_list, timeframe=None):
+            if "s5" in kw_list:
+                raise RuntimeError("429")
+            super().build_payload(kw_list, timeframe)
+
+    trend = PartlyFailingTrendReq({"s0": {"top": DummyTop(["ok"])}})
+    monkeypatch.setattr("src.services.google_trends.TrendReq", lambda **_: trend)
+
+    svc = GoogleTrendsService()
+    seeds = [f"s{i}" for i in range(6)]
+    before = google_trends.trends_breaker.stats()
+    assert await svc.get_trending_topics(seeds) == ["ok"]
+
+    # Missing seeds are refetched soon, and a partial answer is not a healthy upstream call
+    entry = await svc.cache.get_entry(svc._cache_key(seeds))
+    assert entry.expires_at - entry.updated_at == pytest.approx(google_trends.TRENDS_PARTIAL_TTL_SECONDS)
+    after = google_trends.trends_breaker.stats()
+    assert after["successes"] == before["successes"]
+    assert after["failures"] == before["failures"] + 1
+
+
+@pytest.mark.asyncio
+async def test_fallbacks_return_the_callers_seeds_as_given(monkeypatch):
+    class FailingTrendReq:
+        def __init__(self, **_):
+            pass
+
+        def build_payload(self, *_, **__):
+            raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr("src.services.google_trends.TrendReq", FailingTrendReq)
+
+    svc = GoogleTrendsService()
+    seeds = ["Machine Learning", "AI"]
+    assert await svc.get_trending_topics(seeds) == seeds  # failed fetch
+    assert await svc.get_trending_topics(["ai", "machine learning"]) == ["ai", "machine learning"]  # negative cache
+    assert await svc.get_trending_topics() == DEFAULT_SEEDS
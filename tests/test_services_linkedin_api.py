@@ -0,0 +1,171 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.services import linkedin_api
+from src.services.linkedin_api import LinkedInService, aclose_http_client, get_http_client
+from src.services.utils import hash_text
+
+
+def make_transport(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path))
+        if request.url.path == "/v2/userinfo":
+            return httpx.Response(200, json={"sub": "abc123"})
+        return httpx.Response(201, json={"id": "urn:li:share:1"})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_post_update_reuses_one_pooled_client(monkeypatch):
+    requests = []
+    created = []
+    real_client = httpx.AsyncClient
+
+    def pooled_client(**kwargs):
+        created.append(kwargs)
+        return real_client(transport=make_transport(requests), **kwargs)
+
+    monkeypatch.setattr(linkedin_api.httpx, "AsyncClient", pooled_client)
+
+    for i in range(2):
+        service = LinkedInService(access_token="token", author_urn="urn:li:person:me")
+        assert await service.post_update(f"hello {i}") is True
+
+    assert requests == [("POST", "/v2/ugcPosts"), ("POST", "/v2/ugcPosts")]
+    assert len(created) == 1
+    assert created[0]["http2"] == linkedin_api.HTTP2_AVAILABLE
+
+    client = get_http_client()
+    await aclose_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client  # a fresh pool after shutdown
+    await aclose_http_client()
+
+
+@pytest.mark.asyncio
+async def test_post_update_resolves_author_then_posts_on_same_client():
+    requests = []
+    async with httpx.AsyncClient(transport=make_transport(requests)) as client:
+        service = LinkedInService(access_token="token", http_client=client)
+        assert await service.post_update("hello") is True
+
+    assert requests == [("GET", "/v2/userinfo"), ("POST", "/v2/ugcPosts")]
+
+
+def test_each_event_loop_gets_its_own_client():
+    async def grab():
+        client = get_http_client()
+        assert get_http_client() is client
+        await aclose_http_client()
+        return client
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
+
+
+def test_pooled_client_is_closed_when_its_loop_shuts_down():
+    async def use_without_closing():
+        return get_http_client()
+
+    client = asyncio.run(use_without_closing())
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_author_urn_is_cached_per_token_and_dropped_on_auth_failure():
+    requests = []
+    status = {"post": 201}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path == "/v2/userinfo":
+            return httpx.Response(200, json={"sub": f"member-{request.headers['Authorization'][-1]}"})
+        return httpx.Response(status["post"], json={"id": "urn:li:share:1"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        service = LinkedInService(access_token="token-a", http_client=client)
+        assert await service.post_update("one") is True
+        assert await LinkedInService(access_token="token-a", http_client=client).post_update("two") is True
+        # Steady state: one API call per post
+        assert requests == ["/v2/userinfo", "/v2/ugcPosts", "/v2/ugcPosts"]
+        assert await service.urn_cache.get(hash_text("token-a")) == "urn:li:person:member-a"
+
+        # A different token resolves (and caches) its own URN
+        requests.clear()
+        assert await LinkedInService(access_token="token-b", http_client=client).post_update("three") is True
+        assert requests == ["/v2/userinfo", "/v2/ugcPosts"]
+
+        status["post"] = 401
+        assert await service.post_update("four") is False
+        assert await service.urn_cache.get(hash_text("token-a")) is None
+
+
+@pytest.mark.asyncio
+async def test_republishing_the_same_content_returns_the_original_post():
+    requests = []
+    posted = iter(range(1, 100))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(201, json={"id": f"urn:li:share:{next(posted)}"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        service = LinkedInService(access_token="token-a", author_urn="urn:li:person:a", http_client=client)
+        first = await service.publish("Big news.")
+        assert first.post_id == "urn:li:share:1" and not first.duplicate
+
+        replay = await LinkedInService(
+            access_token="token-a", author_urn="urn:li:person:a", http_client=client
+        ).publish("Big news.\n")
+        assert replay.ok and replay.duplicate
+        assert replay.post_id == "urn:li:share:1"
+        assert requests == ["/v2/ugcPosts"]
+
+        # The index is per account
+        other = LinkedInService(access_token="token-b", author_urn="urn:li:person:b", http_client=client)
+        assert (await other.publish("Big news.")).post_id == "urn:li:share:2"
+
+
+@pytest.mark.asyncio
+async def test_dedupe_and_account_follow_the_member_across_token_refreshes():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path == "/v2/userinfo":
+            return httpx.Response(200, json={"sub": "member"})  # both tokens belong to one member
+        return httpx.Response(201, json={"id": "urn:li:share:1"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        old = LinkedInService(access_token="token-old", http_client=client)
+        refreshed = LinkedInService(access_token="token-new", http_client=client)
+
+        assert (await old.publish("Big news.")).post_id == "urn:li:share:1"
+        replay = await refreshed.publish("Big news.")
+        assert replay.duplicate and replay.post_id == "urn:li:share:1"
+        assert requests.count("/v2/ugcPosts") == 1
+
+        assert await old.account() == await refreshed.account() == "urn:li:person:member"
+
+
+@pytest.mark.asyncio
+async def test_failed_posts_are_not_recorded_and_concurrent_duplicates_share_one_post():
+    requests = []
+    status = {"code": 500}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(status["code"], json={"id": "urn:li:share:9"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        service = LinkedInService(access_token="token", author_urn="urn:li:person:me", http_client=client)
+        assert not (await service.publish("Retry me")).ok
+
+        status["code"] = 201
+        results = await asyncio.gather(*(service.publish("Retry me") for _ in range(3)))
+        assert [r.post_id for r in results] == ["urn:li:share:9"] * 3
+        assert len(requests) == 2
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from src.agents.relevance_ranker import RankingChoice, rank_papers
+from src.config.settings import settings
+from src.memory.models import ComprehensionPreferences
+from src.services.llm_cache import cached_structured_ainvoke, llm_cache_key, llm_cache_stats
+from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
+
+
+def counting_llm(calls, index=0):
+    async def respond(messages):
+        calls.append(messages)
+        return RankingChoice(index=index, rationale="best fit")
+
+    return RunnableLambda(respond)
+
+
+PROMPT = ChatPromptTemplate.from_template("Pick a paper about {topic}")
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_are_answered_from_the_cache_when_enabled():
+    calls = []
+    llm = counting_llm(calls)
+    with patch.object(settings, "llm_cache_nodes", "rank_papers, update_memory"):
+        first = await cached_structured_ainvoke("rank_papers", PROMPT, llm, {"topic": "ai"}, RankingChoice)
+        hits = llm_cache_stats()["hits"]
+        replay = await cached_structured_ainvoke("rank_papers", PROMPT, llm, {"topic": "ai"}, RankingChoice)
+        other = await cached_structured_ainvoke("rank_papers", PROMPT, llm, {"topic": "ml"}, RankingChoice)
+
+    assert replay == first and isinstance(replay, RankingChoice)
+    assert other == first
+    assert len(calls) == 2  # the replay cost no model call
+    assert llm_cache_stats()["hits"] == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_nodes_that_did_not_opt_in_always_call_the_model():
+    calls = []
+    llm = counting_llm(calls)
+    with patch.object(settings, "llm_cache_nodes", "update_memory"):
+        for _ in range(2):
+            await cached_structured_ainvoke("rank_papers", PROMPT, llm, {"topic": "ai"}, RankingChoice)
+
+    assert len(calls) == 2
+
+
+def test_cache_key_covers_model_messages_and_schema():
+    class OtherChoice(BaseModel):
+        index: int
+
+    messages = PROMPT.format_messages(topic="ai")
+    key = llm_cache_key("openai:gpt-4o", messages, RankingChoice)
+
+    assert key == llm_cache_key("openai:gpt-4o", PROMPT.format_messages(topic="ai"), RankingChoice)
+    assert key != llm_cache_key("openai:gpt-4o-mini", messages, RankingChoice)
+    assert key != llm_cache_key("openai:gpt-4o", PROMPT.format_messages(topic="ml"), RankingChoice)
+    assert key != llm_cache_key("openai:gpt-4o", messages, OtherChoice)
+    assert key != llm_cache_key("openai:gpt-4o", messages, ComprehensionPreferences)
+
+
+@pytest.mark.asyncio
+async def test_replayed_rank_papers_costs_no_model_call():
+    calls = []
+    state = AppState(
+        paper_candidates=[{"title": "A", "summary": "a"}, {"title": "B", "summary": "b"}],
+        trending_keywords=["agents"],
+    )
+
+    with patch.object(settings, "openai_api_key", "key", create=True), \
+         patch.object(settings, "llm_cache_nodes", "rank_papers"), \
+         patch("src.agents.relevance_ranker.get_chat_model", new_callable=fake_model_registry) as mock_init:
+        mock_init.return_value.with_structured_output.return_value = counting_llm(calls, index=1)
+        first = await rank_papers(state)
+        replay = await rank_papers(state)
+
+    assert first == replay == {"selected_paper": {"title": "B", "summary": "b"}}
+    assert len(calls) == 1
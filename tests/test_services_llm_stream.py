@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.agents.conversation_agent import ConversationOutputParser, _parse_conversation_output, conversation_node
+from src.agents.post_writer import write_post
+from src.config.settings import settings
+from src.services.llm_stream import stream_chat_response
+from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
+
+CLARIFICATION = (
+    "Here is what stands out.\n"
+    "- Angle 1: Cheaper inference\n"
+    "- Angle 2: Better evals\n"
+    "Clarifying question: Which audience?"
+)
+
+
+def fake_model(text):
+    # Streams the text word by word (whitespace kept), like a real chat model
+    return GenericFakeChatModel(messages=iter([AIMessage(content=text)]))
+
+
+def single_node_graph(name, node):
+    workflow = StateGraph(AppState)
+    workflow.add_node(name, node)
+    workflow.add_edge(START, name)
+    workflow.add_edge(name, END)
+    return workflow.compile(checkpointer=InMemorySaver())
+
+
+@pytest.fixture
+def llm_settings(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "key")
+    monkeypatch.setattr(settings, "tavily_api_key", None)
+
+
+def test_parser_yields_angles_as_their_lines_complete():
+    parser = ConversationOutputParser()
+
+    assert parser.feed("Intro\n- Angle 1: Chea") == []
+    assert parser.feed("per inference\n- Angle 2") == ["Angle 1: Cheaper inference"]
+    assert parser.feed(": Better evals\nClarifying question: Which audience?") == ["Angle 2: Better evals"]
+    assert parser.close() == _parse_conversation_output(CLARIFICATION) == (["Angle 1: Cheaper inference", "Angle 2: Better evals"], "Which audience?")
+
+
+def test_parser_falls_back_to_last_line_for_the_question():
+    assert _parse_conversation_output("Angle A\nWhat next?\n\n") == (["Angle A"], "What next?")
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_response_outside_a_graph_aggregates_the_message():
+    deltas = []
+
+    response = await stream_chat_response(fake_model("one two three"), ["hi"], "post_writer", deltas.append)
+
+    assert response.content == "one two three"
+    assert len(deltas) > 1
+    assert "".join(deltas) == "one two three"
+
+
+@pytest.mark.asyncio
+async def test_conversation_streams_tokens_and_angles_before_the_interrupt(llm_settings):
+    graph = single_node_graph("conversation_agent", conversation_node)
+    state = AppState(selected_paper={"title": "Paper", "summary": "Summary"}, trending_keywords=["AI"])
+    events = []
+
+    with patch("src.agents.conversation_agent.get_chat_model", new_callable=fake_model_registry, return_value=fake_model(CLARIFICATION)):
+        async for mode, chunk in graph.astream(
+            state, {"configurable": {"thread_id": "stream-conv"}}, stream_mode=["custom", "updates"]
+        ):
+            events.append((mode, chunk))
+
+    custom = [chunk for mode, chunk in events if mode == "custom"]
+    tokens = [event["token"] for event in custom if "token" in event]
+    angles = [event["angle"] for event in custom if "angle" in event]
+    assert "".join(tokens) == CLARIFICATION
+    assert angles == ["Angle 1: Cheaper inference", "Angle 2: Better evals"]
+    assert all(event["node"] == "conversation_agent" for event in custom)
+
+    interrupt_index = next(i for i, (mode, chunk) in enumerate(events) if mode == "updates" and "__interrupt__" in chunk)
+    assert all(mode == "custom" for mode, _ in events[:interrupt_index])
+    payload = events[interrupt_index][1]["__interrupt__"][0].value
+    assert payload["action_request"]["args"]["question"] == "Which audience?"
+    assert "Angle 2: Better evals" in payload["description"]
+
+
+@pytest.mark.asyncio
+async def test_writer_streams_tokens_and_keeps_the_final_draft(llm_settings):
+    graph = single_node_graph("post_writer", write_post)
+    state = AppState(selected_paper={"title": "Paper", "summary": "Summary"})
+    draft = "A crisp post about cheaper inference. #AI"
+    tokens = []
+
+    with patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry, return_value=fake_model(draft)):
+        async for mode, chunk in graph.astream(
+            state, {"configurable": {"thread_id": "stream-writer"}}, stream_mode=["custom", "values"]
+        ):
+            if mode == "custom":
+                tokens.append(chunk["token"])
+            else:
+                final = chunk
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == draft
+    assert final["post_draft"] == draft
+    assert final["post_history"][-1]["draft"] == draft
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+
+from src.services import local_arxiv_index
+from src.services.local_arxiv_index import LocalArxivIndex, read_dump, to_fts_query
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = LocalArxivIndex(tmp_path / "index.sqlite3")
+    idx.ingest(read_dump(FIXTURES / "sample_arxiv_metadata.jsonl"))
+    idx.ingest(read_dump(FIXTURES / "sample_oai_pmh.xml"))
+    return idx
+
+
+def test_to_fts_query_translates_arxiv_syntax():
+    assert to_fts_query('all:"Machine Learning"') == '"Machine Learning"'
+    assert to_fts_query("ti:agents OR abs:diffusion") == 'title : "agents" OR summary : "diffusion"'
+    assert to_fts_query('(all:llm ANDNOT au:"Turing")') == '"llm" NOT authors : "Turing"'
+    assert to_fts_query('all:"$$" AND all:rl') == '"rl"'
+    # Every word of fielded free text stays in its column
+    assert to_fts_query("ti:diffusion-models") == 'title : ("diffusion" "models")'
+
+
+def test_ingest_parses_jsonl_and_oai_pmh(index):
+    assert index.count() == 5
+
+    # Re-ingesting the same dump upserts instead of duplicating
+    index.ingest(read_dump(FIXTURES / "sample_arxiv_metadata.jsonl"))
+    assert index.count() == 5
+
+    [paper] = index.search("ti:protein")
+    assert paper == {
+        "title": "Diffusion Models for Protein Design",
+        "summary": "We apply score-based diffusion models to generate protein backbones.",
+        "url": "http://arxiv.org/abs/2401.00001",
+        "published": "2024-01-01T10:00:00+00:00",
+        "authors": ["Ada Lovelace", "Alan Turing"],
+    }
+    assert index.search("au:noether")[0]["authors"] == ["Emmy Noether"]
+    assert index.search('all:"surface codes"')[0]["url"] == "http://arxiv.org/abs/2402.00011"
+
+
+@pytest.mark.asyncio
+async def test_search_papers_ranks_title_matches_first(index):
+    papers = await index.search_papers('all:"diffusion"', max_results=5)
+    assert [p["url"] for p in papers] == [
+        "http://arxiv.org/abs/2401.00001",  # title match
+        "http://arxiv.org/abs/2401.00002",  # abstract-only match
+    ]
+    assert await index.search_papers("ti:survey ANDNOT abs:alignment") == []
+    assert await index.search_papers('all:"nonexistent topic"') == []
+
+
+def test_get_local_arxiv_index_requires_existing_path(monkeypatch, index, tmp_path):
+    monkeypatch.setattr(local_arxiv_index.settings, "arxiv_index_path", None)
+    assert local_arxiv_index.get_local_arxiv_index() is None
+
+    monkeypatch.setattr(local_arxiv_index.settings, "arxiv_index_path", str(tmp_path / "missing.sqlite3"))
+    warnings = []
+    monkeypatch.setattr(local_arxiv_index.logger, "warning", warnings.append)
+    assert local_arxiv_index.get_local_arxiv_index() is None
+    assert local_arxiv_index.get_local_arxiv_index() is None
+    assert len(warnings) == 1  # not once per search
+
+    monkeypatch.setattr(local_arxiv_index.settings, "arxiv_index_path", str(index.path))
+    assert local_arxiv_index.get_local_arxiv_index().path == index.path
@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from src.agents.relevance_ranker import rank_papers
+from src.config.settings import settings
+from src.services.model_registry import get_chat_model, model_registry_stats
+from src.state import AppState
+
+
+class Schema(BaseModel):
+    index: int
+
+
+class Tool:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.mark.asyncio
+async def test_models_are_shared_per_model_key_tools_and_schema(monkeypatch):
+    factory = MagicMock(side_effect=lambda *args, **kwargs: MagicMock())
+    monkeypatch.setattr("src.services.model_registry.init_chat_model", factory)
+
+    base = get_chat_model("m", "key")
+    assert get_chat_model("m", "key") is base
+    assert get_chat_model("m", "other-key") is not base
+    assert get_chat_model("m2", "key") is not base
+    assert factory.call_count == 3
+
+    with_tools = get_chat_model("m", "key", tools=[Tool("a"), Tool("b")])
+    assert get_chat_model("m", "key", tools=[Tool("a"), Tool("b")]) is with_tools
+    get_chat_model("m", "key", tools=[Tool("a")])
+    structured = get_chat_model("m", "key", schema=Schema)
+    assert get_chat_model("m", "key", schema=Schema) is structured
+
+    assert factory.call_count == 3  # bindings reuse the cached base model
+    assert base.bind_tools.call_count == 2
+    base.with_structured_output.assert_called_once_with(Schema, method="function_calling")
+
+    with pytest.raises(ValueError):
+        get_chat_model("m", "key", tools=[Tool("a")], schema=Schema)
+
+
+def test_each_event_loop_gets_its_own_models(monkeypatch):
+    factory = MagicMock(side_effect=lambda *args, **kwargs: MagicMock())
+    monkeypatch.setattr("src.services.model_registry.init_chat_model", factory)
+
+    async def grab():
+        return get_chat_model("m", "key")
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
+    assert factory.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_rank_papers_builds_its_model_once_across_calls():
+    state = AppState(paper_candidates=[{"title": "P", "summary": "S"}])
+    structured = MagicMock()
+    structured.ainvoke = MagicMock()
+
+    with patch.object(settings, "openai_api_key", "key", create=True), \
+         patch("src.services.model_registry.init_chat_model") as mock_init, \
+         patch("src.services.prompt_registry.ChatPromptTemplate") as mock_prompt:
+        mock_prompt.from_template.return_value.__or__.return_value = structured
+        misses = model_registry_stats()["misses"]
+        for _ in range(3):
+            await rank_papers(state)
+
+    mock_init.assert_called_once()
+    mock_init.return_value.with_structured_output.assert_called_once()
+    assert model_registry_stats()["misses"] == misses + 2  # base model + structured binding
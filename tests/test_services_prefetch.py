@@ -0,0 +1,83 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.arxiv_fetcher import fetch_arxiv_papers
+from src.agents.trend_scanner import scan_trending_topics
+from src.services import arxiv_client
+from src.services.prefetch import PrefetchScheduler
+from src.state import AppState
+
+PREFERENCES = {"seeds": ["Robotics", "LLM"], "avoid": ["crypto"]}
+
+
+class FakeTop:
+    def __init__(self, items):
+        self.items = items
+
+    def __getitem__(self, key):
+        if key != "query":
+            raise KeyError(key)
+        return SimpleNamespace(head=lambda n: SimpleNamespace(tolist=lambda: self.items[:n]))
+
+
+class FakeTrendReq:
+    calls = 0
+
+    def __init__(self, **_):
+        FakeTrendReq.calls += 1
+
+    def build_payload(self, kw_list, timeframe=None):
+        self.kw_list = kw_list
+
+    def related_queries(self):
+        return {
+            "llm": {"top": FakeTop(["LLM agents", "crypto llm"])},
+            "robotics": {"top": FakeTop(["Humanoid robots"])},
+        }
+
+
+class FakeArxivClient:
+    page_size = 100
+    queries = []
+
+    def results(self, search):
+        FakeArxivClient.queries.append(search.query)
+        yield SimpleNamespace(
+            title=f"Paper for {search.query}",
+            summary="Summary",
+            entry_id=f"http://arxiv.org/abs/{len(FakeArxivClient.queries)}",
+            published=datetime.datetime(2024, 1, 1),
+        )
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_the_caches_bootstrap_reads(monkeypatch):
+    async def preferences(_self):
+        return PREFERENCES
+
+    monkeypatch.setattr(PrefetchScheduler, "_load_topic_preferences", preferences)
+    monkeypatch.setattr("src.services.google_trends.TrendReq", FakeTrendReq)
+    monkeypatch.setattr(arxiv_client, "get_arxiv_client", lambda: FakeArxivClient())
+
+    result = await PrefetchScheduler(max_concurrency=1).run_once()
+
+    assert result == {"seeds": ["Robotics", "LLM"], "keywords": ["llm agents", "humanoid robots"]}
+    assert FakeTrendReq.calls == 1
+    assert len(FakeArxivClient.queries) == 2
+
+    # The bootstrap nodes now run entirely from cache.
+    state = AppState(memory={"topic_preferences": PREFERENCES})
+    trends = await scan_trending_topics(state)
+    assert trends["trending_keywords"] == ["llm agents", "humanoid robots"]
+
+    papers = await fetch_arxiv_papers(AppState(trending_keywords=trends["trending_keywords"]))
+    assert len(papers["paper_candidates"]) == 2
+    assert FakeTrendReq.calls == 1 and len(FakeArxivClient.queries) == 2
+
+
+def test_next_delay_applies_jitter():
+    scheduler = PrefetchScheduler(interval=100, jitter=0.2)
+    delays = {scheduler.next_delay() for _ in range(20)}
+    assert all(80 <= d <= 120 for d in delays) and len(delays) > 1
@@ -0,0 +1,89 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.core.paths import PROMPTS_DIR
+from src.services.prompt_registry import (
+    PromptRegistry,
+    PromptValidationError,
+    REQUIRED_PROMPT_VARIABLES,
+    prompt_problems,
+    validate_prompts,
+)
+
+
+@pytest.fixture
+def prompts_dir(tmp_path, monkeypatch):
+    for name in REQUIRED_PROMPT_VARIABLES:
+        text = (PROMPTS_DIR / name).read_text()
+        (tmp_path / name).write_text(text)
+    monkeypatch.setattr("src.services.prompt_registry.PROMPTS_DIR", tmp_path)
+    return tmp_path
+
+
+def bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_shipped_prompts_use_exactly_the_variables_their_nodes_supply():
+    validate_prompts()
+
+
+def test_prompts_are_read_and_compiled_once_until_the_file_changes(prompts_dir, monkeypatch):
+    registry = PromptRegistry()
+    path = prompts_dir / "ranking_prompt.md"
+    reads = []
+    real_read_text = type(path).read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return real_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(path), "read_text", counting_read_text)
+    factory = MagicMock(side_effect=ChatPromptTemplate.from_template)
+    monkeypatch.setattr("src.services.prompt_registry.ChatPromptTemplate.from_template", factory)
+
+    first = registry.get("ranking_prompt.md")
+    assert registry.get("ranking_prompt.md") is first
+    assert reads == ["ranking_prompt.md"]
+    assert factory.call_count == 1
+
+    path.write_text(path.read_text() + "\nBe concise.")
+    bump_mtime(path)
+    reloaded = registry.get("ranking_prompt.md")
+    assert reloaded is not first
+    assert registry.reloads == 1
+    assert registry.get("ranking_prompt.md") is reloaded
+
+
+def test_edits_that_break_required_variables_are_rejected(prompts_dir):
+    registry = PromptRegistry()
+    path = prompts_dir / "memory_style_prompt.md"
+    original = registry.load_text("memory_style_prompt.md")
+
+    path.write_text("Feedback: {feedback}\nOops: {unknown}")
+    bump_mtime(path)
+    assert registry.load_text("memory_style_prompt.md") == original
+    assert registry.reloads == 0
+
+
+def test_preload_reports_every_invalid_or_missing_prompt(prompts_dir):
+    (prompts_dir / "ranking_prompt.md").write_text("Pick from {papers}")
+    (prompts_dir / "memory_style_prompt.md").unlink()
+
+    with pytest.raises(PromptValidationError) as excinfo:
+        PromptRegistry().preload()
+
+    message = str(excinfo.value)
+    assert "ranking_prompt.md: missing ['conversation', 'interests', 'topic']" in message
+    assert "memory_style_prompt.md: file not found" in message
+
+
+def test_prompt_problems_ignores_prompts_without_requirements():
+    assert prompt_problems("scratch.md", "Anything {goes}") == []
+    assert prompt_problems("ranking_prompt.md", "{topic} {interests} {conversation} {papers} {extra}") == [
+        "ranking_prompt.md: unknown ['extra']"
+    ]
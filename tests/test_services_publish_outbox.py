@@ -0,0 +1,265 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services import publish_outbox
+from src.services.linkedin_api import (
+    LinkedInService,
+    aclose_http_client,
+    get_http_client,
+    parse_retry_after,
+    token_key,
+)
+from src.services.publish_outbox import OutboxStatus, OutboxWorker, PublishOutbox
+from tests.utils.linkedin_stub import LinkedInStub
+
+
+@pytest.fixture
+def stub():
+    with LinkedInStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+async def make_worker(stub, tmp_path):
+    outbox = PublishOutbox(tmp_path / "outbox.sqlite3")
+
+    def factory(**kwargs):
+        kwargs.setdefault("max_concurrency", 2)
+        return OutboxWorker(
+            outbox=outbox,
+            service_factory=lambda account: LinkedInService(access_token="token", api_base=stub.base_url),
+            **kwargs,
+        )
+
+    yield factory
+    await aclose_http_client()
+    outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_publishes_queued_posts_through_the_stub(stub, make_worker):
+    worker = make_worker()
+    first = await worker.outbox.enqueue("acct", "one")
+    second = await worker.outbox.enqueue("acct", "two")
+    assert (await worker.outbox.get(first.id)).status == OutboxStatus.PENDING
+
+    assert await worker.drain() == 2
+
+    done = await worker.outbox.get(first.id)
+    assert done.status == OutboxStatus.PUBLISHED
+    assert done.post_id and done.post_id.startswith("urn:li:share:")
+    assert (await worker.outbox.get(second.id)).status == OutboxStatus.PUBLISHED
+    assert len(stub.posts) == 2
+    assert stub.posts[0]["json"]["author"] == "urn:li:person:stub-member"
+    assert (await worker.outbox.counts())["published"] == 2
+
+
+@pytest.mark.asyncio
+async def test_429_holds_the_account_for_retry_after_without_using_an_attempt(stub, make_worker):
+    worker = make_worker()
+    stub.respond(429, {"message": "slow down"}, headers={"Retry-After": "30"})
+    entry = await worker.outbox.enqueue("acct", "hello")
+    other = await worker.outbox.enqueue("acct", "queued behind it")
+
+    assert await worker.run_once() == [OutboxStatus.PENDING, OutboxStatus.PUBLISHED]
+    throttled = await worker.outbox.get(entry.id)
+    assert throttled.status == OutboxStatus.PENDING
+    assert throttled.attempts == 0
+    assert "429" in throttled.last_error
+    assert throttled.next_attempt_at >= time.time() + 25
+    assert await worker.outbox.throttled_until("acct") >= time.time() + 25
+    assert (await worker.outbox.get(other.id)).status == OutboxStatus.PUBLISHED
+
+    # Nothing for the account is claimed until the hold expires, even once the post is due
+    assert await worker.outbox.claim_due(5, now=time.time() + 20) == []
+    assert [e.id for e in await worker.outbox.claim_due(5, now=time.time() + 40)] == [entry.id]
+
+
+@pytest.mark.asyncio
+async def test_server_errors_back_off_then_fail_after_max_attempts(stub, make_worker):
+    worker = make_worker(max_attempts=2)
+    entry = await worker.outbox.enqueue("acct", "hello")
+
+    stub.respond(503, {"message": "unavailable"})
+    assert await worker.run_once() == [OutboxStatus.PENDING]
+    retrying = await worker.outbox.get(entry.id)
+    assert retrying.attempts == 1
+    assert retrying.next_attempt_at > time.time()
+    assert await worker.run_once() == []  # not due yet
+
+    stub.respond(503, {"message": "unavailable"})
+    [claimed] = await worker.outbox.claim_due(1, now=retrying.next_attempt_at)
+    assert await worker._deliver(claimed) == OutboxStatus.FAILED
+    assert (await worker.outbox.get(entry.id)).status == OutboxStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_client_errors_fail_without_retrying(stub, make_worker):
+    worker = make_worker()
+    stub.respond(422, {"message": "bad payload"})
+    entry = await worker.outbox.enqueue("acct", "hello")
+
+    assert await worker.run_once() == [OutboxStatus.FAILED]
+    assert (await worker.outbox.get(entry.id)).last_error.startswith("422")
+
+
+@pytest.mark.asyncio
+async def test_daily_quota_defers_posts_beyond_it(stub, make_worker):
+    worker = make_worker()
+    entries = [await worker.outbox.enqueue("acct", f"post {i}") for i in range(3)]
+    other_account = await worker.outbox.enqueue("other", "separate quota")
+
+    claimed = await worker.outbox.claim_due(10, quota=1)
+    assert [e.id for e in claimed] == [entries[0].id, other_account.id]
+    for entry in claimed:
+        await worker.outbox.mark_published(entry.id, "urn:li:share:x")
+
+    assert await worker.outbox.claim_due(10, quota=1) == []
+    deferred = await worker.outbox.get(entries[1].id)
+    assert deferred.status == OutboxStatus.PENDING
+    assert deferred.next_attempt_at >= time.time() + publish_outbox.QUOTA_WINDOW_SECONDS - 60
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_makes_in_flight_posts_claimable_again(tmp_path):
+    outbox = PublishOutbox(tmp_path / "outbox.sqlite3")
+    entry = await outbox.enqueue("acct", "hello")
+
+    [claimed] = await outbox.claim_due(1)
+    assert claimed.status == OutboxStatus.IN_FLIGHT
+    assert await outbox.claim_due(1) == []  # leased to the first worker
+
+    # That worker died; once the lease runs out another one picks the post up
+    later = time.time() + publish_outbox.PUBLISH_LEASE_SECONDS + 1
+    [reclaimed] = await outbox.claim_due(1, now=later)
+    assert reclaimed.id == entry.id
+    assert reclaimed.attempts == 2
+    outbox.close()
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 0 < parse_retry_after(time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))) <= 60
+
+
+@pytest.mark.asyncio
+async def test_scheduled_posts_wait_for_their_time(stub, make_worker):
+    worker = make_worker()
+    entry = await worker.outbox.enqueue("acct", "next week", not_before=time.time() + 7 * 24 * 3600)
+
+    assert await worker.drain() == 0
+    assert stub.posts == []
+    assert (await worker.outbox.get(entry.id)).status == OutboxStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_wheel_only_holds_posts_due_within_its_horizon(make_worker):
+    worker = make_worker()
+    now = time.time()
+    # A week of posts every five minutes; only the next hour's belong in memory
+    for i in range(2016):
+        worker.outbox._enqueue_sync("acct", f"post {i}", now + 60 + i * 300)
+
+    added = await worker.refill(now)
+    assert added == len(worker.wheel) == 12
+    assert worker.wheel.next_due() == pytest.approx(now + 60)
+
+
+@pytest.mark.asyncio
+async def test_worker_sleeps_until_a_scheduled_post_is_due(stub, make_worker):
+    worker = make_worker()
+    stop = asyncio.Event()
+    runner = asyncio.create_task(worker.run_forever(stop))
+    await asyncio.sleep(0.05)
+
+    entry = await worker.outbox.enqueue("acct", "soon", not_before=time.time() + 0.3)
+    worker.schedule(entry)
+    await asyncio.sleep(0.05)
+    assert stub.posts == []
+
+    for _ in range(100):
+        if (await worker.outbox.get(entry.id)).status == OutboxStatus.PUBLISHED:
+            break
+        await asyncio.sleep(0.05)
+    stop.set()
+    await runner
+
+    assert (await worker.outbox.get(entry.id)).status == OutboxStatus.PUBLISHED
+    assert len(stub.posts) == 1
+
+
+@pytest.mark.asyncio
+async def test_stopped_worker_closes_its_pooled_client(make_worker):
+    worker = make_worker()
+    client = get_http_client()
+    stop = asyncio.Event()
+    stop.set()
+
+    await worker.run_forever(stop)
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_posts_queued_under_the_token_move_to_the_member_once_resolved(stub, make_worker):
+    worker = make_worker()
+    by_token = token_key("token")
+    first = await worker.outbox.enqueue(by_token, "one")
+    later = await worker.outbox.enqueue(by_token, "two", not_before=time.time() + 3600)
+    await worker.outbox.throttle_account(by_token, time.time() + 30)
+
+    [claimed] = await worker.outbox.claim_due(1, now=time.time() + 60)
+    assert await worker._deliver(claimed) == OutboxStatus.PUBLISHED
+
+    member = "urn:li:person:stub-member"
+    assert (await worker.outbox.get(first.id)).account == member
+    assert (await worker.outbox.get(later.id)).account == member
+    assert await worker.outbox.throttled_until(member) >= time.time() + 25
+    assert await worker.outbox.throttled_until(by_token) is None
+
+
+class _LockCheckingConnection:
+    """Proxies a connection, failing any fetch made without the outbox lock held."""
+
+    def __init__(self, outbox: PublishOutbox):
+        self._outbox = outbox
+        self._conn = outbox._conn
+
+    def execute(self, sql, params=()):
+        cursor = self._conn.execute(sql, params)
+        lock = self._outbox._lock
+
+        class Cursor:
+            rowcount = cursor.rowcount
+
+            def fetchone(self):
+                assert lock.locked(), "fetched outside the outbox lock"
+                return cursor.fetchone()
+
+            def fetchall(self):
+                assert lock.locked(), "fetched outside the outbox lock"
+                return cursor.fetchall()
+
+        return Cursor()
+
+    def close(self):
+        self._conn.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_fetch_rows_under_the_outbox_lock(tmp_path):
+    outbox = PublishOutbox(tmp_path / "outbox.sqlite3")
+    entry = await outbox.enqueue("acct", "hello")
+    await outbox.throttle_account("acct", time.time() + 30)
+    outbox._conn = _LockCheckingConnection(outbox)
+
+    assert (await outbox.get(entry.id)).content == "hello"
+    assert [e.id for e in await outbox.list()] == [entry.id]
+    assert (await outbox.counts())[OutboxStatus.PENDING.value] == 1
+    assert await outbox.due_before(time.time() + 60) == [(entry.id, entry.next_attempt_at)]
+    assert await outbox.throttled_until("acct") > time.time()
+    outbox.close()
@@ -0,0 +1,70 @@
+import pytest
+
+from src.services.arxiv_client import ArxivService
+from src.services.query import (
+    CanonicalizationStats,
+    QuerySyntaxError,
+    canonical_query,
+    canonical_terms,
+    canonicalization_report,
+    canonicalization_stats,
+    keyword_query,
+    parse_query,
+    query_cache_key,
+)
+
+
+def test_equivalent_boolean_queries_share_a_cache_key():
+    assert canonical_query('all:"LLM" OR all:"AI"') == canonical_query('all:"AI"  OR all:"llm"')
+    assert query_cache_key('all:"LLM" OR all:"AI"') == query_cache_key('(all:"ai" OR all:"llm")')
+    assert canonical_query("all:a OR (all:c OR all:b)") == "all:a OR all:b OR all:c"
+
+
+def test_canonicalization_preserves_meaning():
+    # ANDNOT is not commutative
+    assert query_cache_key("ti:a ANDNOT ti:b") != query_cache_key("ti:b ANDNOT ti:a")
+    # Word order inside a phrase or free-text title matters
+    assert canonical_query('ti:"neural graph"') != canonical_query('ti:"graph neural"')
+    assert canonical_query("Attention Is All You Need") == "attention is all you need"
+    assert canonical_query("(ti:b AND ti:a) OR abs:x") == "abs:x OR (ti:a AND ti:b)"
+
+
+def test_parse_errors_fall_back_to_plain_normalization():
+    with pytest.raises(QuerySyntaxError):
+        parse_query("(all:llm")
+    assert canonical_query("  (all:LLM ") == "(all:llm"
+
+
+def test_keyword_helpers():
+    assert keyword_query(' Machine  "Learning" ') == 'all:"Machine Learning"'
+    assert canonical_terms(["LLM", " llm ", "Generative  AI", ""]) == ["generative ai", "llm"]
+
+
+@pytest.mark.asyncio
+async def test_arxiv_cache_reports_hits_gained_by_canonicalization():
+    canonicalization_stats.reset()
+
+    class FailingClient:
+        def results(self, _search):
+            raise AssertionError("arXiv should not be queried on a cache hit")
+
+    svc = ArxivService()
+    svc.client = FailingClient()
+    await svc._save_to_cache('all:"LLM" OR all:"AI"', [{"title": "Cached"}])
+
+    assert await svc.search_papers('all:"LLM" OR all:"AI"', max_results=1) == [{"title": "Cached"}]
+    assert await svc.search_papers('all:"ai" OR all:"llm"', max_results=1) == [{"title": "Cached"}]
+
+    assert canonicalization_report()["arxiv"] == {"lookups": 2, "hits": 2, "gained": 1}
+
+
+def test_canonicalization_stats_stay_bounded():
+    stats = CanonicalizationStats(max_keys=4, max_spellings=2)
+    for i in range(100):
+        stats.record_write("arxiv", f"query {i}", f"key {i}")
+        for spelling in ("A", "a ", "b", "c"):
+            stats.record("arxiv", f"{spelling} {i}", "shared", hit=True)
+
+    assert stats._spellings.stats()["entries"] == 4
+    assert len(stats._spellings.get(("arxiv", "shared"))) == 2
+    assert stats.report()["arxiv"]["lookups"] == 400
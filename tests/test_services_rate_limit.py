@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services import arxiv_client
+from src.services.arxiv_client import ArxivService, ScheduledArxivClient, get_arxiv_client
+from src.services.rate_limit import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PriorityRateLimiter,
+    current_priority,
+    request_priority,
+)
+from src.services.singleflight import SingleFlight
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = PriorityRateLimiter(rate=20)  # one token every 50ms
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    # First token is immediately available; the next two wait ~50ms each
+    assert time.monotonic() - started >= 0.09
+    assert limiter.granted == 3
+
+
+def test_rate_limiter_serves_interactive_before_queued_bulk():
+    limiter = PriorityRateLimiter(rate=10)
+    limiter.acquire()  # drain the bucket so everyone below has to queue
+    order = []
+
+    def worker(name, priority):
+        limiter.acquire(priority)
+        order.append(name)
+
+    bulk = [threading.Thread(target=worker, args=(f"bulk{i}", PRIORITY_BULK)) for i in range(2)]
+    for t in bulk:
+        t.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=worker, args=("interactive", PRIORITY_INTERACTIVE))
+    interactive.start()
+    for t in [*bulk, interactive]:
+        t.join(timeout=2)
+
+    assert order[0] == "interactive"
+    assert sorted(order[1:]) == ["bulk0", "bulk1"]
+
+
+def test_queued_threads_do_not_spin_while_the_head_sleeps():
+    limiter = PriorityRateLimiter(rate=100)
+    checks = []
+    try_grant = limiter._try_grant_locked
+
+    def counting_try_grant(ticket):
+        checks.append(ticket)
+        return try_grant(ticket)
+
+    limiter._try_grant_locked = counting_try_grant
+    # An async head asleep on its event loop: it holds the queue even though a token is free
+    with limiter._cond:
+        limiter._waiters[-1] = lambda: PRIORITY_INTERACTIVE
+    threads = [threading.Thread(target=limiter.acquire, args=(PRIORITY_BULK,)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.3)
+    assert len(checks) < 60  # re-checks at the poll interval, not a notify_all ping-pong
+
+    limiter._withdraw(-1)
+    for t in threads:
+        t.join(timeout=2)
+    assert limiter.granted == 3
+
+
+@pytest.mark.asyncio
+async def test_request_priority_follows_worker_threads():
+    assert current_priority() == PRIORITY_BULK
+    with request_priority(PRIORITY_INTERACTIVE):
+        assert await asyncio.to_thread(current_priority) == PRIORITY_INTERACTIVE
+    assert current_priority() == PRIORITY_BULK
+
+
+@pytest.mark.asyncio
+async def test_async_waiters_queue_by_priority_on_the_loop():
+    limiter = PriorityRateLimiter(rate=20)
+    limiter.acquire()
+    order = []
+    threads_before = threading.active_count()
+
+    async def waiter(name, priority):
+        await limiter.acquire_async(priority)
+        order.append(name)
+
+    bulk = [asyncio.create_task(waiter(f"bulk{i}", PRIORITY_BULK)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    # Queued coroutines wait on the event loop, not on worker threads
+    assert threading.active_count() == threads_before
+    interactive = asyncio.create_task(waiter("interactive", PRIORITY_INTERACTIVE))
+    await asyncio.wait_for(asyncio.gather(*bulk, interactive), timeout=2)
+
+    assert order == ["interactive", "bulk0", "bulk1", "bulk2"]
+
+
+@pytest.mark.asyncio
+async def test_interactive_caller_joining_a_bulk_flight_raises_its_priority():
+    limiter = PriorityRateLimiter(rate=20)
+    limiter.acquire()
+    flight = SingleFlight("test-priority")
+    order = []
+
+    async def fetch(name):
+        await limiter.acquire_async()
+        order.append(name)
+        return name
+
+    queued_bulk = asyncio.create_task(fetch("other bulk"))
+    await asyncio.sleep(0.005)
+    leader = asyncio.create_task(flight.do("q", lambda: fetch("shared")))
+    await asyncio.sleep(0.005)
+    with request_priority(PRIORITY_INTERACTIVE):
+        joined = await asyncio.wait_for(flight.do("q", lambda: fetch("unused")), timeout=2)
+    await asyncio.gather(leader, queued_bulk)
+
+    assert joined == "shared"
+    assert order == ["shared", "other bulk"]
+
+
+def test_arxiv_services_share_one_scheduled_client():
+    client = get_arxiv_client()
+    assert isinstance(client, ScheduledArxivClient)
+    assert client.delay_seconds == 0
+    assert ArxivService().client is client is ArxivService().client
+    assert client.limiter is arxiv_client.arxiv_rate_limiter
+
+
+def test_scheduled_client_acquires_a_token_per_request(monkeypatch):
+    calls = []
+
+    class RecordingLimiter:
+        def acquire(self):
+            calls.append(current_priority())
+            return 0.0
+
+    client = ScheduledArxivClient(RecordingLimiter(), num_retries=1)
+    attempts = []
+
+    def fake_try_parse_feed(url, first_page, try_index):
+        attempts.append(try_index)
+        if try_index == 0:
+            raise arxiv_client.arxiv.UnexpectedEmptyPageError(url, try_index, None)
+        return "feed"
+
+    monkeypatch.setattr(client, "_Client__try_parse_feed", fake_try_parse_feed)
+    with request_priority(PRIORITY_INTERACTIVE):
+        assert client._parse_feed("http://export.arxiv.org/api/query") == "feed"
+
+    # The retry is paced too
+    assert attempts == [0, 1]
+    assert calls == [PRIORITY_INTERACTIVE, PRIORITY_INTERACTIVE]
@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import arxiv_client, google_trends
+from src.services.arxiv_client import ArxivService
+from src.services.google_trends import GoogleTrendsService
+from src.services.singleflight import SingleFlight, singleflight_stats
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test-share")
+    release = asyncio.Event()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await release.wait()
+        return ["result"]
+
+    callers = [asyncio.ensure_future(flight.do("k", work)) for _ in range(5)]
+    other = asyncio.ensure_future(flight.do("other", work))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*callers, other)
+    assert len(runs) == 2
+    assert all(r == ["result"] for r in results)
+    assert singleflight_stats()["test-share"] == {"calls": 6, "executions": 2, "coalesced": 4, "inflight": 0}
+
+    # Once finished, the next call executes again
+    await flight.do("k", work)
+    assert len(runs) == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_and_cancellation_is_isolated():
+    flight = SingleFlight("test-errors")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("upstream down")
+
+    first = asyncio.ensure_future(flight.do("k", failing))
+    second = asyncio.ensure_future(flight.do("k", failing))
+    third = asyncio.ensure_future(flight.do("k", failing))
+    await asyncio.sleep(0)
+    third.cancel()  # one caller giving up does not cancel the shared call
+    release.set()
+
+    for caller in (first, second):
+        with pytest.raises(RuntimeError, match="upstream down"):
+            await caller
+    assert third.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_arxiv_searches_are_coalesced():
+    class SlowClient:
+        page_size = 100
+        calls = 0
+        gate = threading.Event()
+
+        def results(self, search):
+            SlowClient.calls += 1
+            self.gate.wait(timeout=5)
+            yield SimpleNamespace(
+                title="Paper", summary="S", entry_id="http://arxiv.org/abs/1", published=datetime.datetime(2024, 1, 1)
+            )
+
+    before = arxiv_client.search_flight.stats()["coalesced"]
+    services = [ArxivService() for _ in range(4)]
+    for svc in services:
+        svc.client = SlowClient()
+
+    queries = ['all:"LLM" OR all:"AI"', 'all:"ai" OR all:"llm"', 'all:"LLM" OR all:"AI"', 'all:"ai"  OR all:"LLM"']
+    tasks = [asyncio.ensure_future(svc.search_papers(q, max_results=1)) for svc, q in zip(services, queries)]
+    await asyncio.sleep(0.05)
+    SlowClient.gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert SlowClient.calls == 1
+    assert all(r == results[0] for r in results) and results[0] is not results[1]
+    assert arxiv_client.search_flight.stats()["coalesced"] - before == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_trend_misses_share_one_fetch(monkeypatch):
+    calls = []
+
+    def fetch(self, keywords):
+        calls.append(keywords)
+        return {keywords[0]: [("topic", 1.0)]}
+
+    monkeypatch.setattr(GoogleTrendsService, "_fetch_pytrends_sync", fetch)
+
+    results = await asyncio.gather(
+        GoogleTrendsService().get_trending_topics(["LLM", "AI"]),
+        GoogleTrendsService().get_trending_topics(["ai", "llm"]),
+    )
+    assert results == [["topic"], ["topic"]]
+    assert len(calls) == 1
@@ -0,0 +1,171 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.agents.conversation_agent import conversation_node
+from src.agents.human_paper_review import approved_paper_state, human_paper_review
+from src.agents.post_writer import speculate_draft, write_post
+from src.agents.relevance_ranker import rank_papers
+from src.config.settings import settings
+from src.graph import speculate_rank_and_draft
+from src.services import speculation as speculation_service
+from src.services.speculation import Speculator
+from src.services.utils import SQLiteCache
+from src.state import AppState
+
+CANDIDATES = [
+    {"title": "Paper 1", "summary": "S1", "url": "u1", "published": "2024-01-01"},
+    {"title": "Paper 2", "summary": "S2", "url": "u2", "published": "2024-02-01"},
+]
+
+
+@pytest.fixture
+def speculation(monkeypatch):
+    monkeypatch.setattr(settings, "speculation_enabled", True)
+    monkeypatch.setattr(settings, "openai_api_key", "key")
+    monkeypatch.setattr(settings, "tavily_api_key", None)
+    monkeypatch.setattr(speculation_service, "_after_accept", speculate_rank_and_draft)
+
+
+def counting(result, delay=0.0):
+    calls = []
+
+    async def produce(*args):
+        calls.append(args)
+        await asyncio.sleep(delay)
+        return result
+
+    return produce, calls
+
+
+@pytest.mark.asyncio
+async def test_results_are_claimed_once_and_only_for_identical_inputs():
+    speculator = Speculator(SQLiteCache("speculation-test"))
+    produce, calls = counting("draft", delay=0.05)
+
+    future = speculator.submit("draft", "t1", {"title": "A"}, produce)
+    assert speculator.submit("draft", "t1", {"title": "A"}, produce) is future
+
+    assert await speculator.claim("draft", "t1", {"title": "B"}) is None
+    assert await speculator.claim("draft", "t2", {"title": "A"}) is None  # another thread
+    assert await speculator.claim("draft", "t1", {"title": "A"}) == "draft"  # waits for the running producer
+    assert await speculator.claim("draft", "t1", {"title": "A"}) is None
+    assert len(calls) == 1
+    assert speculator.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_speculation_is_a_miss():
+    speculator = Speculator(SQLiteCache("speculation-test"))
+
+    async def broken():
+        raise RuntimeError("model down")
+
+    assert await asyncio.wrap_future(speculator.submit("ranking", "t1", {"x": 1}, broken)) is None
+    assert await speculator.claim("ranking", "t1", {"x": 1}) is None
+    assert speculator.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_uses_a_predraft_only_if_the_answer_keeps_its_inputs(speculation):
+    generate, calls = counting("Speculative draft")
+    state = AppState(paper_candidates=CANDIDATES, selected_paper=CANDIDATES[0], user_ready=True)
+
+    with patch("src.agents.post_writer.generate_post", side_effect=generate):
+        await asyncio.wrap_future(speculate_draft(approved_paper_state(state), None))
+        assert len(calls) == 1
+
+        # An approval with a comment changes the writer's inputs, so it drafts for real
+        with patch("src.agents.human_paper_review.interrupt", return_value={"type": "accept", "args": "Go"}):
+            commented = state.model_copy(update=await human_paper_review(state))
+        await write_post(commented)
+        assert len(calls) == 2
+
+        with patch("src.agents.human_paper_review.interrupt", return_value={"type": "accept", "args": None}):
+            approved = state.model_copy(update=await human_paper_review(state))
+        assert (await write_post(approved))["post_draft"] == "Speculative draft"
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_conversation_pause_ranks_and_predrafts_for_an_accept(speculation):
+    rank, rank_calls = counting(1)
+    generate, draft_calls = counting("Speculative draft")
+    state = AppState(paper_candidates=CANDIDATES, trending_keywords=["ai"])
+    turn = ("What angle?", [], "What angle?")
+
+    with patch("src.agents.relevance_ranker.choose_paper_index", side_effect=rank), \
+         patch("src.agents.post_writer.generate_post", side_effect=generate), \
+         patch("src.agents.conversation_agent._invoke_legacy", AsyncMock(return_value=turn)) as invoke, \
+         patch("src.agents.conversation_agent.interrupt", return_value={"type": "accept", "args": None}), \
+         patch("src.agents.human_paper_review.interrupt", return_value={"type": "accept", "args": None}):
+        state = state.model_copy(update=await conversation_node(state))
+        assert state.user_ready is True
+
+        state = state.model_copy(update=await rank_papers(state))
+        assert state.selected_paper == CANDIDATES[1]
+
+        state = state.model_copy(update=await human_paper_review(state))
+        assert (await write_post(state))["post_draft"] == "Speculative draft"
+
+    assert invoke.await_count == 1
+    assert len(rank_calls) == 1
+    assert len(draft_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_conversation_pause_speculates_nothing_without_candidates_or_a_paper(speculation):
+    rank, rank_calls = counting(0)
+    generate, draft_calls = counting("draft")
+    turn = ("What angle?", [], "What angle?")
+
+    with patch("src.agents.relevance_ranker.choose_paper_index", side_effect=rank), \
+         patch("src.agents.post_writer.generate_post", side_effect=generate), \
+         patch("src.agents.conversation_agent._invoke_legacy", AsyncMock(return_value=turn)), \
+         patch("src.agents.conversation_agent.interrupt", return_value={"type": "accept", "args": None}), \
+         patch.object(speculation_service.speculator, "spawn") as spawn:
+        await conversation_node(AppState(trending_keywords=["ai"]))
+
+    spawn.assert_not_called()
+    assert speculate_rank_and_draft(AppState(selected_paper=CANDIDATES[0], post_draft="Done"), None) is None
+    assert rank_calls == draft_calls == []
+
+
+@pytest.mark.asyncio
+async def test_resumed_conversation_reuses_the_turn_from_before_the_interrupt(speculation):
+    turn = ("What angle?", [], "What angle?")
+    state = AppState(paper_candidates=CANDIDATES, trending_keywords=["ai"])
+
+    with patch("src.agents.relevance_ranker.choose_paper_index", side_effect=counting(0)[0]), \
+         patch("src.agents.post_writer.generate_post", side_effect=counting("draft")[0]), \
+         patch("src.agents.conversation_agent._invoke_legacy", AsyncMock(return_value=turn)) as invoke, \
+         patch("src.agents.conversation_agent.interrupt", return_value={"type": "response", "args": "More on evals"}):
+        first = await conversation_node(state)
+        resumed = await conversation_node(state)
+
+    assert invoke.await_count == 1
+    assert resumed == first
+
+
+@pytest.mark.asyncio
+async def test_threads_with_identical_inputs_do_not_share_turns(speculation):
+    workflow = StateGraph(AppState)
+    workflow.add_node("conversation_agent", conversation_node)
+    workflow.add_edge(START, "conversation_agent")
+    workflow.add_edge("conversation_agent", END)
+    graph = workflow.compile(checkpointer=InMemorySaver())
+    state = AppState(paper_candidates=CANDIDATES, trending_keywords=["ai"])
+    turns = iter([("Question for A?", [], "Question for A?"), ("Question for B?", [], "Question for B?")])
+
+    with patch("src.agents.relevance_ranker.choose_paper_index", side_effect=counting(0)[0]), \
+         patch("src.agents.post_writer.generate_post", side_effect=counting("draft")[0]), \
+         patch("src.agents.conversation_agent._invoke_legacy", AsyncMock(side_effect=lambda *_: next(turns))) as invoke:
+        first = await graph.ainvoke(state, {"configurable": {"thread_id": "a"}})
+        second = await graph.ainvoke(state, {"configurable": {"thread_id": "b"}})
+
+    assert invoke.await_count == 2
+    assert first["__interrupt__"][0].value["action_request"]["args"]["question"] == "Question for A?"
+    assert second["__interrupt__"][0].value["action_request"]["args"]["question"] == "Question for B?"
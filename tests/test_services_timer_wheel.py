@@ -0,0 +1,45 @@
+from src.services.timer_wheel import TimerWheel
+
+
+def test_timers_fire_in_due_order_once_their_tick_passes():
+    wheel = TimerWheel(tick=1.0, slots=60, start=100.0)
+    assert wheel.add("b", 105.5)
+    assert wheel.add("a", 103.0)
+    assert wheel.add("late", 100.0)  # overdue timers fire on the next advance
+
+    assert wheel.next_due() == 100.0
+    assert wheel.advance(104.0) == ["late", "a"]
+    assert wheel.next_due() == 105.5
+    assert wheel.advance(105.2) == []
+    assert wheel.advance(106.0) == ["b"]
+    assert len(wheel) == 0 and wheel.next_due() is None
+
+
+def test_timers_beyond_the_horizon_are_refused():
+    wheel = TimerWheel(tick=1.0, slots=60, start=0.0)
+    assert wheel.horizon == 60.0
+    assert wheel.add("soon", 59.0)
+    assert not wheel.add("later", 60.0)
+    assert "later" not in wheel
+
+
+def test_rescheduling_and_cancelling_replace_the_timer():
+    wheel = TimerWheel(tick=1.0, slots=60, start=0.0)
+    wheel.add("post", 5.0)
+    wheel.add("post", 30.0)
+    wheel.add("other", 6.0)
+    wheel.cancel("other")
+
+    assert wheel.advance(10.0) == []
+    assert wheel.advance(31.0) == ["post"]
+
+
+def test_a_long_pause_expires_everything_due_in_one_pass():
+    wheel = TimerWheel(tick=1.0, slots=10, start=0.0)
+    for i in range(10):
+        wheel.add(i, float(i))
+
+    assert wheel.advance(500.0) == list(range(10))
+    # The wheel has moved on: its horizon now starts at the new time
+    assert wheel.add("next", 505.0)
+    assert wheel.advance(505.0) == ["next"]
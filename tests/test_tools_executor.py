@@ -0,0 +1,149 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.tools.executor import run_tool_calls, run_tool_loop
+
+
+class SleepyTool:
+    def __init__(self, name, delay=0.0, result=None, error=None):
+        self.name = name
+        self.delay = delay
+        self.result = result if result is not None else f"{name} result"
+        self.error = error
+        self.calls = 0
+
+    async def ainvoke(self, args):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class ScriptedLLM:
+    """Returns queued responses in order, recording the messages of each call."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.seen = []
+        self.bound = []
+
+    def bind(self, **kwargs):
+        self.bound.append(kwargs)
+        return self
+
+    async def ainvoke(self, messages):
+        self.seen.append(list(messages))
+        return self.responses.pop(0)
+
+
+def call(name, call_id):
+    return {"name": name, "args": {}, "id": call_id}
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently_and_keep_call_order():
+    tools = {"slow": SleepyTool("slow", delay=0.2), "fast": SleepyTool("fast", delay=0.05)}
+
+    start = time.perf_counter()
+    messages = await run_tool_calls([call("slow", "1"), call("fast", "2")], tools)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.2 + 0.1  # overlapped, not 0.25 back to back
+    assert [m.tool_call_id for m in messages] == ["1", "2"]
+    assert [m.content for m in messages] == ["slow result", "fast result"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    tools = {"t": SleepyTool("t", delay=0.1)}
+
+    start = time.perf_counter()
+    await run_tool_calls([call("t", str(i)) for i in range(4)], tools, max_concurrency=2)
+
+    assert time.perf_counter() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_failures_timeouts_and_unknown_tools_become_messages():
+    tools = {
+        "broken": SleepyTool("broken", error=RuntimeError("boom")),
+        "stuck": SleepyTool("stuck", delay=1.0),
+        "ok": SleepyTool("ok"),
+    }
+
+    messages = await run_tool_calls(
+        [call("broken", "1"), call("missing", "2"), call("stuck", "3"), call("ok", "4")], tools, timeout=0.05
+    )
+
+    assert [(m.tool_call_id, m.content) for m in messages] == [
+        ("1", "broken unavailable."),
+        ("2", "Unknown tool missing."),
+        ("3", "stuck timed out."),
+        ("4", "ok result"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tool_loop_runs_multiple_rounds_until_a_plain_answer():
+    tools = {"search": SleepyTool("search")}
+    llm = ScriptedLLM([
+        AIMessage(content="", tool_calls=[call("search", "a")]),
+        AIMessage(content="", tool_calls=[call("search", "b")]),
+        AIMessage(content="done"),
+    ])
+
+    final = await run_tool_loop(llm, ["prompt"], tools, max_steps=3)
+
+    assert final.content == "done"
+    assert tools["search"].calls == 2
+    last_round = llm.seen[-1]
+    assert [m.tool_call_id for m in last_round if isinstance(m, ToolMessage)] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_tool_loop_answers_without_tools_once_the_step_budget_is_spent():
+    tools = {"search": SleepyTool("search")}
+    looping = AIMessage(content="", tool_calls=[call("search", "x")])
+    llm = ScriptedLLM([looping, AIMessage(content="", tool_calls=[call("search", "y")]), AIMessage(content="answer")])
+
+    final = await run_tool_loop(llm, ["prompt"], tools, max_steps=1)
+
+    assert final.content == "answer"
+    assert tools["search"].calls == 1
+    assert len(llm.seen) == 3
+    assert llm.bound == [{"tool_choice": "none"}]
+    # The call left over at the budget still gets a reply before the tools-off request
+    last_request = llm.seen[-1]
+    assert last_request[-2].tool_calls[0]["id"] == "y"
+    assert isinstance(last_request[-1], ToolMessage) and last_request[-1].tool_call_id == "y"
+
+
+@pytest.mark.asyncio
+async def test_tool_loop_without_tool_calls_is_a_single_model_call():
+    llm = ScriptedLLM([SimpleNamespace(content="direct", tool_calls=[])])
+
+    final = await run_tool_loop(llm, ["prompt"], {}, max_steps=3)
+
+    assert final.content == "direct"
+    assert len(llm.seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_loop_answers_every_tool_call_including_unknown_tools():
+    tools = {"search": SleepyTool("search")}
+    llm = ScriptedLLM([
+        AIMessage(content="", tool_calls=[call("search", "a"), call("hallucinated", "b")]),
+        AIMessage(content="done"),
+    ])
+
+    await run_tool_loop(llm, ["prompt"], tools, max_steps=3)
+
+    # The follow-up request carries a reply for each tool_call_id the model sent
+    requested = [c["id"] for c in llm.seen[-1][1].tool_calls]
+    answered = [m.tool_call_id for m in llm.seen[-1] if isinstance(m, ToolMessage)]
+    assert answered == requested == ["a", "b"]
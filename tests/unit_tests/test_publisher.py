@@ -1,7 +1,10 @@
 import pytest
-from unittest.mock import patch, AsyncMock
+from datetime import datetime, timezone
+from unittest.mock import patch
 from src.state import AppState
 from src.agents.publisher import publisher_node
+from src.services.linkedin_api import LinkedInService, token_key
+from src.services.publish_outbox import OutboxStatus, get_publish_outbox
 
 @pytest.mark.asyncio
 async def test_publisher_node_success():
@@ -10,15 +13,13 @@ async def test_publisher_node_success():
         post_draft="Great content."
     )
     
-    with patch("src.agents.publisher.LinkedInService") as MockService:
-        mock_instance = MockService.return_value
-        mock_instance.post_update = AsyncMock(return_value=True)
-        
+    with patch("src.agents.publisher.start_publish_worker") as mock_start_worker:
         result = await publisher_node(state)
         
-        MockService.assert_called()
-        mock_instance.post_update.assert_called_with("Great content.")
-        assert result == {}
+        mock_start_worker.assert_called()
+        entry = await get_publish_outbox().get(result["publish_job_id"])
+        assert entry.content == "Great content."
+        assert entry.status == OutboxStatus.PENDING
 
 @pytest.mark.asyncio
 async def test_publisher_node_not_approved():
@@ -27,10 +28,11 @@ async def test_publisher_node_not_approved():
         post_draft="Great content."
     )
     
-    with patch("src.agents.publisher.LinkedInService") as MockService:
+    with patch("src.agents.publisher.start_publish_worker") as mock_start_worker:
         result = await publisher_node(state)
-        MockService.assert_not_called()
+        mock_start_worker.assert_not_called()
         assert result == {}
+        assert await get_publish_outbox().counts() == {status.value: 0 for status in OutboxStatus}
 
 @pytest.mark.asyncio
 async def test_publisher_node_no_draft():
@@ -39,7 +41,37 @@ async def test_publisher_node_no_draft():
         post_draft=""
     )
     
-    with patch("src.agents.publisher.LinkedInService") as MockService:
+    with patch("src.agents.publisher.start_publish_worker") as mock_start_worker:
         result = await publisher_node(state)
-        MockService.assert_not_called()
+        mock_start_worker.assert_not_called()
         assert result == {}
+
+@pytest.mark.asyncio
+async def test_publisher_node_schedules_posts_with_publish_at():
+    state = AppState(
+        approved=True,
+        post_draft="Monday post.",
+        publish_at="2030-01-07T09:00:00",
+    )
+
+    with patch("src.agents.publisher.start_publish_worker"), \
+         patch("src.agents.publisher.notify_publish_worker") as mock_notify:
+        result = await publisher_node(state)
+
+    entry = await get_publish_outbox().get(result["publish_job_id"])
+    assert entry.next_attempt_at == datetime(2030, 1, 7, 9, tzinfo=timezone.utc).timestamp()
+    mock_notify.assert_called_once_with(entry)
+
+@pytest.mark.asyncio
+async def test_publisher_node_enqueues_without_calling_linkedin():
+    state = AppState(approved=True, post_draft="Great content.")
+
+    with patch("src.agents.publisher.start_publish_worker"), \
+         patch("src.services.publish_outbox.settings.linkedin_access_token", "token"), \
+         patch("src.services.publish_outbox.settings.linkedin_author_urn", ""), \
+         patch.object(LinkedInService, "_resolve_author_urn") as mock_resolve:
+        result = await publisher_node(state)
+
+    mock_resolve.assert_not_called()
+    entry = await get_publish_outbox().get(result["publish_job_id"])
+    assert entry.account == token_key("token")
@@ -0,0 +1,33 @@
+"""Stand-in for the shared chat model registry, patched into one node module at a time."""
+from typing import Any, Optional, Sequence
+from unittest.mock import MagicMock
+
+
+def fake_model_registry(**kwargs: Any) -> MagicMock:
+    """
+    A mock `get_chat_model` whose `return_value` plays the node's base model. Tools and
+    structured-output schemas are bound on it the way the registry binds them:
+
+        with patch("src.agents.post_writer.get_chat_model", new_callable=fake_model_registry) as models:
+            models.return_value.ainvoke = AsyncMock(...)
+    """
+    registry = MagicMock(**kwargs)
+
+    def get_chat_model(
+        model: str,
+        api_key: Optional[str] = None,
+        *,
+        tools: Sequence[Any] = (),
+        schema: Optional[type] = None,
+        method: str = "function_calling",
+        **_: Any,
+    ) -> Any:
+        base = registry.return_value
+        if tools:
+            return base.bind_tools(list(tools))
+        if schema is not None:
+            return base.with_structured_output(schema, method=method)
+        return base
+
+    registry.side_effect = get_chat_model
+    return registry
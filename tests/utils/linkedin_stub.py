@@ -0,0 +1,84 @@
+"""Local stand-in for the LinkedIn REST API, served over real HTTP from a background thread."""
+import itertools
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class LinkedInStub:
+    """
+    Answers `/v2/userinfo` and `/v2/me` with a fixed member and `/v2/ugcPosts` with a new
+    share id, unless responses were queued with `respond`. Records every request it sees.
+
+        with LinkedInStub() as stub:
+            service = LinkedInService(access_token="token", api_base=stub.base_url)
+    """
+
+    def __init__(self, member_id: str = "stub-member"):
+        self.member_id = member_id
+        self.requests: List[Dict[str, Any]] = []
+        self._responses: Deque[Tuple[int, Dict[str, str], Any]] = deque()
+        self._post_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def posts(self) -> List[Dict[str, Any]]:
+        return [request for request in self.requests if request["path"] == "/v2/ugcPosts"]
+
+    def respond(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        """Queues the response for the next `/v2/ugcPosts` call."""
+        with self._lock:
+            self._responses.append((status, headers or {}, body))
+
+    def _handle(self, method: str, path: str, body: Any) -> Tuple[int, Dict[str, str], Any]:
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "json": body})
+            if path in ("/v2/userinfo", "/v2/me"):
+                return 200, {}, {"sub": self.member_id, "id": self.member_id}
+            if path != "/v2/ugcPosts":
+                return 404, {}, {"message": "not found"}
+            if self._responses:
+                return self._responses.popleft()
+            return 201, {}, {"id": f"urn:li:share:{next(self._post_ids)}"}
+
+    def __enter__(self) -> "LinkedInStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                status, headers, body = stub._handle(method, self.path, json.loads(raw) if raw else None)
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:
+                self._reply("GET")
+
+            def do_POST(self) -> None:
+                self._reply("POST")
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
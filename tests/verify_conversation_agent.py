@@ -7,6 +7,7 @@ sys.path.append(".")
 
 from src.agents.conversation_agent import conversation_node
 from src.state import AppState
+from tests.utils.chat_models import fake_model_registry
 
 async def verify_conversation_flow():
     print("--- Starting Verification of Conversation Agent ---")
@@ -36,7 +37,7 @@ async def verify_conversation_flow():
         # We can just let init_chat_model be real or mock? 
         # Actually conversation_node calls init_chat_model. We should mock that too to avoid real API calls.
         
-        with patch("src.agents.conversation_agent.init_chat_model") as mock_init_model:
+        with patch("src.agents.conversation_agent.get_chat_model", new_callable=fake_model_registry) as mock_init_model:
             mock_llm = MagicMock()
             mock_init_model.return_value = mock_llm
             # This ensures tool_ready is False because isinstance(llm, MagicMock) is True.